@@ -1,23 +1,98 @@
 import os
 
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from services.metrics import LatencyHistogram, register_metrics_source
+
+# Pool sizing is per process, so multiply by the number of uvicorn workers and
+# replicas when comparing against the Postgres max_connections budget.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+
+_engine = None
+_session_maker = None
+_checkout_wait = LatencyHistogram()
+_checkout_timeouts = 0
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """Async queue pool that records how long callers wait for a connection."""
+
+    def connect(self):
+        global _checkout_timeouts
+        with _checkout_wait.time():
+            try:
+                return super().connect()
+            except PoolTimeoutError:
+                _checkout_timeouts += 1
+                raise
 
 
 def get_engine():
-    engine = create_async_engine(
-        os.getenv("DATABASE_URL", None).replace("postgresql://", "postgresql+asyncpg://"),
-        echo=True,
-    )
-    return engine
+    """
+    Return the process-wide async engine, creating it on first use.
+    """
+    global _engine
+    if _engine is None:
+        _engine = create_async_engine(
+            os.getenv("DATABASE_URL", None).replace("postgresql://", "postgresql+asyncpg://"),
+            echo=DB_ECHO,
+            poolclass=InstrumentedAsyncPool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=DB_POOL_PRE_PING,
+        )
+    return _engine
 
 
 # Async SQLAlchemy engine
 def get_session_maker():
-    engine = get_engine()
-    # Async session
-    asyncSessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
-    return asyncSessionLocal
+    global _session_maker
+    if _session_maker is None:
+        # Async session
+        _session_maker = sessionmaker(
+            bind=get_engine(), class_=AsyncSession, expire_on_commit=False
+        )
+    return _session_maker
+
+
+async def dispose_engine():
+    """
+    Close all pooled connections. Called on application shutdown.
+    """
+    global _engine, _session_maker
+    if _engine is not None:
+        await _engine.dispose()
+    _engine = None
+    _session_maker = None
+
+
+def get_pool_metrics() -> dict:
+    if _engine is None:
+        return {"initialized": False}
+    pool = _engine.pool
+    return {
+        "initialized": True,
+        "pool_size": pool.size(),
+        "max_overflow": DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "checkout_timeouts": _checkout_timeouts,
+        "checkout_wait": _checkout_wait.snapshot(),
+    }
+
+
+register_metrics_source("db_pool", get_pool_metrics)
 
 
 async def get_db():
@@ -1,17 +1,30 @@
 import asyncio
+import os
 import random
 import string
+import time
 from datetime import date
 from pathlib import Path
+from typing import Iterator, List
 
 import pandas as pd
+import pyarrow.parquet as pq
 import yaml
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.future import select
 
 from database.db import get_db
 from database.models_sql import User
-from services.feast.feast_service import FeastService
-from services.security import hash_password
+from services.security import PasswordHasher
+
+FEAST_USERS_PARQUET = Path(
+    os.getenv(
+        "FEAST_USERS_PARQUET",
+        Path(__file__).parent.parent / "services/feast/data/recommendation_users.parquet",
+    )
+)
+# Rows per INSERT; 8 columns per row keeps a chunk well under asyncpg's 32767 parameters
+SEED_CHUNK_SIZE = int(os.getenv("SEED_CHUNK_SIZE", "1000"))
 
 
 # Utility: generate random email and password
@@ -23,81 +36,98 @@ def generate_password(length=10) -> str:
     return "".join(random.choices(string.ascii_letters + string.digits, k=length))
 
 
-async def seed_users():
-    users: pd.DataFrame = FeastService().get_all_existing_users()
+def _is_new_user_id(user_ids: pd.Series) -> pd.Series:
+    # New users signed up through the app have 27-digit numeric IDs
+    return user_ids.str.isdigit() & (user_ids.str.len() == 27)
 
-    # Filter out new users (27-digit numeric strings)
-    users = users[
-        ~(
-            users["user_id"].astype(str).str.isdigit()
-            & (users["user_id"].astype(str).str.len() == 27)
-        )
-    ]
 
-    async for db in get_db():
-        # Get existing user IDs from database
-        result = await db.execute(select(User.user_id))
-        existing_user_ids = {row[0] for row in result.fetchall()}
+def iter_feast_users(
+    path: Path = FEAST_USERS_PARQUET, chunk_size: int = SEED_CHUNK_SIZE
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream Feast users from the parquet file in chunks of user_id/preferences,
+    without loading the whole file or the ML stack.
+    """
+    parquet = pq.ParquetFile(path)
+    for batch in parquet.iter_batches(batch_size=chunk_size, columns=["user_id", "preferences"]):
+        chunk = batch.to_pandas()
+        chunk["user_id"] = chunk["user_id"].astype(str)
+        yield chunk[~_is_new_user_id(chunk["user_id"])]
 
-        # Create test users with known credentials for easy testing
-        await _create_test_users(db, existing_user_ids)
 
-        # Re-fetch existing user IDs after creating test users
-        result = await db.execute(select(User.user_id))
-        updated_existing_user_ids = {row[0] for row in result.fetchall()}
+def feast_user_ids(limit: int, path: Path = FEAST_USERS_PARQUET) -> List[str]:
+    """Return the first limit Feast user IDs."""
+    user_ids: List[str] = []
+    for chunk in iter_feast_users(path):
+        user_ids.extend(chunk["user_id"].tolist()[: limit - len(user_ids)])
+        if len(user_ids) >= limit:
+            break
+    return user_ids
 
-        # Filter out users that already exist in database (including test users)
-        users_to_add = users[~users["user_id"].astype(str).isin(updated_existing_user_ids)]
 
-        # Log what we're doing with Feast users
-        feast_total = len(users)
-        feast_filtered = len(users_to_add)
-        feast_skipped = feast_total - feast_filtered
-        print(
-            f"📊 Feast users: {feast_filtered} to import, {feast_skipped} skipped (already exist)"
-        )
+async def _existing_user_ids(db, user_ids: List[str]) -> set:
+    result = await db.execute(select(User.user_id).where(User.user_id.in_(user_ids)))
+    return {row[0] for row in result.fetchall()}
+
+
+async def _insert_users(db, rows: List[dict]) -> int:
+    """
+    Insert rows in one statement, skipping any that violate a unique
+    constraint (already imported IDs or colliding generated emails).
+    """
+    if not rows:
+        return 0
+    result = await db.execute(pg_insert(User).values(rows).on_conflict_do_nothing())
+    await db.commit()
+    return result.rowcount
 
-        if feast_skipped > 0:
-            skipped_ids = users[users["user_id"].astype(str).isin(updated_existing_user_ids)][
-                "user_id"
-            ].tolist()
-            print(
-                f"   Skipped Feast users: {skipped_ids[:5]}{'...' if len(skipped_ids) > 5 else ''}"
-            )
-
-        # Generate emails and passwords for remaining Feast users only
-        users_to_add["email"] = users_to_add["user_id"].astype(str).apply(generate_email)
-        users_to_add["password"] = users_to_add["user_id"].apply(lambda _: generate_password())
-
-        # Create User objects in batch
-        user_objects = (
-            users_to_add.assign(
-                user_id=lambda df: df["user_id"].astype(str),
-                age=0,
-                gender="unknown",
-                signup_date=date.today(),
-                preferences=lambda df: df["preferences"].fillna(""),
-                hashed_password=lambda df: df["password"].apply(hash_password),
-            )
-            .apply(
-                lambda row: User(
-                    user_id=row["user_id"],
-                    email=row["email"],
-                    age=row["age"],
-                    gender=row["gender"],
-                    signup_date=row["signup_date"],
-                    preferences=row["preferences"],
-                    password=row["password"],
-                    hashed_password=row["hashed_password"],
-                ),
-                axis=1,
-            )
-            .tolist()
-        )
 
-        # Add all users at once
-        db.add_all(user_objects)
-        await db.commit()
+async def seed_users():
+    started = time.perf_counter()
+    async for db in get_db():
+        # Create test users with known credentials for easy testing; they take
+        # precedence over the Feast users with the same IDs
+        await _create_test_users(db)
+
+        total = imported = skipped = 0
+        for chunk in iter_feast_users():
+            total += len(chunk)
+            # Skip users already in the database before paying for hashing
+            existing_ids = await _existing_user_ids(db, chunk["user_id"].tolist())
+            users_to_add = chunk[~chunk["user_id"].isin(existing_ids)]
+            skipped += len(chunk) - len(users_to_add)
+            if users_to_add.empty:
+                continue
+
+            user_ids = users_to_add["user_id"].tolist()
+            passwords = [generate_password() for _ in user_ids]
+            hashed_passwords = await PasswordHasher().hash_many(passwords)
+            rows = [
+                {
+                    "user_id": user_id,
+                    "email": generate_email(user_id),
+                    "age": 0,
+                    "gender": "unknown",
+                    "signup_date": date.today(),
+                    "preferences": preferences,
+                    "password": password,
+                    "hashed_password": hashed_password,
+                }
+                for user_id, preferences, password, hashed_password in zip(
+                    user_ids,
+                    users_to_add["preferences"].fillna("").tolist(),
+                    passwords,
+                    hashed_passwords,
+                )
+            ]
+            imported += await _insert_users(db, rows)
+
+        elapsed = time.perf_counter() - started
+        print(
+            f"📊 Feast users: {imported} imported, {skipped} skipped (already exist), "
+            f"{total - imported - skipped} skipped (conflicts) of {total} "
+            f"in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.0f} rows/s)"
+        )
 
 
 def _load_test_user_config():
@@ -140,7 +170,7 @@ def _load_test_user_config():
         }
 
 
-async def _create_test_users(db, existing_user_ids: set):
+async def _create_test_users(db):
     """
     Create test users with known credentials using REAL Feast user IDs.
 
@@ -161,14 +191,9 @@ async def _create_test_users(db, existing_user_ids: set):
 
     print(f"📋 Loading {len(test_user_templates)} test user templates from config")
 
-    # Get real user IDs from Feast dataset
+    # Get real user IDs from the Feast dataset
     try:
-        feast_users = FeastService().get_all_existing_users()
-        available_feast_ids = feast_users["user_id"].astype(str).tolist()
-        print(f"🔍 Found {len(available_feast_ids)} real Feast user IDs")
-
-        # Pick the required number of real user IDs for our test users
-        selected_feast_ids = available_feast_ids[:num_users_needed]
+        selected_feast_ids = feast_user_ids(num_users_needed)
         print(f"📋 Selected Feast user IDs for test users: {selected_feast_ids}")
 
     except Exception as e:
@@ -195,19 +220,21 @@ async def _create_test_users(db, existing_user_ids: set):
         test_users_data.append(test_user)
 
     # Only create test users that don't already exist
-    for user_data in test_users_data:
-        if user_data["user_id"] not in existing_user_ids:
-            test_user = User(
-                user_id=user_data["user_id"],
-                email=user_data["email"],
-                age=user_data["age"],
-                gender=user_data["gender"],
-                signup_date=date.today(),
-                preferences=user_data["preferences"],
-                password=user_data["password"],  # Store plaintext for reference
-                hashed_password=hash_password(user_data["password"]),
-            )
-            db.add(test_user)
+    existing_user_ids = await _existing_user_ids(db, selected_feast_ids)
+    new_test_users = [u for u in test_users_data if u["user_id"] not in existing_user_ids]
+    hashed_passwords = await PasswordHasher().hash_many([u["password"] for u in new_test_users])
+    for user_data, hashed_password in zip(new_test_users, hashed_passwords):
+        test_user = User(
+            user_id=user_data["user_id"],
+            email=user_data["email"],
+            age=user_data["age"],
+            gender=user_data["gender"],
+            signup_date=date.today(),
+            preferences=user_data["preferences"],
+            password=user_data["password"],  # Store plaintext for reference
+            hashed_password=hashed_password,
+        )
+        db.add(test_user)
 
     await db.commit()
 
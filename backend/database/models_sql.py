@@ -1,4 +1,4 @@
-from sqlalchemy import Date, Integer, String
+from sqlalchemy import Date, Integer, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, declarative_base, mapped_column
 
 Base = declarative_base()
@@ -21,6 +21,10 @@ class User(Base):
 
 class CartItem(Base):
     __tablename__ = "cart_items"
+    # One line per product: lets cart writes be single-statement upserts
+    __table_args__ = (
+        UniqueConstraint("user_id", "product_id", name="uq_cart_items_user_product"),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[str] = mapped_column(String(27), index=True)
     product_id: Mapped[str] = mapped_column(String, index=True)
@@ -5,9 +5,10 @@ This should be run by a job once per cluster.
 
 import asyncio
 
-from database.db import get_engine
+from database.db import dispose_engine, get_engine
 from database.fetch_feast_users import seed_users
 from database.models_sql import Base
+from services.security import PasswordHasher
 
 
 async def create_tables():
@@ -19,8 +20,12 @@ async def create_tables():
 
 
 async def setup_all():
-    await create_tables()
-    await seed_users()
+    try:
+        await create_tables()
+        await seed_users()
+    finally:
+        PasswordHasher.shutdown()
+        await dispose_engine()
 
 
 if __name__ == "__main__":
@@ -1,4 +1,5 @@
 import sys
+from contextlib import asynccontextmanager
 
 import httpx
 import numpy as np
@@ -9,11 +10,35 @@ from fastapi.responses import Response
 from fastapi.staticfiles import StaticFiles
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
-from routes import auth, cart, health, preferences, products, recommendations
+from database.db import dispose_engine, get_engine
+from routes import auth, cart, health, interactions, preferences, products, recommendations
+from services.feast.async_feast_service import AsyncFeastService
+from services.feast.feast_service import FeastService
+from services.image_fetcher import ImageFetcher
+from services.kafka_service import KafkaService
+from services.route_metrics import RouteLatencyMiddleware
+from services.security import PasswordHasher
 
 # from routes import test
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the shared connection pool once per worker, release it on shutdown
+    get_engine()
+    # Start loading the feature store and models in the background;
+    # /health/ready reports 503 until they are available
+    FeastService()
+    yield
+    AsyncFeastService.shutdown()
+    FeastService.shutdown()
+    KafkaService.shutdown()
+    await ImageFetcher.shutdown()
+    PasswordHasher.shutdown()
+    await dispose_engine()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Set random seed for reproducibility
 np.random.seed(42)
@@ -26,6 +51,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Per-route latency under /health/metrics "routes"
+app.add_middleware(RouteLatencyMiddleware)
 
 
 # Custom StaticFiles class for SPA
@@ -53,6 +80,7 @@ app.include_router(health.router)
 app.include_router(auth.router)
 app.include_router(products.router)
 # app.include_router(interactions.router)
+app.include_router(interactions.beacon_router)
 app.include_router(recommendations.router)
 app.include_router(cart.router)
 # app.include_router(orders.router)
@@ -64,12 +64,43 @@ class AuthResponse(BaseModel):
     token: str
 
 
+class ProductBatchRequest(BaseModel):
+    item_ids: List[str]
+
+
+class ProductBatchResponse(BaseModel):
+    products: List[Product]  # in request order, one per distinct ID
+    missing: List[str]
+
+
 class CartItem(BaseModel):
     user_id: str
     product_id: str
     quantity: int
 
 
+class CartItemDetail(CartItem):
+    # Only filled in when the cart is requested with include_products
+    product: Optional[Product] = None
+
+
+class CartOperation(Enum):
+    ADD = "add"  # increase quantity, inserting the line if needed
+    SET = "set"  # set quantity, removing the line when it is 0 or less
+    REMOVE = "remove"
+
+
+class CartChange(BaseModel):
+    product_id: str
+    quantity: int = 1
+    operation: CartOperation = CartOperation.ADD
+
+
+class CartBatchRequest(BaseModel):
+    user_id: str
+    changes: List[CartChange]
+
+
 class CheckoutRequest(BaseModel):
     user_id: str
     items: List[CartItem]
@@ -13,12 +13,12 @@ from database.models_sql import User
 from models import AuthResponse, LoginRequest, SignUpRequest
 from models import User as UserResponse
 from services.kafka_service import KafkaService  # Kafka send
+from services.principal_cache import principal_cache, principal_claims, user_from_claims
 from services.security import (
     ALGORITHM,
     SECRET_KEY,
+    PasswordHasher,
     create_access_token,
-    hash_password,
-    verify_password,
 )
 
 # OAuth2 scheme for Bearer token
@@ -48,10 +48,21 @@ async def get_current_user(
         user_id = str(sub)
     except (JWTError, ValueError):
         raise credentials_exception
+
+    # Resolve from the token's own claims, then the principal cache, then the DB
+    user = user_from_claims(user_id, payload)
+    if user is not None:
+        principal_cache.token_hits += 1
+        return user
+    user = principal_cache.get(user_id)
+    if user is not None:
+        return user
+    principal_cache.db_lookups += 1
     result = await db.execute(select(User).where(User.user_id == user_id))
     user = result.scalar_one_or_none()
     if not user:
         raise credentials_exception
+    principal_cache.put(user)
     return user
 
 
@@ -81,7 +92,7 @@ async def signup(
         gender=payload.gender,
         signup_date=date.today(),
         preferences="",
-        hashed_password=hash_password(payload.password),
+        hashed_password=await PasswordHasher().hash(payload.password),
     )
     db.add(user)
     await db.commit()
@@ -95,7 +106,7 @@ async def signup(
     )
 
     # Issue JWT
-    token = create_access_token(subject=str(user.user_id))
+    token = create_access_token(subject=str(user.user_id), claims=principal_claims(user))
 
     user_response = UserResponse(
         user_id=user.user_id,
@@ -120,10 +131,10 @@ async def login(
     # Check credentials
     result = await db.execute(select(User).where(User.email == payload.email))
     user = result.scalar_one_or_none()
-    if not user or not verify_password(payload.password, user.hashed_password):
+    if not user or not await PasswordHasher().verify(payload.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
-    token = create_access_token(subject=str(user.user_id))
+    token = create_access_token(subject=str(user.user_id), claims=principal_claims(user))
 
     user_response = UserResponse(
         user_id=user.user_id,
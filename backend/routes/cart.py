@@ -1,96 +1,180 @@
 import logging
-from typing import List
+import os
+from typing import Dict, List, Tuple
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import delete, select
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.db import get_db
 from database.models_sql import CartItem as CartItemDB
-from models import CartItem, InteractionType
+from models import (
+    CartBatchRequest,
+    CartChange,
+    CartItem,
+    CartItemDetail,
+    CartOperation,
+    InteractionType,
+)
+from services.feast.async_feast_service import AsyncFeastService
 from services.kafka_service import KafkaService
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+CART_BATCH_MAX_CHANGES = int(os.getenv("CART_BATCH_MAX_CHANGES", "500"))
 
-@router.get("/cart/{user_id}", response_model=List[CartItem])
-async def get_cart(user_id: str, db: AsyncSession = Depends(get_db)):
+
+@router.get("/cart/{user_id}", response_model=List[CartItemDetail])
+async def get_cart(
+    user_id: str, include_products: bool = False, db: AsyncSession = Depends(get_db)
+):
+    """
+    Get the cart lines. With include_products, every line also carries its
+    product details, resolved in one batched (and cached) lookup.
+    """
     # Get cart items from database
     stmt = select(CartItemDB).where(CartItemDB.user_id == user_id)
     result = await db.execute(stmt)
     cart_items = result.scalars().all()
 
+    products = {}
+    if include_products and cart_items:
+        try:
+            products = await AsyncFeastService().get_items_by_ids(
+                [item.product_id for item in cart_items]
+            )
+        except Exception as e:
+            # The cart is still usable without details; clients fall back to IDs
+            logger.warning(f"⚠️ Could not load product details for cart of {user_id}: {e}")
+
     # Convert to Pydantic models
     return [
-        CartItem(
+        CartItemDetail(
             user_id=item.user_id,
             product_id=item.product_id,
             quantity=item.quantity,
+            product=products.get(item.product_id),
         )
         for item in cart_items
     ]
 
 
+def _upsert(rows: List[dict], increment: bool):
+    """
+    INSERT the cart lines, or on an existing (user_id, product_id) line add to
+    (increment) or replace its quantity, in a single statement.
+    """
+    stmt = pg_insert(CartItemDB).values(rows)
+    quantity = (
+        CartItemDB.quantity + stmt.excluded.quantity if increment else stmt.excluded.quantity
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[CartItemDB.user_id, CartItemDB.product_id],
+        set_={"quantity": quantity},
+    )
+
+
 @router.post("/cart", status_code=204)
 async def add_to_cart(item: CartItem, db: AsyncSession = Depends(get_db)):
     KafkaService().send_interaction(item.user_id, item.product_id, InteractionType.CART.value)
 
-    # Check if item already exists in cart
-    stmt = select(CartItemDB).where(
-        CartItemDB.user_id == item.user_id,
-        CartItemDB.product_id == item.product_id,
-    )
-    result = await db.execute(stmt)
-    existing_item = result.scalar_one_or_none()
-
-    if existing_item:
-        # Update quantity
-        existing_item.quantity += item.quantity or 1
-    else:
-        # Add new item
-        new_item = CartItemDB(
-            user_id=item.user_id,
-            product_id=item.product_id,
-            quantity=item.quantity or 1,
-        )
-        db.add(new_item)
-
+    # Insert the line or add to its quantity atomically
+    row = {"user_id": item.user_id, "product_id": item.product_id, "quantity": item.quantity or 1}
+    await db.execute(_upsert([row], increment=True))
     await db.commit()
     return
 
 
 @router.put("/cart", status_code=204)
 async def update_cart(item: CartItem, db: AsyncSession = Depends(get_db)):
-    # Find existing item
-    stmt = select(CartItemDB).where(
-        CartItemDB.user_id == item.user_id, CartItemDB.product_id == item.product_id
-    )
-    result = await db.execute(stmt)
-    existing_item = result.scalar_one_or_none()
-
-    if existing_item:
-        if item.quantity <= 0:
-            # If quantity is 0 or less, delete the item
-            await db.delete(existing_item)
-            logger.info(
-                f"🗑️ Deleted item (quantity 0): user={item.user_id}, product={item.product_id}"
-            )
-        else:
-            # Update quantity
-            existing_item.quantity = item.quantity
-            logger.info(
-                f"📝 Updated quantity: user={item.user_id}, product={item.product_id}, \
-                    quantity={item.quantity}"
-            )
+    where = (CartItemDB.user_id == item.user_id, CartItemDB.product_id == item.product_id)
+    if item.quantity <= 0:
+        # If quantity is 0 or less, delete the item
+        result = await db.execute(delete(CartItemDB).where(*where))
+    else:
+        result = await db.execute(update(CartItemDB).where(*where).values(quantity=item.quantity))
+    await db.commit()
 
-        await db.commit()
+    if result.rowcount == 0:
+        logger.info(
+            f"⚠️ Item not found for update: user={item.user_id}, product={item.product_id}"
+        )
+    elif item.quantity <= 0:
+        logger.info(
+            f"🗑️ Deleted item (quantity 0): user={item.user_id}, product={item.product_id}"
+        )
     else:
         logger.info(
-            f"⚠️ Item not found for update: user={item.user_id}, \
-            product={item.product_id}"
+            f"📝 Updated quantity: user={item.user_id}, product={item.product_id}, "
+            f"quantity={item.quantity}"
+        )
+    return
+
+
+def fold_cart_changes(changes: List[CartChange]) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """
+    Reduce an ordered list of changes to the net effect per product: quantities
+    to add to the current line, and quantities to set outright (0 removes).
+    """
+    increments: Dict[str, int] = {}
+    quantities: Dict[str, int] = {}
+    for change in changes:
+        product_id = change.product_id
+        if change.operation == CartOperation.ADD:
+            amount = change.quantity or 1
+            if product_id in quantities:
+                quantities[product_id] = max(quantities[product_id], 0) + amount
+            else:
+                increments[product_id] = increments.get(product_id, 0) + amount
+        else:
+            increments.pop(product_id, None)
+            quantities[product_id] = (
+                change.quantity if change.operation == CartOperation.SET else 0
+            )
+    return increments, quantities
+
+
+@router.post("/cart/batch", status_code=204)
+async def apply_cart_changes(batch: CartBatchRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Apply many cart changes in one transaction, with at most one statement
+    per kind of change regardless of the number of lines.
+    """
+    if len(batch.changes) > CART_BATCH_MAX_CHANGES:
+        raise HTTPException(
+            status_code=413, detail=f"At most {CART_BATCH_MAX_CHANGES} changes per batch"
         )
+    increments, quantities = fold_cart_changes(batch.changes)
+    removed = [product_id for product_id, quantity in quantities.items() if quantity <= 0]
+    kept = {product_id: quantity for product_id, quantity in quantities.items() if quantity > 0}
+
+    if increments:
+        rows = [
+            {"user_id": batch.user_id, "product_id": product_id, "quantity": quantity}
+            for product_id, quantity in increments.items()
+        ]
+        await db.execute(_upsert(rows, increment=True))
+    if kept:
+        rows = [
+            {"user_id": batch.user_id, "product_id": product_id, "quantity": quantity}
+            for product_id, quantity in kept.items()
+        ]
+        await db.execute(_upsert(rows, increment=False))
+    if removed:
+        await db.execute(
+            delete(CartItemDB).where(
+                CartItemDB.user_id == batch.user_id, CartItemDB.product_id.in_(removed)
+            )
+        )
+    await db.commit()
 
+    for change in batch.changes:
+        if change.operation == CartOperation.ADD:
+            KafkaService().send_interaction(
+                batch.user_id, change.product_id, InteractionType.CART.value
+            )
     return
 
 
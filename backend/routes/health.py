@@ -3,6 +3,8 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.db import get_db
+from services.feast.feast_service import FeastService
+from services.metrics import collect_metrics
 
 router = APIRouter()
 
@@ -16,6 +18,14 @@ async def liveness_check():
 async def readiness_check(db: AsyncSession = Depends(get_db)):
     try:
         await db.execute(text("SELECT 1"))
+        feast = FeastService.loaded()
+        if feast is not None and not feast.ready():
+            return Response(status_code=503)
         return {"status": "ready"}
     except Exception:
         return Response(status_code=503)
+
+
+@router.get("/health/metrics")
+async def metrics():
+    return collect_metrics()
@@ -1,15 +1,25 @@
+import os
 from datetime import datetime, timezone
+from typing import List
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, status
-from pydantic import BaseModel
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from pydantic import BaseModel, ConfigDict, field_validator
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.db import get_db
 from database.models_sql import User
+from models import InteractionType
 from routes.auth import get_current_user
+from services.interaction_tracker import interaction_tracker
 
 router = APIRouter(prefix="/interactions", tags=["interactions"])
+# Client tracking beacons only, so the simulated log_interaction stays unmounted
+beacon_router = APIRouter(prefix="/interactions", tags=["interactions"])
+
+INTERACTION_BATCH_MAX_EVENTS = int(os.getenv("INTERACTION_BATCH_MAX_EVENTS", "500"))
+# Cart, purchase and rating events are only ever recorded server-side
+BEACON_INTERACTION_TYPES = (InteractionType.POSITIVE_VIEW, InteractionType.NEGATIVE_VIEW)
 
 
 class InteractionRequest(BaseModel):
@@ -21,6 +31,25 @@ class InteractionRequest(BaseModel):
     quantity: int
 
 
+class InteractionEvent(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    item_id: str
+    interaction_type: InteractionType
+
+    @field_validator("interaction_type")
+    @classmethod
+    def check_beacon_type(cls, interaction_type: InteractionType) -> InteractionType:
+        if interaction_type not in BEACON_INTERACTION_TYPES:
+            allowed = ", ".join(t.value for t in BEACON_INTERACTION_TYPES)
+            raise ValueError(f"only {allowed} events can be sent by clients")
+        return interaction_type
+
+
+class InteractionBatchRequest(BaseModel):
+    events: List[InteractionEvent]
+
+
 @router.post("", status_code=status.HTTP_201_CREATED)
 async def log_interaction(
     interaction: InteractionRequest,
@@ -49,3 +78,30 @@ async def log_interaction(
         "message": "Interaction logged (simulated)",
         "interaction_id": interaction_id,
     }
+
+
+@beacon_router.post("/batch", status_code=status.HTTP_202_ACCEPTED)
+async def log_interactions_batch(
+    batch: InteractionBatchRequest,
+    background_tasks: BackgroundTasks,
+    user: User = Depends(get_current_user),
+):
+    """
+    Accept a batch of client-side tracking beacons (views, clicks) and send
+    them to Kafka after responding. Other interaction types are rejected.
+    """
+    if len(batch.events) > INTERACTION_BATCH_MAX_EVENTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {INTERACTION_BATCH_MAX_EVENTS} events per request.",
+        )
+
+    interaction_tracker.track_many(
+        background_tasks,
+        user.user_id,
+        [
+            {**event.model_dump(), "interaction_type": event.interaction_type.value}
+            for event in batch.events
+        ],
+    )
+    return {"accepted": len(batch.events)}
@@ -1,5 +1,5 @@
 # routes/preferences.py
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -8,7 +8,9 @@ from database.models_sql import User
 from models import AuthResponse
 from models import User as UserResponse
 from routes.auth import get_current_user
+from services.feast.feast_service import FeastService
 from services.kafka_service import KafkaService
+from services.principal_cache import principal_cache, principal_claims
 from services.security import create_access_token
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -30,11 +32,19 @@ async def set_preferences(
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    # Update DB
+    # Update DB; the authenticated user may be a cached, session-less copy
+    user = await db.get(User, user.user_id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     user.preferences = prefs.preferences
-    db.add(user)
     await db.commit()
     await db.refresh(user)
+    principal_cache.invalidate(user.user_id)
+
+    # The cached embedding was computed from the old preferences
+    feast = FeastService.loaded()
+    if feast is not None:
+        feast.invalidate_user_embedding(user.user_id)
 
     # Notify Kafka
     KafkaService().send_new_user(
@@ -53,7 +63,8 @@ async def set_preferences(
             preferences=user.preferences,
             views=[],
         ),
-        token=create_access_token(subject=str(user.user_id)),  # Optional: refresh token
+        # Refreshed token: with stateless tokens it carries the new preferences
+        token=create_access_token(subject=str(user.user_id), claims=principal_claims(user)),
     )
 
 
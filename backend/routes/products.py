@@ -1,16 +1,26 @@
-from io import BytesIO
-from typing import List
+import os
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
-from PIL import Image, UnidentifiedImageError
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, UploadFile
 
-from models import Product
+from models import InteractionType, Product, ProductBatchRequest, ProductBatchResponse
+from models import User as UserSchema
 from routes.auth import get_current_user  # to resolve JWT user
-from services.feast.feast_service import FeastService
-from services.kafka_service import KafkaService
+from services.feast.async_feast_service import AsyncFeastService
+from services.feast.hybrid_search import (
+    DEFAULT_WEIGHTS,
+    FUSION_METHODS,
+    HYBRID_SEARCH_CANDIDATES,
+)
+from services.image_fetcher import ImageTooLargeError
+from services.interaction_tracker import interaction_tracker
 
 router = APIRouter()
 
+PRODUCT_BATCH_MAX_IDS = int(os.getenv("PRODUCT_BATCH_MAX_IDS", "200"))
+IMAGE_UPLOAD_MAX_BYTES = int(os.getenv("IMAGE_UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+IMAGE_SEARCH_MAX_IMAGES = int(os.getenv("IMAGE_SEARCH_MAX_IMAGES", "8"))
+
 
 @router.get("/products/search", response_model=List[Product])
 async def search_products_by_text(query: str, k: int = 5):
@@ -18,8 +28,9 @@ async def search_products_by_text(query: str, k: int = 5):
     Search products by text query
     """
     try:
-        feast = FeastService()
-        return feast.search_item_by_text(query, k)
+        return await AsyncFeastService().search_item_by_text(query, k)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -30,36 +41,29 @@ async def search_products_by_image_link(image_link: str, k: int = 5):
     Search products by image_link
     """
     try:
-        feast = FeastService()
-        return feast.search_item_by_image_link(image_link, k)
+        return await AsyncFeastService().search_item_by_image_link(image_link, k)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _read_image(image: UploadFile) -> bytes:
+    contents = await image.read(IMAGE_UPLOAD_MAX_BYTES + 1)
+    if len(contents) > IMAGE_UPLOAD_MAX_BYTES:
+        raise ImageTooLargeError(f"Image is larger than {IMAGE_UPLOAD_MAX_BYTES // 1024} KiB.")
+    return contents
+
+
 @router.post("/products/search/image", response_model=List[Product])
 async def search_products_by_image(image: UploadFile = File(...), k: int = 5):
     """
-    Search products by image - Not fully ready yet
+    Search products by image. The upload is decoded once, reduced to the
+    encoder's input size off the event loop, and memoized by content hash.
     """
     try:
-        contents = await image.read()
-        try:
-            # Try decoding the image in memory
-            pil_image = Image.open(BytesIO(contents))
-            pil_image.verify()  # Just checks integrity
-            pil_image = Image.open(BytesIO(contents))  # Reopen after verify
-            print(
-                f"Image mode: {pil_image.mode}, size: {pil_image.size}, format: {pil_image.format}"
-            )
-        except UnidentifiedImageError as e:
-            print(f"[ImageError] Cannot identify image: {e}")
-            raise HTTPException(status_code=400, detail="Unsupported or invalid image format.")
-        except Exception as e:
-            print(f"[ImageError] General image load error: {e}")
-            raise HTTPException(status_code=400, detail="Failed to process uploaded image.")
-
-        feast = FeastService()
-        return feast.search_item_by_image_file(pil_image, k)
+        contents = await _read_image(image)
+        return await AsyncFeastService().search_item_by_image_bytes(contents, k)
 
     except HTTPException:
         raise  # Pass through
@@ -68,29 +72,136 @@ async def search_products_by_image(image: UploadFile = File(...), k: int = 5):
         raise HTTPException(status_code=500, detail="Unexpected server error during image search.")
 
 
-@router.get("/products/{product_id}", response_model=Product)
-async def get_product(product_id: str, user_id=Depends(get_current_user)):
+@router.post("/products/search/images", response_model=List[List[Product]])
+async def search_products_by_images(images: List[UploadFile] = File(...), k: int = 5):
     """
-    Get product details by ID
+    Search products for several images in one request; results are returned
+    per image, in upload order.
+    """
+    if len(images) > IMAGE_SEARCH_MAX_IMAGES:
+        raise HTTPException(
+            status_code=413, detail=f"At most {IMAGE_SEARCH_MAX_IMAGES} images per request."
+        )
+    try:
+        contents = [await _read_image(image) for image in images]
+        return await AsyncFeastService().search_items_by_images(contents, k)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"[InternalError] {e}")
+        raise HTTPException(status_code=500, detail="Unexpected server error during image search.")
+
+
+@router.post("/products/search/hybrid", response_model=List[Product])
+async def search_products_hybrid(
+    query: Optional[str] = Form(None),
+    image: Optional[UploadFile] = File(None),
+    k: int = Form(10, ge=1, le=HYBRID_SEARCH_CANDIDATES),
+    fusion: str = Form("rrf"),
+    text_weight: float = Form(DEFAULT_WEIGHTS["text"], ge=0),
+    image_weight: float = Form(DEFAULT_WEIGHTS["image"], ge=0),
+    user_weight: float = Form(DEFAULT_WEIGHTS["user"], ge=0),
+    popularity_weight: float = Form(DEFAULT_WEIGHTS["popularity"], ge=0),
+    user=Depends(get_current_user),
+):
+    """
+    Search by text and/or image, personalised for the current user. Text and
+    image results are fused with the user's embedding and product popularity
+    (`rrf` or `weighted` fusion) and returned as one ranked list.
     """
-    # Send view interaction to Kafka
-    KafkaService().send_interaction(
-        user_id=user_id, item_id=product_id, interaction_type="negative_view"
+    query = query.strip() if query else None
+    if not query and image is None:
+        raise HTTPException(status_code=400, detail="Provide a text query, an image or both.")
+    if not (query and text_weight) and not (image is not None and image_weight):
+        raise HTTPException(
+            status_code=400,
+            detail="The query or image provided must have a weight above 0.",
+        )
+    if fusion not in FUSION_METHODS:
+        raise HTTPException(
+            status_code=400, detail=f"fusion must be one of {', '.join(FUSION_METHODS)}."
+        )
+    weights = {
+        "text": text_weight,
+        "image": image_weight,
+        "user": user_weight,
+        "popularity": popularity_weight,
+    }
+    try:
+        contents = await _read_image(image) if image is not None else None
+        return await AsyncFeastService().hybrid_search(
+            UserSchema.model_validate(user),
+            text=query,
+            image=contents,
+            k=k,
+            weights=weights,
+            method=fusion,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"[InternalError] {e}")
+        raise HTTPException(status_code=500, detail="Unexpected server error during search.")
+
+
+@router.post("/products/batch", response_model=ProductBatchResponse)
+async def get_products_batch(request: ProductBatchRequest, user=Depends(get_current_user)):
+    """
+    Get product details for many IDs at once, in request order. Cached
+    products are served directly; the rest come from one online-store query.
+    """
+    item_ids = list(dict.fromkeys(request.item_ids))
+    if len(item_ids) > PRODUCT_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {PRODUCT_BATCH_MAX_IDS} product IDs per request.",
+        )
+    if not item_ids:
+        return ProductBatchResponse(products=[], missing=[])
+
+    try:
+        found = await AsyncFeastService().get_items_by_ids(item_ids)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return ProductBatchResponse(
+        products=[found[item_id] for item_id in item_ids if item_id in found],
+        missing=[item_id for item_id in item_ids if item_id not in found],
     )
 
+
+@router.get("/products/{product_id}", response_model=Product)
+async def get_product(
+    product_id: str, background_tasks: BackgroundTasks, user=Depends(get_current_user)
+):
+    """
+    Get product details by ID
+    """
     try:
-        feast = FeastService()
-        return feast.get_item_by_id(product_id)
+        product = await AsyncFeastService().get_item_by_id(product_id)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    # Send view interaction to Kafka after the response
+    interaction_tracker.track(
+        background_tasks, user.user_id, product_id, InteractionType.NEGATIVE_VIEW.value
+    )
+    return product
+
 
 @router.post("/products/{product_id}/interactions/click", status_code=204)
-async def record_product_click(product_id: str, user_id=Depends(get_current_user)):
+async def record_product_click(
+    product_id: str, background_tasks: BackgroundTasks, user=Depends(get_current_user)
+):
     """
     Records a product click interaction event
     """
-    KafkaService().send_interaction(
-        user_id=user_id, item_id=product_id, interaction_type="positive_view"
+    interaction_tracker.track(
+        background_tasks, user.user_id, product_id, InteractionType.POSITIVE_VIEW.value
     )
     return
@@ -7,16 +7,18 @@ from database.models_sql import User
 from models import Product
 from models import User as UserSchema  # Pydantic User
 from routes.auth import get_current_user  # to resolve JWT user
-from services.feast.feast_service import FeastService
+from services.feast.async_feast_service import AsyncFeastService
 
 router = APIRouter()
 
 
 # GET for existing users
 @router.get("/recommendations/{user_id}", response_model=List[Product])
-def get_recommendations(user_id: str):
+async def get_recommendations(user_id: str):
     try:
-        return FeastService().load_items_existing_user(user_id)
+        return await AsyncFeastService().load_items_existing_user(user_id)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -34,6 +36,10 @@ async def recommend_for_new_user(
 ):
     try:
         user_pydantic = UserSchema.model_validate(user)
-        return FeastService().load_items_new_user(user_pydantic, k=payload.num_recommendations)
+        return await AsyncFeastService().load_items_new_user(
+            user_pydantic, k=payload.num_recommendations
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
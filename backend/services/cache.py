@@ -0,0 +1,152 @@
+"""
+Small caching primitives shared by the backend services.
+
+``LRUCache`` is an in-process, thread-safe LRU with an optional TTL.
+``SqliteCacheTier`` is a string key/value store in a local SQLite file that
+several uvicorn workers on the same host can share.
+"""
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional
+
+_MISSING = object()
+
+
+class LRUCache:
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _lookup(self, key: Hashable, now: float) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return _MISSING
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= now:
+            del self._data[key]
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._lookup(key, time.monotonic())
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """Return the cached subset of ``keys``; absent keys count as misses."""
+        found = {}
+        with self._lock:
+            now = time.monotonic()
+            for key in keys:
+                value = self._lookup(key, now)
+                if value is _MISSING:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                    found[key] = value
+        return found
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self.put_many({key: value})
+
+    def put_many(self, items: Dict[Hashable, Any]) -> None:
+        with self._lock:
+            expires_at = time.monotonic() + self.ttl if self.ttl else None
+            for key, value in items.items():
+                self._data[key] = (value, expires_at)
+                self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, keys: Optional[Iterable[Hashable]] = None) -> None:
+        """Drop the given keys, or everything when ``keys`` is None."""
+        with self._lock:
+            if keys is None:
+                self._data.clear()
+                return
+            for key in keys:
+                self._data.pop(key, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class SqliteCacheTier:
+    # SQLite limits the number of bound parameters per statement
+    _CHUNK = 500
+
+    def __init__(self, path: str, ttl: float = 3600, table: str = "cache"):
+        self.path = path
+        self.ttl = ttl
+        self.table = table
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        keys = list(keys)
+        found = {}
+        conn = self._connection()
+        now = time.time()
+        for start in range(0, len(keys), self._CHUNK):
+            chunk = keys[start : start + self._CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT key, value FROM {self.table} "
+                f"WHERE key IN ({placeholders}) AND expires_at > ?",
+                (*chunk, now),
+            )
+            found.update(rows)
+        return found
+
+    def put_many(self, items: Dict[str, str]) -> None:
+        expires_at = time.time() + self.ttl
+        with self._connection() as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                [(key, value, expires_at) for key, value in items.items()],
+            )
+
+    def invalidate(self, keys: Optional[Iterable[str]] = None) -> None:
+        with self._connection() as conn:
+            if keys is None:
+                conn.execute(f"DELETE FROM {self.table}")
+                return
+            conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", [(k,) for k in keys])
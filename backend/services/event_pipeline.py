@@ -0,0 +1,309 @@
+"""
+Fire-and-forget event delivery for Kafka.
+
+Request handlers call ``publish`` which only enqueues the already-serialised
+message. A background thread drains the queue in batches (up to ``batch_size``
+messages or ``linger_ms`` after the first one), hands the batch to the
+producer and flushes once per batch. Messages that still fail after
+``max_retries`` attempts are appended to a spill file on local disk and
+replayed after the next successful batch. Messages that arrive while the
+queue is full are set aside in memory (up to another ``max_queue``, beyond
+that they are dropped and counted) and spilled by the background thread, so
+``publish`` never touches the disk.
+The spill file may be shared by every worker on a host: appends and replays
+hold an exclusive ``fcntl`` lock on ``<spill path>.lock``, and lines that
+cannot be decoded (e.g. torn by a crash mid-write) are moved to
+``<spill path>.corrupt`` instead of stopping delivery.
+"""
+
+import base64
+import fcntl
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+from services.metrics import LatencyHistogram, register_metrics_source
+
+KAFKA_EVENT_QUEUE_SIZE = int(os.getenv("KAFKA_EVENT_QUEUE_SIZE", "10000"))
+KAFKA_BATCH_SIZE = int(os.getenv("KAFKA_BATCH_SIZE", "500"))
+KAFKA_LINGER_MS = int(os.getenv("KAFKA_LINGER_MS", "50"))
+KAFKA_MAX_RETRIES = int(os.getenv("KAFKA_MAX_RETRIES", "3"))
+KAFKA_RETRY_BACKOFF_MS = int(os.getenv("KAFKA_RETRY_BACKOFF_MS", "200"))
+KAFKA_FLUSH_TIMEOUT = float(os.getenv("KAFKA_FLUSH_TIMEOUT", "10"))
+KAFKA_SPILL_PATH = os.getenv("KAFKA_SPILL_PATH", "/tmp/kafka-spill.jsonl")
+
+# (topic, value, enqueued_at)
+Event = Tuple[str, bytes, float]
+
+
+class EventPipeline:
+    def __init__(
+        self,
+        producer,
+        max_queue: int = KAFKA_EVENT_QUEUE_SIZE,
+        batch_size: int = KAFKA_BATCH_SIZE,
+        linger_ms: int = KAFKA_LINGER_MS,
+        max_retries: int = KAFKA_MAX_RETRIES,
+        retry_backoff_ms: int = KAFKA_RETRY_BACKOFF_MS,
+        flush_timeout: float = KAFKA_FLUSH_TIMEOUT,
+        spill_path: Optional[str] = KAFKA_SPILL_PATH,
+        name: str = "kafka_events",
+    ):
+        self.producer = producer
+        self.batch_size = batch_size
+        self.linger = linger_ms / 1000
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff_ms / 1000
+        self.flush_timeout = flush_timeout
+        self.spill_path = spill_path
+        self._queue: "queue.Queue[Event]" = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._spill_lock = threading.Lock()
+        # Guards the counters and the overflow list, updated from request,
+        # background-task and sender threads alike
+        self._lock = threading.Lock()
+        self._overflow: List[Event] = []
+        self._max_overflow = max_queue
+        self._thread: Optional[threading.Thread] = None
+        self._delivery_latency = LatencyHistogram()
+        self._counters = {
+            "enqueued": 0,
+            "sent": 0,
+            "batches": 0,
+            "retries": 0,
+            "spilled": 0,
+            "replayed": 0,
+            "corrupt": 0,
+            "dropped": 0,
+        }
+        register_metrics_source(name, self.metrics)
+
+    def start(self) -> "EventPipeline":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="event-pipeline", daemon=True)
+            self._thread.start()
+        return self
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += n
+
+    def publish(self, topic: str, value: bytes) -> None:
+        """Enqueue a message without waiting for the broker or the disk."""
+        event = (topic, value, time.perf_counter())
+        try:
+            self._queue.put_nowait(event)
+            self._count("enqueued")
+            return
+        except queue.Full:
+            pass
+        with self._lock:
+            if len(self._overflow) < self._max_overflow:
+                self._overflow.append(event)
+                return
+            self._counters["dropped"] += 1
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every enqueued message has been delivered or spilled."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks or self._overflow:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Drain the queue, flush the producer and stop the background thread."""
+        timeout = self.flush_timeout if timeout is None else timeout
+        if self._thread is not None:
+            self.flush(timeout)
+            self._stop.set()
+            self._thread.join(timeout)
+            self._thread = None
+        # Anything the thread could not deliver in time goes to disk
+        leftovers = []
+        while True:
+            try:
+                leftovers.append(self._queue.get_nowait())
+                self._queue.task_done()
+            except queue.Empty:
+                break
+        with self._lock:
+            leftovers.extend(self._overflow)
+            self._overflow = []
+        if leftovers:
+            self._spill(leftovers)
+        try:
+            self.producer.close(timeout)
+        except Exception as e:
+            print(f"[Kafka] Error closing producer: {e}")
+
+    def _run(self) -> None:
+        self._safe_replay()
+        while not self._stop.is_set():
+            self._spill_overflow()
+            batch = self._next_batch()
+            if not batch:
+                continue
+            try:
+                delivered = self._deliver(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if delivered:
+                self._safe_replay()
+
+    def _safe_replay(self) -> None:
+        # A replay failure must not stop the sender thread
+        try:
+            self._replay_spill()
+        except Exception as e:
+            print(f"[Kafka] Replaying spilled events failed: {e}")
+
+    def _spill_overflow(self) -> None:
+        with self._lock:
+            events = list(self._overflow)
+        if events:
+            self._spill(events)
+            with self._lock:
+                # publish only appends, so the spilled events are still the prefix
+                del self._overflow[: len(events)]
+
+    def _next_batch(self) -> List[Event]:
+        try:
+            batch = [self._queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.linger
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _deliver(self, batch: List[Event]) -> bool:
+        """Send a batch, retrying failed messages. Returns True if nothing was spilled."""
+        self._count("batches")
+        pending = batch
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count("retries", len(pending))
+                time.sleep(self.retry_backoff * 2 ** (attempt - 1))
+            pending = self._send_once(pending)
+            if not pending:
+                return True
+        self._spill(pending)
+        return False
+
+    def _send_once(self, events: List[Event]) -> List[Event]:
+        futures = []
+        failed = []
+        for event in events:
+            try:
+                futures.append((event, self.producer.send(event[0], event[1])))
+            except Exception as e:
+                print(f"[Kafka] Send failed: {e}")
+                failed.append(event)
+        try:
+            self.producer.flush(self.flush_timeout)
+        except Exception as e:
+            print(f"[Kafka] Flush failed: {e}")
+        now = time.perf_counter()
+        for event, future in futures:
+            if future.succeeded():
+                self._count("sent")
+                self._delivery_latency.observe(now - event[2])
+            else:
+                failed.append(event)
+        return failed
+
+    @contextmanager
+    def _spill_file_lock(self):
+        """Exclusive access to the spill file across threads and worker processes."""
+        with self._spill_lock, open(f"{self.spill_path}.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _spill(self, events: List[Event]) -> None:
+        if not self.spill_path:
+            self._count("dropped", len(events))
+            print(f"[Kafka] Dropped {len(events)} undeliverable events (spill disabled)")
+            return
+        try:
+            with self._spill_file_lock(), open(self.spill_path, "a") as f:
+                for topic, value, _ in events:
+                    record = {"topic": topic, "value": base64.b64encode(value).decode("ascii")}
+                    f.write(json.dumps(record) + "\n")
+            self._count("spilled", len(events))
+        except OSError as e:
+            self._count("dropped", len(events))
+            print(f"[Kafka] Could not spill {len(events)} events to {self.spill_path}: {e}")
+
+    def _take_spill(self) -> List[Event]:
+        """Read and remove the spill file; undecodable lines go to the .corrupt file."""
+        events, corrupt = [], []
+        with self._spill_file_lock():
+            if not os.path.exists(self.spill_path):
+                return []
+            with open(self.spill_path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        value = base64.b64decode(record["value"], validate=True)
+                        events.append((record["topic"], value, time.perf_counter()))
+                    except (ValueError, KeyError, TypeError):
+                        corrupt.append(line if line.endswith("\n") else line + "\n")
+            if corrupt:
+                with open(f"{self.spill_path}.corrupt", "a") as f:
+                    f.writelines(corrupt)
+            os.remove(self.spill_path)
+        if corrupt:
+            self._count("corrupt", len(corrupt))
+            print(
+                f"[Kafka] Moved {len(corrupt)} unreadable spilled events "
+                f"to {self.spill_path}.corrupt"
+            )
+        return events
+
+    def _replay_spill(self) -> None:
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return
+        events = self._take_spill()
+        if not events:
+            return
+        print(f"[Kafka] Replaying {len(events)} spilled events")
+        for start in range(0, len(events), self.batch_size):
+            chunk = events[start : start + self.batch_size]
+            failed = self._send_once(chunk)
+            self._count("replayed", len(chunk) - len(failed))
+            if failed:
+                # Broker is still unhealthy, keep the remainder on disk for later
+                self._spill(failed + events[start + self.batch_size :])
+                return
+
+    def metrics(self) -> dict:
+        spill_bytes = 0
+        if self.spill_path and os.path.exists(self.spill_path):
+            spill_bytes = os.path.getsize(self.spill_path)
+        with self._lock:
+            counters = dict(self._counters)
+            overflow = len(self._overflow)
+        return {
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "overflow_depth": overflow,
+            **counters,
+            "spill_bytes": spill_bytes,
+            "delivery_latency": self._delivery_latency.snapshot(),
+        }
@@ -0,0 +1,187 @@
+"""
+Wire encodings for the events KafkaService publishes.
+
+Two serializers share the same per-topic schemas, which are defined once at
+import time instead of being rebuilt for every message:
+
+* ``connect-json`` (default) - Kafka Connect JSON envelope
+  ``{"schema": ..., "payload": ...}``, byte-for-byte identical to the historical
+  format. The schema part is serialised once and spliced in front of each payload.
+* ``avro-binary`` - Confluent wire format: magic byte ``0``, 4-byte big-endian
+  schema ID, then the Avro binary encoding of the payload. No schema travels
+  with the message; consumers resolve it from the ID.
+
+Select with ``KAFKA_SERIALIZER``.
+"""
+
+import json
+import os
+import struct
+from typing import Any, Dict, List, Tuple
+
+INTERACTION_SCHEMA: Dict[str, Any] = {
+    "type": "struct",
+    "fields": [
+        {"field": "user_id", "type": "string", "optional": False},
+        {"field": "item_id", "type": "string", "optional": False},
+        {"field": "timestamp", "type": "string", "optional": False, "format": "timestamp"},
+        {"field": "interaction_type", "type": "string", "optional": False},
+        {"field": "rating", "type": "float64", "optional": True},
+        {"field": "quantity", "type": "float64", "optional": True},
+        {"field": "interaction_id", "type": "string", "optional": False},
+        {"field": "review_title", "type": "string", "optional": True},
+        {"field": "review_content", "type": "string", "optional": True},
+    ],
+    "optional": False,
+    "name": "interaction",
+}
+
+NEW_USER_SCHEMA: Dict[str, Any] = {
+    "type": "struct",
+    "fields": [
+        {"field": "user_id", "type": "string", "optional": False},
+        {"field": "user_name", "type": "string", "optional": False},
+        {"field": "preferences", "type": "string", "optional": False},
+        {"field": "signup_date", "type": "string", "optional": False, "format": "timestamp"},
+    ],
+    "optional": False,
+    "name": "new-users",
+}
+
+TOPIC_SCHEMAS: Dict[str, Dict[str, Any]] = {
+    "interactions": INTERACTION_SCHEMA,
+    "new-users": NEW_USER_SCHEMA,
+}
+
+# Schema IDs for the binary header; must match the IDs consumers are configured with
+TOPIC_SCHEMA_IDS: Dict[str, int] = {
+    "interactions": int(os.getenv("KAFKA_SCHEMA_ID_INTERACTIONS", "1")),
+    "new-users": int(os.getenv("KAFKA_SCHEMA_ID_NEW_USERS", "2")),
+}
+
+_AVRO_TYPES = {"string": "string", "float64": "double"}
+
+
+class ConnectJsonSerializer:
+    name = "connect-json"
+
+    def __init__(self, schemas: Dict[str, Dict[str, Any]] = TOPIC_SCHEMAS):
+        self._prefixes = {
+            topic: b'{"schema": ' + json.dumps(schema).encode("utf-8") + b', "payload": '
+            for topic, schema in schemas.items()
+        }
+
+    def encode(self, topic: str, payload: Dict[str, Any]) -> bytes:
+        return self._prefixes[topic] + json.dumps(payload).encode("utf-8") + b"}"
+
+    def decode(self, topic: str, value: bytes) -> Dict[str, Any]:
+        return json.loads(value)["payload"]
+
+
+def to_avro_schema(connect_schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Translate a Connect struct schema into the equivalent Avro record schema."""
+    fields = []
+    for field in connect_schema["fields"]:
+        avro_type = _AVRO_TYPES[field["type"]]
+        if field["optional"]:
+            fields.append({"name": field["field"], "type": ["null", avro_type], "default": None})
+        else:
+            fields.append({"name": field["field"], "type": avro_type})
+    return {
+        "type": "record",
+        "name": connect_schema["name"].replace("-", "_"),
+        "fields": fields,
+    }
+
+
+def _write_long(out: bytearray, value: int) -> None:
+    value = (value << 1) ^ (value >> 63)  # zig-zag
+    while value & ~0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_long(data: bytes, pos: int) -> Tuple[int, int]:
+    shift = 0
+    value = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            break
+        shift += 7
+    return (value >> 1) ^ -(value & 1), pos
+
+
+_DOUBLE = struct.Struct("<d")
+_HEADER = struct.Struct(">bI")
+
+
+class AvroBinarySerializer:
+    name = "avro-binary"
+
+    def __init__(
+        self,
+        schemas: Dict[str, Dict[str, Any]] = TOPIC_SCHEMAS,
+        schema_ids: Dict[str, int] = TOPIC_SCHEMA_IDS,
+    ):
+        self.avro_schemas = {topic: to_avro_schema(schema) for topic, schema in schemas.items()}
+        self._headers = {topic: _HEADER.pack(0, schema_ids[topic]) for topic in schemas}
+        self._topics_by_id = {schema_ids[topic]: topic for topic in schemas}
+        self._fields: Dict[str, List[Tuple[str, str, bool]]] = {
+            topic: [(f["field"], f["type"], f["optional"]) for f in schema["fields"]]
+            for topic, schema in schemas.items()
+        }
+
+    def encode(self, topic: str, payload: Dict[str, Any]) -> bytes:
+        out = bytearray(self._headers[topic])
+        for name, kind, optional in self._fields[topic]:
+            value = payload.get(name)
+            if optional:
+                if value is None:
+                    out.append(0)  # union branch 0: null
+                    continue
+                out.append(2)  # union branch 1, zig-zag encoded
+            if kind == "string":
+                encoded = str(value).encode("utf-8")
+                _write_long(out, len(encoded))
+                out += encoded
+            else:
+                out += _DOUBLE.pack(float(value))
+        return bytes(out)
+
+    def decode(self, topic: str, value: bytes) -> Dict[str, Any]:
+        magic, schema_id = _HEADER.unpack_from(value)
+        if magic != 0 or self._topics_by_id.get(schema_id) != topic:
+            raise ValueError(f"Unexpected header magic={magic} schema_id={schema_id}")
+        pos = _HEADER.size
+        payload: Dict[str, Any] = {}
+        for name, kind, optional in self._fields[topic]:
+            if optional:
+                branch, pos = _read_long(value, pos)
+                if branch == 0:
+                    payload[name] = None
+                    continue
+            if kind == "string":
+                length, pos = _read_long(value, pos)
+                payload[name] = value[pos : pos + length].decode("utf-8")
+                pos += length
+            else:
+                payload[name] = _DOUBLE.unpack_from(value, pos)[0]
+                pos += _DOUBLE.size
+        return payload
+
+
+SERIALIZERS = {
+    ConnectJsonSerializer.name: ConnectJsonSerializer,
+    AvroBinarySerializer.name: AvroBinarySerializer,
+}
+
+
+def get_serializer(name: str = None):
+    name = name or os.getenv("KAFKA_SERIALIZER", ConnectJsonSerializer.name)
+    if name not in SERIALIZERS:
+        raise ValueError(f"Unknown KAFKA_SERIALIZER '{name}', expected one of {list(SERIALIZERS)}")
+    return SERIALIZERS[name]()
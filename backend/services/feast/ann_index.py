@@ -0,0 +1,264 @@
+"""
+In-process approximate nearest-neighbour search over item embeddings.
+
+``IVFIndex`` is an inverted-file index: vectors are assigned to the nearest of
+``nlist`` k-means centroids and a query only scans the ``nprobe`` closest
+lists. ``nprobe`` trades recall for latency at query time; ``nprobe == nlist``
+is an exact search. Vectors are L2-normalised so scores are cosine
+similarities, matching the pgvector retrieval they replace.
+
+``AnnIndexRegistry`` loads named index snapshots (``<name>.npz``) from
+``ANN_INDEX_DIR`` at startup. Build a snapshot from an embeddings parquet:
+
+    python -m services.feast.ann_index --parquet item_embeddings.parquet \\
+        --id-column item_id --vector-column embedding --name item --out-dir $ANN_INDEX_DIR
+"""
+
+import argparse
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from services.metrics import LatencyHistogram, register_metrics_source
+
+ANN_INDEX_DIR = os.getenv("ANN_INDEX_DIR")
+ANN_NLIST = int(os.getenv("ANN_NLIST", "0"))  # 0: about sqrt(n) lists
+ANN_NPROBE = int(os.getenv("ANN_NPROBE", "8"))
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    if k >= len(scores):
+        return np.argsort(-scores)
+    candidates = np.argpartition(-scores, k)[:k]
+    return candidates[np.argsort(-scores[candidates])]
+
+
+class IVFIndex:
+    def __init__(self, dim: int, nlist: int = ANN_NLIST, nprobe: int = ANN_NPROBE):
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.centroids = np.zeros((0, dim), dtype=np.float32)
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._lists: List[np.ndarray] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @classmethod
+    def build(
+        cls,
+        ids: Iterable,
+        vectors: np.ndarray,
+        nlist: int = ANN_NLIST,
+        nprobe: int = ANN_NPROBE,
+        iterations: int = 10,
+        seed: int = 0,
+    ) -> "IVFIndex":
+        vectors = _normalize(vectors)
+        index = cls(vectors.shape[1], nlist or max(1, int(np.sqrt(len(vectors)))), nprobe)
+        index.train(vectors, iterations=iterations, seed=seed)
+        index.add(ids, vectors)
+        return index
+
+    def train(self, vectors: np.ndarray, iterations: int = 10, seed: int = 0) -> None:
+        """Fit the coarse quantizer with spherical k-means."""
+        vectors = _normalize(vectors)
+        nlist = max(1, min(self.nlist, len(vectors)))
+        rng = np.random.default_rng(seed)
+        centroids = vectors[rng.choice(len(vectors), nlist, replace=False)]
+        for _ in range(iterations):
+            assignment = np.argmax(vectors @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, vectors)
+            empty = np.bincount(assignment, minlength=nlist) == 0
+            # Re-seed empty lists so every centroid stays useful
+            sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+            centroids = _normalize(sums)
+        with self._lock:
+            self.nlist = nlist
+            self.centroids = centroids
+            self._compact_locked()
+
+    def _compact_locked(self) -> None:
+        """Drop the rows of removed or replaced vectors and rebuild the lists."""
+        live = np.array(sorted(self._rows.values()), dtype=np.int64)
+        self._vectors = self._vectors[live]
+        self._ids = [self._ids[row] for row in live.tolist()]
+        self._rows = {item_id: row for row, item_id in enumerate(self._ids)}
+        rows = np.arange(len(self._ids), dtype=np.int64)
+        assignment = (
+            np.argmax(self._vectors @ self.centroids.T, axis=1)
+            if len(rows)
+            else np.zeros(0, dtype=np.int64)
+        )
+        self._lists = [rows[assignment == c] for c in range(len(self.centroids))]
+
+    def add(self, ids: Iterable, vectors: np.ndarray) -> None:
+        """Add or replace vectors. Requires a trained index."""
+        ids = [str(item_id) for item_id in ids]
+        vectors = _normalize(vectors).reshape(len(ids), self.dim)
+        with self._lock:
+            self._remove_locked(ids)
+            start = len(self._ids)
+            rows = np.arange(start, start + len(ids), dtype=np.int64)
+            self._vectors = np.concatenate([self._vectors, vectors])
+            self._ids.extend(ids)
+            self._rows.update(zip(ids, rows.tolist()))
+            assignment = np.argmax(vectors @ self.centroids.T, axis=1)
+            lists = list(self._lists)
+            for c in np.unique(assignment):
+                lists[c] = np.concatenate([lists[c], rows[assignment == c]])
+            self._lists = lists
+
+    def remove(self, ids: Iterable) -> None:
+        with self._lock:
+            self._remove_locked([str(item_id) for item_id in ids])
+
+    def _remove_locked(self, ids: List[str]) -> None:
+        rows = [self._rows.pop(item_id) for item_id in ids if item_id in self._rows]
+        if not rows:
+            return
+        dead = np.array(rows, dtype=np.int64)
+        self._lists = [rows_[~np.isin(rows_, dead)] for rows_ in self._lists]
+        # Removed and replaced vectors leave dead rows behind; reclaim them
+        # once they outnumber the live ones
+        if len(self._ids) > 2 * len(self._rows):
+            self._compact_locked()
+
+    def search(
+        self, query: np.ndarray, k: int, nprobe: Optional[int] = None
+    ) -> Tuple[List[str], np.ndarray]:
+        """Return the ids and cosine scores of the top-k neighbours of ``query``."""
+        query = _normalize(query).reshape(self.dim)
+        # Writers replace these (ids only ever grow in place), so a consistent
+        # snapshot is enough to search without holding the lock
+        with self._lock:
+            centroids, lists, vectors, ids = self.centroids, self._lists, self._vectors, self._ids
+        nprobe = min(nprobe or self.nprobe, len(lists))
+        probes = _top_k(centroids @ query, nprobe)
+        rows = np.concatenate([lists[c] for c in probes]) if nprobe else np.zeros(0, np.int64)
+        scores = vectors[rows] @ query
+        best = _top_k(scores, k)
+        return [ids[row] for row in rows[best].tolist()], scores[best]
+
+    def score(self, ids: Iterable, query: np.ndarray) -> np.ndarray:
+        """Cosine scores of ``query`` against the vectors of ids; NaN for unknown ids."""
+        query = _normalize(query).reshape(self.dim)
+        with self._lock:
+            rows = np.array([self._rows.get(str(i), -1) for i in ids], dtype=np.int64)
+            known = rows >= 0
+            scores = np.full(len(rows), np.nan, dtype=np.float32)
+            scores[known] = self._vectors[rows[known]] @ query
+        return scores
+
+    def save(self, path: str) -> None:
+        with self._lock:
+            self._compact_locked()
+            np.savez(
+                path,
+                ids=np.array(self._ids, dtype=str),
+                vectors=self._vectors,
+                centroids=self.centroids,
+                nprobe=self.nprobe,
+            )
+
+    @classmethod
+    def load(cls, path: str, nprobe: Optional[int] = None) -> "IVFIndex":
+        data = np.load(path)
+        centroids = data["centroids"]
+        index = cls(centroids.shape[1], len(centroids), nprobe or int(data["nprobe"]))
+        index.centroids = centroids
+        index._lists = [np.zeros(0, dtype=np.int64) for _ in range(len(centroids))]
+        index.add(data["ids"].tolist(), data["vectors"])
+        return index
+
+
+class AnnIndexRegistry:
+    """Named indexes (``item``, ``text``, ``image``) shared by the search paths."""
+
+    def __init__(self, directory: Optional[str] = ANN_INDEX_DIR):
+        self.directory = directory
+        self.indexes: Dict[str, IVFIndex] = {}
+        self._latency: Dict[str, LatencyHistogram] = {}
+        register_metrics_source("ann_index", self.stats)
+
+    def load_all(self) -> None:
+        if not self.directory or not os.path.isdir(self.directory):
+            return
+        for filename in sorted(os.listdir(self.directory)):
+            if filename.endswith(".npz"):
+                name = filename[: -len(".npz")]
+                self.register(name, IVFIndex.load(os.path.join(self.directory, filename)))
+                print(f"[ANN] Loaded index '{name}' with {len(self.indexes[name])} vectors")
+
+    def register(self, name: str, index: IVFIndex) -> None:
+        self._latency.setdefault(name, LatencyHistogram())
+        self.indexes[name] = index
+
+    def get(self, name: str) -> Optional[IVFIndex]:
+        return self.indexes.get(name)
+
+    def search(self, name: str, query, k: int) -> Optional[List[str]]:
+        """Return top-k ids from the named index, or None if it is not loaded."""
+        index = self.indexes.get(name)
+        if index is None:
+            return None
+        with self._latency[name].time():
+            ids, _ = index.search(np.asarray(query, dtype=np.float32), k)
+        return ids
+
+    def score(self, name: str, query, ids: List) -> Optional[np.ndarray]:
+        """Scores of ids against query in the named index, or None if it is not loaded."""
+        index = self.indexes.get(name)
+        if index is None:
+            return None
+        return index.score(ids, np.asarray(query, dtype=np.float32))
+
+    def stats(self) -> dict:
+        return {
+            name: {
+                "size": len(index),
+                "nlist": index.nlist,
+                "nprobe": index.nprobe,
+                "latency": self._latency[name].snapshot(),
+            }
+            for name, index in self.indexes.items()
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build an ANN index snapshot")
+    parser.add_argument("--parquet", required=True)
+    parser.add_argument("--id-column", default="item_id")
+    parser.add_argument("--vector-column", default="embedding")
+    parser.add_argument("--name", default="item")
+    parser.add_argument("--nlist", type=int, default=ANN_NLIST)
+    parser.add_argument("--nprobe", type=int, default=ANN_NPROBE)
+    parser.add_argument("--out-dir", required=True)
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    frame = pd.read_parquet(args.parquet, columns=[args.id_column, args.vector_column])
+    vectors = np.stack(frame[args.vector_column].to_numpy())
+    index = IVFIndex.build(frame[args.id_column].tolist(), vectors, args.nlist, args.nprobe)
+    os.makedirs(args.out_dir, exist_ok=True)
+    path = os.path.join(args.out_dir, f"{args.name}.npz")
+    index.save(path)
+    print(f"Wrote {path}: {len(index)} vectors, dim={index.dim}, nlist={index.nlist}")
+
+
+if __name__ == "__main__":
+    main()
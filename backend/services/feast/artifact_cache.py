@@ -0,0 +1,78 @@
+"""
+Local disk cache for model artefacts stored in MinIO.
+
+Objects are kept under ``MODEL_CACHE_DIR/<bucket>/<object>`` next to a
+``.etag`` file recording the checksum they were downloaded with. A fetch
+only re-downloads when the object's ETag changed, and falls back to the
+cached copy when MinIO cannot be reached. Files are written to a temporary
+name and renamed, so workers sharing the directory never read a partial file.
+"""
+
+import os
+from typing import Optional
+
+from minio import Minio
+
+from services.metrics import register_metrics_source
+
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", "/tmp/model-cache")
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def _write_atomic(path: str, content: str) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+class ArtifactCache:
+    def __init__(self, directory: str = MODEL_CACHE_DIR):
+        self.directory = directory
+        self.hits = 0
+        self.downloads = 0
+        self.offline_hits = 0
+        register_metrics_source("model_artifacts", self.stats)
+
+    def fetch(self, client: Minio, bucket_name: str, object_name: str) -> str:
+        """Return a local path holding the current content of bucket_name/object_name."""
+        path = os.path.join(self.directory, bucket_name, object_name)
+        etag_path = f"{path}.etag"
+        cached_etag = _read(etag_path) if os.path.exists(path) else None
+
+        try:
+            etag = client.stat_object(bucket_name, object_name).etag
+        except Exception as e:
+            if cached_etag is None:
+                raise
+            print(f"[Artifacts] Could not stat {bucket_name}/{object_name} ({e}), using cache")
+            self.offline_hits += 1
+            return path
+
+        if etag == cached_etag:
+            self.hits += 1
+            return path
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.part"
+        client.fget_object(bucket_name, object_name, tmp_path)
+        os.replace(tmp_path, path)
+        _write_atomic(etag_path, etag)
+        self.downloads += 1
+        print(f"[Artifacts] Downloaded {bucket_name}/{object_name} to {path}")
+        return path
+
+    def stats(self) -> dict:
+        return {
+            "directory": self.directory,
+            "hits": self.hits,
+            "downloads": self.downloads,
+            "offline_hits": self.offline_hits,
+        }
@@ -0,0 +1,77 @@
+from typing import Dict, List, Optional
+
+from models import Product, User
+from services.feast.feast_service import FeastService
+from services.image_fetcher import ImageFetcher
+from services.inference_executor import InferenceExecutor
+
+
+class AsyncFeastService:
+    """
+    Awaitable facade over FeastService for use from async route handlers.
+
+    Every call, including the first FeastService() construction, runs on a
+    bounded InferenceExecutor so model encoding and online-store reads never
+    block the event loop.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(AsyncFeastService, cls).__new__(cls)
+            cls._instance.executor = InferenceExecutor()
+        return cls._instance
+
+    @classmethod
+    def shutdown(cls) -> None:
+        if cls._instance is not None:
+            cls._instance.executor.shutdown()
+            cls._instance = None
+
+    async def _call(self, method: str, *args, **kwargs):
+        def invoke():
+            return getattr(FeastService(), method)(*args, **kwargs)
+
+        return await self.executor.run(invoke)
+
+    async def load_items_existing_user(self, user_id: str) -> List[Product]:
+        return await self._call("load_items_existing_user", user_id)
+
+    async def load_items_new_user(self, user: User, k: int = 10) -> List[Product]:
+        return await self._call("load_items_new_user", user, k=k)
+
+    async def search_item_by_text(self, text: str, k: int = 5) -> List[Product]:
+        return await self._call("search_item_by_text", text, k)
+
+    async def search_item_by_image_link(self, image_link: str, k: int = 5) -> List[Product]:
+        # Download once on the event loop, decode and encode on the executor
+        content = await ImageFetcher().fetch(image_link)
+        return await self.search_item_by_image_bytes(content, k)
+
+    async def search_item_by_image_bytes(self, content: bytes, k: int = 5) -> List[Product]:
+        return await self._call("search_item_by_image_bytes", content, k)
+
+    async def search_items_by_images(
+        self, contents: List[bytes], k: int = 5
+    ) -> List[List[Product]]:
+        return await self._call("search_items_by_images", contents, k)
+
+    async def get_item_by_id(self, item_id: str) -> Product:
+        return await self._call("get_item_by_id", item_id)
+
+    async def get_items_by_ids(self, item_ids: List[str]) -> Dict[str, Product]:
+        return await self._call("get_items_by_ids", item_ids)
+
+    async def hybrid_search(
+        self,
+        user: User,
+        text: Optional[str] = None,
+        image: Optional[bytes] = None,
+        k: int = 10,
+        weights: Optional[Dict[str, float]] = None,
+        method: str = "rrf",
+    ) -> List[Product]:
+        return await self._call(
+            "hybrid_search", user, text=text, image=image, k=k, weights=weights, method=method
+        )
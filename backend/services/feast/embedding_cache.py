@@ -0,0 +1,74 @@
+"""
+Memoized user-tower embeddings.
+
+The user embedding only depends on the preprocessed features and the encoder
+weights, so entries are keyed by a fingerprint of both: users with identical
+feature tuples share an entry, and a new model version never reads an
+embedding produced by the previous one. The cache also remembers the last
+fingerprint seen per user so a preferences update can drop it eagerly.
+"""
+
+import hashlib
+import os
+from typing import Hashable, List, Mapping, Optional
+
+import numpy as np
+import torch
+
+from services.cache import LRUCache
+from services.metrics import register_metrics_source
+
+USER_EMBEDDING_CACHE_SIZE = int(os.getenv("USER_EMBEDDING_CACHE_SIZE", "10000"))
+
+
+def _feature_bytes(value) -> bytes:
+    if isinstance(value, torch.Tensor):
+        value = value.detach().cpu().numpy()
+    if isinstance(value, np.ndarray):
+        array = np.ascontiguousarray(value)
+        return f"{array.dtype.str}{array.shape}".encode() + array.tobytes()
+    return repr(value).encode("utf-8")
+
+
+def feature_fingerprint(features: Mapping[str, object], model_version) -> str:
+    """Stable hash of one user's preprocessed features under ``model_version``."""
+    digest = hashlib.blake2b(str(model_version).encode("utf-8"), digest_size=16)
+    for name in sorted(features):
+        digest.update(name.encode("utf-8"))
+        digest.update(_feature_bytes(features[name]))
+    return digest.hexdigest()
+
+
+class UserEmbeddingCache:
+    def __init__(self, maxsize: int = USER_EMBEDDING_CACHE_SIZE):
+        self.embeddings = LRUCache(maxsize=maxsize)
+        # Bounded like the embeddings: users idle long enough to be evicted here
+        # only lose eager invalidation, their stale entry ages out of the LRU
+        self._user_keys = LRUCache(maxsize=maxsize)
+        self.invalidations = 0
+        register_metrics_source("user_embedding_cache", self.stats)
+
+    def get(self, key: str) -> Optional[List[float]]:
+        return self.embeddings.get(key)
+
+    def put(self, key: str, embedding: List[float], user_id: Hashable = None) -> None:
+        self.embeddings.put(key, embedding)
+        if user_id is not None:
+            self._user_keys.put(user_id, key)
+
+    def forget_user(self, user_id: Hashable) -> None:
+        """Drop the embedding last computed for ``user_id``, e.g. after a profile change."""
+        key = self._user_keys.get(user_id)
+        if key is not None:
+            self._user_keys.invalidate([user_id])
+            self.embeddings.invalidate([key])
+            self.invalidations += 1
+
+    def invalidate(self) -> None:
+        """Drop every embedding, e.g. when a new encoder version is loaded."""
+        self._user_keys.invalidate()
+        self.embeddings.invalidate()
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        return {**self.embeddings.stats(), "invalidations": self.invalidations}
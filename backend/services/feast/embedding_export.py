@@ -0,0 +1,99 @@
+"""
+Export item embeddings computed by the in-process query encoders, so the
+ANN indexes they search hold vectors from the same model:
+
+    python -m services.feast.embedding_export image --out item_image_embeddings.parquet
+    python -m services.feast.ann_index --parquet item_image_embeddings.parquet \\
+        --name image --out-dir $ANN_INDEX_DIR
+
+``text`` embeds each item's name, category and description with the BGE
+query encoder; a ``text`` index built from it switches text search to
+batched in-process query encoding.
+
+Writes a parquet of ``item_id`` and ``embedding`` for the items parquet
+(the bundled catalogue by default). Items whose image cannot be fetched or
+decoded are skipped and reported.
+"""
+
+import argparse
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+import httpx
+import numpy as np
+import pandas as pd
+
+from services.feast.image_preprocess import prepare_image
+
+ITEMS_PARQUET = Path(__file__).parent / "data" / "recommendation_items.parquet"
+ITEM_TEXT_FIELDS = ("product_name", "category", "about_product")
+
+
+def _batches(rows: List, size: int):
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
+
+def item_text(item: dict) -> str:
+    """Name, category path and description of an item as one passage."""
+    values = (item.get(field) for field in ITEM_TEXT_FIELDS)
+    return ". ".join(
+        value.replace("|", " ") for value in values if isinstance(value, str) and value
+    )
+
+
+def text_embeddings(
+    items: pd.DataFrame, encoder: Callable, batch_size: int = 32
+) -> Tuple[List[str], np.ndarray]:
+    """Embed the text of every item."""
+    ids = [str(item_id) for item_id in items["item_id"]]
+    texts = [item_text(item) for item in items.to_dict("records")]
+    embeddings = [vector for batch in _batches(texts, batch_size) for vector in encoder(batch)]
+    return ids, np.stack(embeddings) if embeddings else np.zeros((0, 0), dtype=np.float32)
+
+
+def image_embeddings(
+    items: pd.DataFrame, encoder: Callable, batch_size: int = 32, timeout: float = 10.0
+) -> Tuple[List[str], np.ndarray]:
+    """Embed the image at each item's img_link; returns the ids that succeeded."""
+    ids, images = [], []
+    with httpx.Client(timeout=timeout, follow_redirects=True) as client:
+        for item_id, url in zip(items["item_id"], items["img_link"]):
+            try:
+                response = client.get(url)
+                response.raise_for_status()
+                images.append(prepare_image(response.content))
+                ids.append(str(item_id))
+            except Exception as e:
+                print(f"[Export] Skipping {item_id}: {e}")
+    embeddings = [vector for batch in _batches(images, batch_size) for vector in encoder(batch)]
+    return ids, np.stack(embeddings) if embeddings else np.zeros((0, 0), dtype=np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export item embeddings for an ANN index")
+    parser.add_argument("kind", choices=["image", "text"])
+    parser.add_argument("--items", default=str(ITEMS_PARQUET))
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+
+    from services.feast.feast_service import CLIP_MODEL_NAME, EMBEDDING_MODEL
+    from services.feast.image_search import ImageQueryEncoder
+    from services.feast.text_search import TextQueryEncoder
+
+    items = pd.read_parquet(args.items)
+    if args.kind == "text":
+        ids, embeddings = text_embeddings(
+            items, TextQueryEncoder(EMBEDDING_MODEL), batch_size=args.batch_size
+        )
+    else:
+        ids, embeddings = image_embeddings(
+            items, ImageQueryEncoder(CLIP_MODEL_NAME), batch_size=args.batch_size
+        )
+    pd.DataFrame({"item_id": ids, "embedding": list(embeddings)}).to_parquet(args.out)
+    print(f"Wrote {args.out}: {len(ids)} of {len(items)} items")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,11 @@
 import json
 import os
-from io import BytesIO
+from datetime import date
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
-import requests
 import torch
 from feast import FeatureStore
 from minio import Minio
@@ -18,10 +18,138 @@ from recsysapp.service.search_by_image import SearchByImageService
 from recsysapp.service.search_by_text import SearchService
 
 from models import Product, User
+from services.cache import LRUCache
+from services.feast.ann_index import AnnIndexRegistry
+from services.feast.artifact_cache import ArtifactCache
+from services.feast.embedding_cache import UserEmbeddingCache, feature_fingerprint
+from services.feast.hybrid_search import (
+    DEFAULT_WEIGHTS,
+    HYBRID_SEARCH_CANDIDATES,
+    cosine_scores,
+    fuse_rankings,
+    popularity_ranking,
+    score_ranking,
+)
+from services.feast.image_preprocess import image_digest, prepare_image
+from services.feast.image_search import IMAGE_INDEX, ImageQueryEncoder
+from services.feast.inference_backend import (
+    configure_threads,
+    fixed_pixels,
+    optimize_module,
+    quantize_attributes,
+)
+from services.feast.micro_batcher import MicroBatcher
+from services.feast.model_reloader import ModelVersionWatcher, VersionedModel
+from services.feast.product_cache import ProductCache
+from services.feast.product_mapping import products_from_frame
+from services.feast.recommendation_snapshot import RecommendationSnapshotStore
+from services.feast.shared_weights import (
+    SHARED_WEIGHTS_DIR,
+    build_shared_module,
+    share_module_attributes,
+    share_nested_modules,
+)
+from services.feast.text_search import TEXT_INDEX, TextQueryEncoder, TextSearchEngine
+from services.metrics import LatencyHistogram, register_metrics_source
+from services.startup import ComponentLoader
 
 EMBEDDING_MODEL = "BAAI/bge-small-en-v1.5"
+# Item-tower vectors, the same ones pgvector searches for new-user retrieval
+ITEM_EMBEDDING_FEATURE = "item_embedding:embedding"
 CLIP_MODEL_NAME = "openai/clip-vit-base-patch32"
 CLIP_MODEL_SIZE = 512
+# 0 disables hot reload: the startup model version is served until restart
+MODEL_VERSION_POLL_SECONDS = float(os.getenv("MODEL_VERSION_POLL_SECONDS", "60"))
+USER_ENCODER_MAX_BATCH = int(os.getenv("USER_ENCODER_MAX_BATCH", "32"))
+USER_ENCODER_MAX_WAIT_MS = float(os.getenv("USER_ENCODER_MAX_WAIT_MS", "5"))
+# Bundled users whose encodings must survive an inference backend change
+INFERENCE_DRIFT_SAMPLES = int(os.getenv("INFERENCE_DRIFT_SAMPLES", "32"))
+DATA_DIR = Path(__file__).parent / "data"
+# Image search results memoized by image content hash
+IMAGE_SEARCH_CACHE_SIZE = int(os.getenv("IMAGE_SEARCH_CACHE_SIZE", "1024"))
+IMAGE_SEARCH_CACHE_TTL_SECONDS = float(os.getenv("IMAGE_SEARCH_CACHE_TTL_SECONDS", "600"))
+# Loaded on first use instead of at startup; requests return 503 until ready
+FEAST_LAZY_COMPONENTS = {
+    name.strip()
+    for name in os.getenv(
+        "FEAST_LAZY_COMPONENTS", "clip_encoder,image_search,image_encoder"
+    ).split(",")
+    if name.strip()
+}
+
+
+# Synthetic user run through a new encoder before it is swapped in
+_WARMUP_USER = User(
+    user_id="warmup",
+    email="warmup@localhost",
+    age=30,
+    gender="Other",
+    signup_date=date(2024, 1, 1),
+    preferences="Electronics",
+)
+
+
+def _drift_samples(count: int = INFERENCE_DRIFT_SAMPLES) -> List[dict]:
+    """
+    Preprocessed features of bundled users, one sample per user plus one
+    sample of all of them collated the way the micro-batcher does, for
+    checking an optimized user encoder against float32 at batch sizes above
+    one. Profile fields the parquet does not carry are taken from the warmup user.
+    """
+    defaults = _WARMUP_USER.model_dump()
+    try:
+        users = pd.read_parquet(DATA_DIR / "recommendation_users.parquet").head(count)
+        rows = [
+            {
+                **defaults,
+                "user_id": str(user.user_id),
+                "signup_date": pd.Timestamp(user.signup_date).date(),
+                "preferences": user.preferences or defaults["preferences"],
+            }
+            for user in users.itertuples()
+        ]
+        samples = [data_preproccess(pd.DataFrame([row])) for row in rows]
+    except Exception as e:
+        print(
+            f"[Inference] Could not prepare bundled users, checking drift on the warmup user: {e}"
+        )
+        return [data_preproccess(pd.DataFrame([defaults]))]
+    if len(samples) > 1:
+        try:
+            samples.append(_collate_features(samples))
+        except TypeError as e:
+            print(f"[Inference] Checking drift on single users only: {e}")
+    return samples
+
+
+def _probe_queries(count: int = 16) -> List[str]:
+    """Bundled product names used to check an optimized text encoder."""
+    try:
+        items = pd.read_parquet(
+            DATA_DIR / "recommendation_items.parquet", columns=["product_name"]
+        )
+        return items["product_name"].head(count).tolist()
+    except Exception:
+        return [_WARMUP_USER.preferences]
+
+
+def _collate(values: list):
+    """
+    Stack one preprocessed feature of several users along the batch dimension.
+    """
+    first = values[0]
+    if isinstance(first, torch.Tensor):
+        return torch.cat(values)
+    if isinstance(first, (list, tuple)):
+        return [row for value in values for row in value]
+    if all(value == first for value in values):
+        return first
+    raise TypeError(f"Cannot batch preprocessed feature of type {type(first).__name__}")
+
+
+def _collate_features(features: List[dict]) -> dict:
+    """Collate the preprocessed features of several users into one encoder batch."""
+    return {name: _collate([user[name] for user in features]) for name in features[0]}
 
 
 class FeastService:
@@ -33,22 +161,131 @@ class FeastService:
             cls._instance._initialized = False
         return cls._instance
 
+    @classmethod
+    def loaded(cls) -> Optional["FeastService"]:
+        """
+        Return the initialized service, or None if no request has loaded it yet.
+        """
+        instance = cls._instance
+        return instance if instance is not None and instance._initialized else None
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """
+        Stop the background threads of the loaded service (batchers, model watcher).
+        """
+        instance = cls.loaded()
+        if instance is None:
+            return
+        instance.user_batcher.close()
+        text_search = instance.components.loaded("text_search")
+        if text_search is not None:
+            text_search.close()
+        watcher = getattr(instance, "model_version_watcher", None)
+        if watcher is not None:
+            watcher.stop()
+
     def __init__(self):
         if not self._initialized:
-
-            self.store = FeatureStore(str(Path(__file__).parent))
             self._initialized = True
-            self.user_encoder = self._load_user_encoder()
-            self.user_service = self.store.get_feature_service("user_service")
-            self.dataset_provider = LocalDatasetProvider(
-                self.store, data_dir="services/feast/data"
-            )  # TODO: remove path when Feast is the issue
-            print("[Feast] Initializing ClipEncoder...")
-            self.clip_encoder = ClipEncoder()
-            print("[Feast] ClipEncoder initialized.")
-            print("[Feast] Initializing SearchByImageService...")
-            self.search_by_image_service = SearchByImageService(self.store, self.clip_encoder)
-            print("[Feast] SearchByImageService initialized.")
+            self.user_embeddings = UserEmbeddingCache()
+            self.user_batcher = MicroBatcher(
+                self._encode_users,
+                max_batch_size=USER_ENCODER_MAX_BATCH,
+                max_wait_ms=USER_ENCODER_MAX_WAIT_MS,
+                name="user_encoder_batcher",
+            )
+            self.product_cache = ProductCache()
+            self.artifacts = ArtifactCache()
+            configure_threads()
+            self.image_results = LRUCache(
+                maxsize=IMAGE_SEARCH_CACHE_SIZE, ttl=IMAGE_SEARCH_CACHE_TTL_SECONDS
+            )
+            self.image_preprocess = LatencyHistogram()
+            register_metrics_source(
+                "image_search",
+                lambda: {
+                    "result_cache": self.image_results.stats(),
+                    "preprocess": self.image_preprocess.snapshot(),
+                },
+            )
+            # Components load concurrently in the background; each one waits
+            # only for the components it reads through the properties below
+            self.components = ComponentLoader(name="feast_startup")
+            factories = {
+                "feature_store": lambda: FeatureStore(str(Path(__file__).parent)),
+                "model_version": self._load_model_version,
+                "user_encoder": self._load_serving_encoder,
+                "recommendation_snapshots": self._load_recommendation_snapshots,
+                "ann_indexes": self._load_ann_indexes,
+                "dataset_provider": lambda: LocalDatasetProvider(
+                    self.store, data_dir="services/feast/data"
+                ),  # TODO: remove path when Feast is the issue
+                "clip_encoder": self._load_clip_encoder,
+                "image_search": lambda: SearchByImageService(self.store, self.clip_encoder),
+                "image_encoder": self._load_image_encoder,
+                "text_search": self._load_text_search,
+            }
+            for name, factory in factories.items():
+                self.components.register(name, factory, lazy=name in FEAST_LAZY_COMPONENTS)
+            self.components.start()
+
+    @property
+    def store(self) -> FeatureStore:
+        return self.components.get("feature_store")
+
+    @property
+    def model_version(self) -> str:
+        """
+        Version of the user encoder currently serving requests.
+        """
+        return self.user_encoders.version
+
+    @property
+    def user_encoders(self) -> VersionedModel[EntityTower]:
+        return self.components.get("user_encoder")
+
+    @property
+    def user_encoder(self) -> EntityTower:
+        return self.user_encoders.current()[1]
+
+    @property
+    def recommendation_snapshots(self) -> RecommendationSnapshotStore:
+        return self.components.get("recommendation_snapshots")
+
+    @property
+    def ann_indexes(self) -> AnnIndexRegistry:
+        return self.components.get("ann_indexes")
+
+    @property
+    def dataset_provider(self) -> LocalDatasetProvider:
+        return self.components.get("dataset_provider")
+
+    @property
+    def user_service(self):
+        return self.store.get_feature_service("user_service")
+
+    @property
+    def clip_encoder(self) -> ClipEncoder:
+        return self.components.get("clip_encoder")
+
+    @property
+    def search_by_image_service(self) -> SearchByImageService:
+        """
+        Image search is loaded on first use; until then requests get a 503
+        instead of waiting for the CLIP model.
+        """
+        return self.components.require("image_search")
+
+    @property
+    def text_search(self) -> TextSearchEngine:
+        return self.components.get("text_search")
+
+    def ready(self) -> bool:
+        """
+        True once every eagerly loaded component is available.
+        """
+        return self.components.ready()
 
     def _load_model_version(self):
         """
@@ -56,19 +293,21 @@ class FeastService:
         """
         from sqlalchemy import create_engine, text
 
-        database_url = os.getenv("DATABASE_URL")
-        engine = create_engine(database_url)
+        if getattr(self, "_version_engine", None) is None:
+            database_url = os.getenv("DATABASE_URL")
+            self._version_engine = create_engine(database_url, pool_size=1, pool_pre_ping=True)
 
-        with engine.connect() as connection:
+        with self._version_engine.connect() as connection:
             result = connection.execute(
                 text("SELECT version FROM model_version ORDER BY updated_at DESC LIMIT 1")
             )
             version = result.fetchone()[0]
             return version
 
-    def _load_user_encoder(self):
+    def _load_user_encoder(self, model_version: str) -> EntityTower:
         """
-        Download and load the user encoder model and its configuration from MinIO.
+        Download (or reuse from the local artefact cache) and load the user
+        encoder model and its configuration from MinIO.
         """
         minio_client = Minio(
             endpoint=os.getenv("MINIO_HOST", "endpoint") + ":" + os.getenv("MINIO_PORT", "9000"),
@@ -76,23 +315,170 @@ class FeastService:
             secret_key=os.getenv("MINIO_SECRET_KEY", "secret-key"),
             secure=False,
         )
-        model_version = self._load_model_version()
         bucket_name = "user-encoder"
         object_name = f"user-encoder-{model_version}.pth"
         configuration = f"user-encoder-config-{model_version}.json"
 
-        minio_client.fget_object(bucket_name, object_name, "/tmp/user-encoder.pth")
-        minio_client.fget_object(bucket_name, configuration, "/tmp/user-encoder-config.json")
+        model_path = self.artifacts.fetch(minio_client, bucket_name, object_name)
+        configuration_path = self.artifacts.fetch(minio_client, bucket_name, configuration)
 
-        with open("/tmp/user-encoder-config.json", "r") as f:
+        with open(configuration_path, "r") as f:
             json_config = json.load(f)
-        user_encoder = EntityTower(
-            json_config["users_num_numerical"], json_config["users_num_categorical"]
-        )
-        user_encoder.load_state_dict(torch.load("/tmp/user-encoder.pth"))
+
+        def build_user_encoder() -> EntityTower:
+            return EntityTower(
+                json_config["users_num_numerical"], json_config["users_num_categorical"]
+            )
+
+        if SHARED_WEIGHTS_DIR:
+            # Map the cached checkpoint instead of copying it into every worker
+            try:
+                return build_shared_module(build_user_encoder, model_path)
+            except Exception as e:
+                print(f"[Feast] Could not memory-map {model_path}, loading a private copy: {e}")
+        user_encoder = build_user_encoder()
+        user_encoder.load_state_dict(torch.load(model_path))
+        # Inference only: fixes dropout/normalisation so rows don't depend on their batch
+        user_encoder.eval()
 
         return user_encoder
 
+    def _load_optimized_user_encoder(self, model_version: str) -> EntityTower:
+        """
+        Load model_version and convert it to the configured inference backend,
+        provided its outputs on the bundled users match the float32 model.
+        """
+        user_encoder = self._load_user_encoder(model_version)
+        return optimize_module(user_encoder, _drift_samples, name="user_encoder")
+
+    def _load_clip_encoder(self) -> ClipEncoder:
+        clip_encoder = ClipEncoder()
+        if SHARED_WEIGHTS_DIR:
+            prefix = CLIP_MODEL_NAME.replace("/", "--")
+            share_module_attributes(clip_encoder, SHARED_WEIGHTS_DIR, prefix)
+        # Only the image towers can be probed without knowing ClipEncoder's API
+        image_models = [
+            attr
+            for attr, value in vars(clip_encoder).items()
+            if hasattr(value, "get_image_features")
+        ]
+
+        def probe():
+            if not image_models:
+                raise ValueError("no image model to check drift on")
+            pixels = fixed_pixels()
+            return torch.cat(
+                [
+                    getattr(clip_encoder, attr).get_image_features(pixel_values=pixels)
+                    for attr in image_models
+                ]
+            )
+
+        quantize_attributes(clip_encoder, probe, name="clip_encoder")
+        return clip_encoder
+
+    def _load_image_encoder(self) -> ImageQueryEncoder:
+        """
+        CLIP image tower for searching the image ANN index; only loaded once
+        image search finds such an index.
+        """
+        encoder = ImageQueryEncoder(CLIP_MODEL_NAME)
+        if SHARED_WEIGHTS_DIR:
+            prefix = CLIP_MODEL_NAME.replace("/", "--") + "-query"
+            share_module_attributes(encoder, SHARED_WEIGHTS_DIR, prefix)
+        quantize_attributes(
+            encoder, lambda: encoder.embed_pixels(fixed_pixels()), name="image_encoder"
+        )
+        return encoder
+
+    def _load_text_search(self) -> TextSearchEngine:
+        """
+        Build the text search engine once. Queries are embedded in-process
+        only when a text ANN index is loaded; otherwise SearchService does both.
+        With SHARED_WEIGHTS_DIR, the BGE weights of both paths are shared.
+        """
+        encoder = None
+        if self.ann_indexes.get(TEXT_INDEX) is not None:
+            encoder = TextQueryEncoder(EMBEDDING_MODEL)
+            if SHARED_WEIGHTS_DIR:
+                prefix = EMBEDDING_MODEL.replace("/", "--")
+                share_module_attributes(encoder, SHARED_WEIGHTS_DIR, prefix)
+            quantize_attributes(
+                encoder,
+                lambda: torch.from_numpy(np.stack(encoder(_probe_queries()))),
+                name="text_encoder",
+            )
+        search_service = SearchService(self.store)
+        if SHARED_WEIGHTS_DIR:
+            prefix = EMBEDDING_MODEL.replace("/", "--") + "-search"
+            if not share_nested_modules(search_service, SHARED_WEIGHTS_DIR, prefix):
+                print(
+                    "[SharedWeights] SearchService holds no BGE module to share, "
+                    "each worker keeps a private copy"
+                )
+        return TextSearchEngine(search_service, self.ann_indexes, encoder)
+
+    def _warm_user_encoder(self, user_encoder: EntityTower) -> None:
+        """
+        Run one forward pass so a new encoder is fully initialised before it
+        serves requests, and fails here rather than on the request path.
+        """
+        features = data_preproccess(pd.DataFrame([_WARMUP_USER.model_dump()]))
+        with torch.inference_mode():
+            user_encoder(**features)
+
+    def _load_serving_encoder(self) -> VersionedModel[EntityTower]:
+        """
+        Load the encoder for the startup model version and start watching
+        model_version for newer ones.
+        """
+        user_encoders = VersionedModel(
+            self._load_optimized_user_encoder,
+            warmup=self._warm_user_encoder,
+            on_swap=self._on_user_encoder_swap,
+            name="user_encoder",
+        )
+        user_encoders.load(self.components.get("model_version"))
+        if MODEL_VERSION_POLL_SECONDS > 0:
+            self.model_version_watcher = ModelVersionWatcher(
+                self._load_model_version,
+                self._on_model_version,
+                interval=MODEL_VERSION_POLL_SECONDS,
+            ).start()
+        return user_encoders
+
+    def _on_user_encoder_swap(self, version: str, user_encoder: EntityTower) -> None:
+        # Embeddings are keyed by version already; this just frees the old entries
+        self.user_embeddings.invalidate()
+
+    def _on_model_version(self, version: str) -> None:
+        """
+        Switch serving artefacts (user encoder, recommendation snapshot) to version.
+        """
+        if self.user_encoders.load(version):
+            print(f"[Feast] Switched user encoder to version {version}")
+        if self.recommendation_snapshots.refresh(self.model_version):
+            print(f"[Feast] Switched recommendation snapshot to version {self.model_version}")
+
+    def rollback_model_version(self) -> str:
+        """
+        Serve the previous user encoder (and its snapshot) again. The rolled-back
+        version is not reloaded by the watcher.
+        """
+        version = self.user_encoders.rollback()
+        self.recommendation_snapshots.refresh(version)
+        return version
+
+    def _load_recommendation_snapshots(self) -> RecommendationSnapshotStore:
+        snapshots = RecommendationSnapshotStore()
+        snapshots.refresh(self.components.get("model_version"))
+        return snapshots
+
+    def _load_ann_indexes(self) -> AnnIndexRegistry:
+        ann_indexes = AnnIndexRegistry()
+        ann_indexes.load_all()
+        return ann_indexes
+
     def get_all_existing_users(self) -> List[dict]:
         """
         Return all existing user feature rows from the dataset provider.
@@ -108,7 +494,12 @@ class FeastService:
     def load_items_existing_user(self, user_id: str) -> List[Product]:
         """
         Get top recommended items for an existing user based on their user_id.
+        Served from the precomputed snapshot when available, otherwise from the
+        online store.
         """
+        products = self.recommendation_snapshots.recommendations(user_id)
+        if products is not None:
+            return products
         suggested_item_ids = self.store.get_online_features(
             features=self.store.get_feature_service("user_top_k_items"),
             entity_rows=[{"user_id": user_id}],
@@ -121,98 +512,228 @@ class FeastService:
         Generate recommendations for a new user by encoding their features
         and querying the feature store for top-k similar items.
         """
-        user_as_df = pd.DataFrame([user.model_dump()])
-        user_embed = self.user_encoder(**data_preproccess(user_as_df))[0]
-        top_k = self.store.retrieve_online_documents(
-            query=user_embed.tolist(), top_k=k, features=["item_embedding:item_id"]
+        user_embed = self._user_embedding(user)
+        top_item_ids = self._retrieve_similar_items(
+            user_embed, k, index_name="item", features=["item_embedding:item_id"]
         )
-        print("Retrieved documents from store:", top_k.to_df())
-        top_item_ids = top_k.to_df()["item_id"].tolist()
         return self._item_ids_to_product_list(top_item_ids)
 
+    def _user_embedding(self, user: User) -> List[float]:
+        """
+        Return the user-tower embedding for user, memoized by a fingerprint of
+        the preprocessed features and the model version.
+        """
+        version, _ = self.user_encoders.acquire()
+        features = data_preproccess(pd.DataFrame([user.model_dump()]))
+        user_embed = self.user_embeddings.get(feature_fingerprint(features, version))
+        if user_embed is None:
+            # The batch may run on a newer encoder if one was swapped in meanwhile
+            version, user_embed = self.user_batcher(features)
+            key = feature_fingerprint(features, version)
+            self.user_embeddings.put(key, user_embed, user_id=user.user_id)
+        return user_embed
+
+    def _encode_users(self, features: List[dict]) -> List[Tuple[str, List[float]]]:
+        """
+        Encode a batch of preprocessed users with the user tower in a single
+        forward pass. Returns (model version, embedding) pairs.
+        """
+        version, user_encoder = self.user_encoders.current()
+        try:
+            batches = [_collate_features(features)]
+        except TypeError as e:
+            # One odd feature must not fail every request in the batch
+            print(f"[Feast] Encoding {len(features)} users one by one: {e}")
+            batches = features
+        user_embeds = []
+        with torch.inference_mode():
+            for batch in batches:
+                user_embeds.extend(user_encoder(**batch).tolist())
+        return [(version, user_embed) for user_embed in user_embeds]
+
+    def invalidate_user_embedding(self, user_id) -> None:
+        """
+        Drop the memoized embedding of user_id after their features changed.
+        """
+        self.user_embeddings.forget_user(user_id)
+
+    def _retrieve_similar_items(
+        self, embedding: List[float], k: int, index_name: str, features: List[str]
+    ) -> List:
+        """
+        Return the item_ids of the k items closest to embedding, from the
+        in-process ANN index when one is loaded, otherwise from pgvector.
+        """
+        top_item_ids = self.ann_indexes.search(index_name, embedding, k)
+        if top_item_ids is not None:
+            return top_item_ids
+        top_k = self.store.retrieve_online_documents(query=embedding, top_k=k, features=features)
+        print("Retrieved documents from store:", top_k.to_df())
+        return top_k.to_df()["item_id"].tolist()
+
     def _item_ids_to_product_list(self, top_item_ids: pd.Series | List) -> List[Product]:
         """
-        Given a list of item_ids, fetch and return full product details from the feature store.
+        Given a list of item_ids, return full product details in the same order.
+        Products are served from the product cache; only cache misses are fetched
+        from the feature store, in a single call.
+        """
+        top_item_ids = list(top_item_ids)
+        products = self.product_cache.get_many(top_item_ids, self._fetch_products)
+        return [products[str(item_id)] for item_id in top_item_ids if str(item_id) in products]
+
+    def _fetch_products(self, item_ids: List) -> Dict[str, Product]:
+        """
+        Fetch product details for item_ids from the feature store, keyed by item_id.
         """
         suggested_item = self.store.get_online_features(
             features=self.store.get_feature_service("item_service"),
-            entity_rows=[{"item_id": item_id} for item_id in top_item_ids],
+            entity_rows=[{"item_id": item_id} for item_id in item_ids],
         ).to_df()
-        print(suggested_item.columns)
-        print(suggested_item)
-        suggested_item = [
-            Product(
-                item_id=row.item_id,
-                product_name=row.product_name,
-                category=row.category,
-                about_product=getattr(row, "about_product", None),
-                img_link=getattr(row, "img_link", None),
-                discount_percentage=getattr(row, "discount_percentage", None),
-                discounted_price=getattr(row, "discounted_price", None),
-                actual_price=row.actual_price,
-                product_link=getattr(row, "product_link", None),
-                rating_count=getattr(row, "rating_count", None),
-                rating=getattr(row, "rating", None),
-            )
-            for row in suggested_item.itertuples()
-        ]
-        return suggested_item
+        return {product.item_id: product for product in products_from_frame(suggested_item)}
+
+    def invalidate_products(self, item_ids: Optional[List] = None) -> None:
+        """
+        Drop cached product details, e.g. after a catalogue update.
+        Invalidates the whole catalogue when item_ids is None.
+        """
+        self.product_cache.invalidate(item_ids)
 
     def search_item_by_text(self, text: str, k=5):
         """
         Perform a semantic search over item descriptions using a text query.
         Returns top-k matching items.
         """
-        search_service = SearchService(self.store)
-        results_df = search_service.search_by_text(text, k)
-        print(results_df)
-        top_item_ids = results_df["item_id"].tolist()
-        results = self._item_ids_to_product_list(top_item_ids)
-        return results
+        return self.text_search.search(text, k, self._item_ids_to_product_list)
 
-    def search_item_by_image_link(self, image_link: str, k=5):
+    def search_item_by_image_bytes(self, content: bytes, k=5):
         """
-        Perform image-based product search using an image URL.
+        Perform image-based product search on an uploaded or fetched image.
         Returns top-k similar items.
         """
-        try:
-            # Manually check if the image is reachable and decodable
-            resp = requests.get(image_link, timeout=100)
-            resp.raise_for_status()
+        return self._item_ids_to_product_list(self._image_search_ids(content, k))
+
+    def search_items_by_images(self, contents: List[bytes], k=5) -> List[List[Product]]:
+        """
+        Image search for several images at once. With an image index loaded,
+        the images missing from the result cache are embedded in one forward
+        pass; the products of all results are resolved in a single lookup.
+        """
+        item_ids_per_image = self._images_search_ids(contents, k)
+        products = self.get_items_by_ids([i for item_ids in item_ids_per_image for i in item_ids])
+        return [
+            [products[str(item_id)] for item_id in item_ids if str(item_id) in products]
+            for item_ids in item_ids_per_image
+        ]
 
-            # Try decoding it to ensure it's a valid image
-            img = PILImage.open(BytesIO(resp.content))
-            img.verify()  # Raises if the image is corrupt
+    def _image_search_ids(self, content: bytes, k: int) -> List:
+        return self._images_search_ids([content], k)[0]
 
-        except Exception as e:
-            print(f"[Validation] Could not fetch/validate image: {e}")
-            raise ValueError("Invalid or unreachable image URL.")
-        try:
-            results_df = self.search_by_image_service.search_by_image_link(image_link, k)
-            print(results_df)
-            top_item_ids = results_df["item_id"].tolist()
-            return self._item_ids_to_product_list(top_item_ids)
-        except Exception as e:
-            print(f"Error in search_item_by_image_link: {e}")
-            raise ValueError("Failed to process image from URL.")
+    def _images_search_ids(self, contents: List[bytes], k: int) -> List[List]:
+        """
+        Top-k item_ids for each encoded image, memoized by content hash so the
+        same picture is decoded and encoded only once.
+        """
+        keys = [(image_digest(content), k) for content in contents]
+        results = {key: self.image_results.get(key) for key in keys}
+        missing = {key: content for key, content in zip(keys, contents) if results[key] is None}
+        if missing:
+            images = []
+            for content in missing.values():
+                with self.image_preprocess.time():
+                    images.append(prepare_image(content))
+            for key, item_ids in zip(missing, self._search_images(images, k)):
+                self.image_results.put(key, item_ids)
+                results[key] = item_ids
+        return [results[key] for key in keys]
+
+    def _search_images(self, images: List[PILImage.Image], k: int) -> List[List]:
+        """
+        Top-k item_ids for each prepared image, from the in-process image
+        index (one batched forward pass) when one is loaded, otherwise from
+        SearchByImageService (pgvector), which takes one image per call.
+        """
+        if self.ann_indexes.get(IMAGE_INDEX) is not None:
+            embeddings = self.components.require("image_encoder")(images)
+            return [self.ann_indexes.search(IMAGE_INDEX, embedding, k) for embedding in embeddings]
+        return [self._search_image(image, k) for image in images]
 
-    def search_item_by_image_file(self, image: PILImage.Image, k=5):
-        print("[Feast] Starting search_item_by_image_file")
+    def _search_image(self, image: PILImage.Image, k: int) -> List:
+        """Top-k item_ids for a prepared image from SearchByImageService."""
+        search_by_image_service = self.search_by_image_service
         try:
-            results_df = self.search_by_image_service.search_by_image(image, k)
-            print("[Feast] search_by_image() completed")
-            print(results_df)
+            results_df = search_by_image_service.search_by_image(image, k)
 
             if results_df.empty or "item_id" not in results_df:
                 raise ValueError("No valid item_id results returned from image search.")
 
-            top_item_ids = results_df["item_id"].tolist()
-            return self._item_ids_to_product_list(top_item_ids)
+            return results_df["item_id"].tolist()
 
         except Exception as e:
             print(f"[SearchByImage Error] {e}")
             raise ValueError("Failed to process image.")
 
+    def hybrid_search(
+        self,
+        user: User,
+        text: Optional[str] = None,
+        image: Optional[bytes] = None,
+        k: int = 10,
+        weights: Optional[Dict[str, float]] = None,
+        method: str = "rrf",
+    ) -> List[Product]:
+        """
+        Rank products for a text query and/or an image, personalised for user.
+        Text and image search each contribute their top candidates; the union
+        is also ranked by closeness to the user's embedding and by popularity,
+        the rankings are fused and the top-k products returned from a single
+        product lookup.
+        """
+        weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        depth = HYBRID_SEARCH_CANDIDATES
+        rankings = {}
+        if text and weights["text"]:
+            rankings["text"] = self.text_search.search_ids(text, depth)
+        if image is not None and weights["image"]:
+            rankings["image"] = self._image_search_ids(image, depth)
+        if not rankings:
+            raise ValueError("Hybrid search needs a text query or an image.")
+
+        candidates = list(dict.fromkeys(str(i) for ranking in rankings.values() for i in ranking))
+        if weights["user"]:
+            rankings["user"] = self._user_ranking(user, candidates)
+        products = self.get_items_by_ids(candidates)
+        rankings["popularity"] = popularity_ranking(products.values())
+        fused = fuse_rankings(rankings, weights, method)
+        return [products[item_id] for item_id, _ in fused if item_id in products][:k]
+
+    def _user_ranking(self, user: User, candidates: List[str]) -> List[str]:
+        """
+        candidates ordered by cosine similarity to the user's embedding, scored
+        against the in-process item index or, without one, against their
+        embeddings from the online store.
+        """
+        user_embed = self._user_embedding(user)
+        scores = self.ann_indexes.score("item", user_embed, candidates)
+        if scores is None:
+            scores = cosine_scores(self._item_embeddings(candidates), user_embed)
+        return score_ranking(candidates, scores)
+
+    def _item_embeddings(self, item_ids: List[str]) -> List[Optional[List[float]]]:
+        """
+        Item-tower embeddings of item_ids from the item_embedding view in a
+        single online read; None for items without one.
+        """
+        frame = self.store.get_online_features(
+            features=[ITEM_EMBEDDING_FEATURE],
+            entity_rows=[{"item_id": item_id} for item_id in item_ids],
+        ).to_df()
+        column = ITEM_EMBEDDING_FEATURE.split(":")[1]
+        # Unknown items come back as None or NaN rather than a vector
+        return [
+            vector if np.ndim(vector) == 1 and len(vector) else None
+            for vector in frame[column].tolist()
+        ]
+
     def get_item_by_id(self, item_id: int) -> Product:
         """
         Retrieve a single item by its ID and return it as a Product
@@ -221,3 +742,10 @@ class FeastService:
         if not product_list:
             raise ValueError(f"Item with ID {item_id} not found.")
         return product_list[0]
+
+    def get_items_by_ids(self, item_ids: List[str]) -> Dict[str, Product]:
+        """
+        Retrieve several items at once, keyed by item_id. Cache misses are
+        fetched in a single feature store call; unknown IDs are left out.
+        """
+        return self.product_cache.get_many(item_ids, self._fetch_products)
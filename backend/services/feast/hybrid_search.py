@@ -0,0 +1,108 @@
+"""
+Rank fusion for hybrid search.
+
+Hybrid search ranks one candidate set by several signals at once: text search,
+image search, closeness to the searching user's embedding and popularity.
+Text and image search only return ranked item IDs, so signals are fused by
+rank rather than by raw score:
+
+- ``rrf``: reciprocal rank fusion, ``Σ weight / (HYBRID_SEARCH_RRF_K + rank)``
+- ``weighted``: ``Σ weight × (1 - rank / len(ranking))``, a linear blend of
+  normalised ranks
+
+An item missing from a signal's ranking gets nothing from that signal. Both
+methods score all candidates in one pass over a signals × candidates rank
+matrix.
+"""
+
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models import Product
+
+HYBRID_SEARCH_CANDIDATES = int(os.getenv("HYBRID_SEARCH_CANDIDATES", "50"))
+HYBRID_SEARCH_RRF_K = int(os.getenv("HYBRID_SEARCH_RRF_K", "60"))
+HYBRID_POPULARITY_PRIOR_COUNT = float(os.getenv("HYBRID_POPULARITY_PRIOR_COUNT", "100"))
+FUSION_METHODS = ("rrf", "weighted")
+DEFAULT_WEIGHTS = {"text": 1.0, "image": 1.0, "user": 0.5, "popularity": 0.25}
+
+
+def fuse_rankings(
+    rankings: Dict[str, Sequence],
+    weights: Dict[str, float],
+    method: str = "rrf",
+    rrf_k: int = HYBRID_SEARCH_RRF_K,
+) -> List[Tuple[str, float]]:
+    """
+    Fuse ranked item ID lists, keyed by signal, into one ranking of
+    (item_id, score), best first. Signals without a weight are ignored;
+    ties keep the order in which items were first seen.
+    """
+    if method not in FUSION_METHODS:
+        raise ValueError(f"Unknown fusion method '{method}', expected one of {FUSION_METHODS}")
+    signals = [name for name, ranking in rankings.items() if len(ranking) and weights.get(name)]
+    rankings = {name: list(dict.fromkeys(map(str, rankings[name]))) for name in signals}
+    candidates = list(dict.fromkeys(item_id for name in signals for item_id in rankings[name]))
+    if not candidates:
+        return []
+
+    columns = {item_id: column for column, item_id in enumerate(candidates)}
+    ranks = np.full((len(signals), len(candidates)), np.inf)
+    for row, name in enumerate(signals):
+        ranks[row, [columns[item_id] for item_id in rankings[name]]] = np.arange(
+            len(rankings[name])
+        )
+
+    ranked = np.isfinite(ranks)
+    if method == "rrf":
+        contributions = 1.0 / (rrf_k + 1 + ranks)
+    else:
+        lengths = ranked.sum(axis=1, keepdims=True)
+        contributions = np.where(ranked, 1.0 - ranks / lengths, 0.0)
+    scores = np.array([weights[name] for name in signals]) @ contributions
+    order = np.argsort(-scores, kind="stable")
+    return [(candidates[column], float(scores[column])) for column in order]
+
+
+def cosine_scores(vectors: Sequence[Optional[Sequence[float]]], query) -> np.ndarray:
+    """
+    Cosine similarity of query to each vector in one matrix product; NaN
+    where a vector is missing.
+    """
+    query = np.asarray(query, dtype=np.float32)
+    scores = np.full(len(vectors), np.nan, dtype=np.float32)
+    known = [row for row, vector in enumerate(vectors) if vector is not None]
+    if known:
+        matrix = np.asarray([vectors[row] for row in known], dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+        scores[known] = (matrix @ query) / np.maximum(norms, 1e-12)
+    return scores
+
+
+def score_ranking(item_ids: Sequence[str], scores: np.ndarray) -> List[str]:
+    """item_ids ordered by descending score; items scored NaN are left out."""
+    known = np.flatnonzero(~np.isnan(scores))
+    order = known[np.argsort(-scores[known], kind="stable")]
+    return [item_ids[i] for i in order]
+
+
+def popularity_ranking(
+    products: Iterable[Product], prior_count: float = HYBRID_POPULARITY_PRIOR_COUNT
+) -> List[str]:
+    """
+    Item IDs ordered by Bayesian mean rating: each rating is shrunk towards the
+    candidates' mean rating as if it had prior_count extra average ratings, so
+    a handful of perfect ratings does not beat a well-reviewed bestseller and
+    many poor ratings stay poor. Unrated items score the mean.
+    """
+    products = list(products)
+    ratings = np.array([product.rating or 0.0 for product in products], dtype=np.float64)
+    counts = np.array([product.rating_count or 0 for product in products], dtype=np.float64)
+    counts[ratings == 0] = 0
+    rated = counts > 0
+    prior = ratings[rated].mean() if rated.any() else 0.0
+    scores = (prior_count * prior + ratings * counts) / np.maximum(prior_count + counts, 1e-12)
+    order = np.argsort(-scores, kind="stable")
+    return [products[i].item_id for i in order]
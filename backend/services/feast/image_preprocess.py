@@ -0,0 +1,60 @@
+"""
+Image ingestion for image search.
+
+``prepare_image`` turns uploaded or fetched bytes into the RGB image handed
+to the CLIP encoder and decodes them exactly once. The header is checked
+against ``IMAGE_MAX_PIXELS`` before any pixel is decoded; JPEGs are decoded
+in draft mode, letting libjpeg scale by 1/2, 1/4 or 1/8 while decoding as
+long as both sides stay at or above ``CLIP_IMAGE_SIZE``. EXIF orientation is
+applied and the shorter side is then reduced to ``CLIP_IMAGE_SIZE``, the size
+the CLIP processor resizes to anyway, so it no longer works on megapixels.
+"""
+
+import hashlib
+from io import BytesIO
+
+from fastapi import HTTPException, status
+from PIL import Image, ImageOps
+
+from services.image_fetcher import IMAGE_MAX_PIXELS, ImageTooLargeError
+
+CLIP_IMAGE_SIZE = 224
+
+
+class InvalidImageError(HTTPException):
+    def __init__(self, detail: str = "Unsupported or invalid image format."):
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+def image_digest(content: bytes) -> str:
+    """Content hash identifying an image independently of its URL or file name."""
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def prepare_image(
+    content: bytes, size: int = CLIP_IMAGE_SIZE, max_pixels: int = IMAGE_MAX_PIXELS
+) -> Image.Image:
+    """Decode content once into an RGB image whose shorter side is at most size."""
+    try:
+        image = Image.open(BytesIO(content))
+    except Exception as e:
+        print(f"[ImageError] Cannot identify image: {e}")
+        raise InvalidImageError()
+
+    width, height = image.size
+    if width * height > max_pixels:
+        raise ImageTooLargeError(f"Image is {width}x{height}, at most {max_pixels} pixels.")
+
+    try:
+        if image.format == "JPEG":
+            image.draft("RGB", (size, size))
+        image = ImageOps.exif_transpose(image).convert("RGB")
+    except Exception as e:
+        print(f"[ImageError] Failed to decode image: {e}")
+        raise InvalidImageError("Failed to process uploaded image.")
+
+    scale = size / min(image.size)
+    if scale < 1:
+        target = (max(size, round(image.width * scale)), max(size, round(image.height * scale)))
+        image = image.resize(target, Image.Resampling.BICUBIC, reducing_gap=3.0)
+    return image
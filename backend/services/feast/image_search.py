@@ -0,0 +1,35 @@
+"""
+In-process CLIP image embeddings for searching an ANN index.
+
+When an ANN index named ``image`` is loaded, image search embeds the prepared
+query images with ``ImageQueryEncoder`` and searches that index instead of
+calling ``SearchByImageService`` and pgvector. The index must hold vectors
+from the same encoder; ``python -m services.feast.embedding_export image``
+writes them for the bundled catalogue.
+"""
+
+from typing import List
+
+import numpy as np
+import torch
+from PIL import Image
+from transformers import CLIPImageProcessor, CLIPVisionModelWithProjection
+
+IMAGE_INDEX = "image"
+
+
+class ImageQueryEncoder:
+    """CLIP image embeddings (projected, L2-normalised) for a batch of images."""
+
+    def __init__(self, model_name: str):
+        self.processor = CLIPImageProcessor.from_pretrained(model_name)
+        self.model = CLIPVisionModelWithProjection.from_pretrained(model_name).eval()
+
+    def embed_pixels(self, pixel_values: torch.Tensor) -> torch.Tensor:
+        with torch.inference_mode():
+            embeddings = self.model(pixel_values=pixel_values).image_embeds
+        return torch.nn.functional.normalize(embeddings, dim=-1)
+
+    def __call__(self, images: List[Image.Image]) -> List[np.ndarray]:
+        pixel_values = self.processor(images=images, return_tensors="pt")["pixel_values"]
+        return list(self.embed_pixels(pixel_values).numpy())
@@ -0,0 +1,226 @@
+"""
+Selectable CPU inference backends for the models served by FeastService.
+
+``INFERENCE_BACKEND`` picks how models run:
+
+- ``eager``: float32 PyTorch, as trained (default)
+- ``int8``: dynamic int8 quantization of the ``nn.Linear`` layers
+- ``torchscript``: traced and frozen TorchScript graph
+- ``onnx``: ONNX Runtime session (needs the optional ``onnxruntime``,
+  ``onnx`` and ``onnxscript`` packages)
+
+Every optimized model is compared with its float32 original on sample inputs
+before it is used; if its outputs drift below ``INFERENCE_DRIFT_MIN_COSINE``
+or the backend cannot be built, the float32 model is kept. TorchScript and
+ONNX need tensor-only ``model(**inputs)`` calls (the user encoder); encoders
+only reachable through their own API (BGE, CLIP) support ``int8``.
+
+Every backend builds a private copy of the weights, so with
+``SHARED_WEIGHTS_DIR`` set the memory-mapped models stay on ``eager``: an
+optimized copy per worker would undo the sharing and briefly double memory.
+
+``INFERENCE_THREADS`` sets torch's intra-op threads per worker; keep
+``INFERENCE_MAX_WORKERS × INFERENCE_THREADS`` at or below the CPU cores.
+The chosen backend and measured drift are reported under ``inference_backend``.
+"""
+
+import os
+from io import BytesIO
+from typing import Callable, Dict, List
+
+import torch
+from torch import nn
+
+from services.feast.shared_weights import SHARED_WEIGHTS_DIR
+from services.metrics import register_metrics_source
+
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "eager")
+INFERENCE_THREADS = int(os.getenv("INFERENCE_THREADS", "0"))  # 0: torch default
+INFERENCE_DRIFT_MIN_COSINE = float(os.getenv("INFERENCE_DRIFT_MIN_COSINE", "0.99"))
+BACKENDS = ("eager", "int8", "torchscript", "onnx")
+
+Inputs = Dict[str, torch.Tensor]
+
+_reports: Dict[str, dict] = {}
+
+
+def configure_threads(threads: int = INFERENCE_THREADS) -> None:
+    if threads > 0:
+        torch.set_num_threads(threads)
+
+
+def quantize_int8(module: nn.Module) -> nn.Module:
+    """Copy of module with its Linear layers dynamically quantized to int8."""
+    return torch.ao.quantization.quantize_dynamic(module, {nn.Linear}, dtype=torch.qint8)
+
+
+def to_torchscript(module: nn.Module, example: Inputs) -> nn.Module:
+    traced = torch.jit.trace(module.eval(), example_kwarg_inputs=example, strict=False)
+    return torch.jit.freeze(traced)
+
+
+class OnnxModule:
+    """ONNX Runtime session called like the module it was exported from."""
+
+    def __init__(self, module: nn.Module, example: Inputs, threads: int = INFERENCE_THREADS):
+        import onnxruntime
+
+        self.input_names = list(example)
+        buffer = BytesIO()
+        torch.onnx.export(
+            module.eval(),
+            args=(),
+            kwargs=example,
+            f=buffer,
+            input_names=self.input_names,
+            output_names=["output"],
+            verbose=False,
+            dynamic_axes={name: {0: "batch"} for name in self.input_names + ["output"]},
+        )
+        options = onnxruntime.SessionOptions()
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            buffer.getvalue(), options, providers=["CPUExecutionProvider"]
+        )
+
+    def __call__(self, **inputs: torch.Tensor) -> torch.Tensor:
+        feeds = {name: inputs[name].numpy() for name in self.input_names}
+        return torch.from_numpy(self.session.run(None, feeds)[0])
+
+
+def build_backend(module: nn.Module, backend: str, example: Inputs) -> Callable[..., torch.Tensor]:
+    if backend == "int8":
+        return quantize_int8(module)
+    if not all(isinstance(value, torch.Tensor) for value in example.values()):
+        raise ValueError(f"{backend} needs tensor-only inputs")
+    if backend == "torchscript":
+        return to_torchscript(module, example)
+    if backend == "onnx":
+        return OnnxModule(module, example)
+    raise ValueError(f"Unknown inference backend '{backend}', expected one of {BACKENDS}")
+
+
+def output_drift(reference: torch.Tensor, candidate: torch.Tensor) -> dict:
+    """Worst-case difference between two batches of output vectors."""
+    reference = reference.detach().float().reshape(len(reference), -1)
+    candidate = candidate.detach().float().reshape(len(candidate), -1)
+    cosine = nn.functional.cosine_similarity(reference, candidate, dim=-1)
+    return {
+        "min_cosine": round(cosine.min().item(), 6),
+        "max_abs_error": round((reference - candidate).abs().max().item(), 6),
+    }
+
+
+def _run(model: Callable[..., torch.Tensor], samples: List[Inputs]) -> torch.Tensor:
+    with torch.inference_mode():
+        return torch.cat([model(**sample) for sample in samples])
+
+
+def _accept(name: str, backend: str, drift: dict, min_cosine: float) -> bool:
+    accepted = drift["min_cosine"] >= min_cosine
+    _reports[name] = {"backend": backend if accepted else "eager", "requested": backend, **drift}
+    if accepted:
+        print(f"[Inference] {name}: using {backend} (min cosine {drift['min_cosine']})")
+    else:
+        print(
+            f"[Inference] {name}: {backend} drifts to cosine {drift['min_cosine']} "
+            f"< {min_cosine}, keeping float32"
+        )
+    return accepted
+
+
+def _reject(name: str, backend: str, error: Exception) -> None:
+    _reports[name] = {"backend": "eager", "requested": backend, "error": str(error)}
+    print(f"[Inference] {name}: {backend} backend unavailable, keeping float32: {error}")
+
+
+def _check_weights_private(shared_weights: bool) -> None:
+    if shared_weights:
+        raise ValueError(
+            "optimized copies would replace the weights shared through SHARED_WEIGHTS_DIR"
+        )
+
+
+def optimize_module(
+    module: nn.Module,
+    samples: Callable[[], List[Inputs]],
+    backend: str = INFERENCE_BACKEND,
+    name: str = "model",
+    min_cosine: float = INFERENCE_DRIFT_MIN_COSINE,
+    shared_weights: bool = bool(SHARED_WEIGHTS_DIR),
+) -> Callable[..., torch.Tensor]:
+    """
+    Return module converted to backend if its outputs on the inputs built by
+    samples stay close to the float32 ones, otherwise module itself. samples
+    is only called for non-eager backends. The model is called as
+    ``model(**inputs)`` and must return a tensor.
+    """
+    if backend == "eager":
+        _reports[name] = {"backend": "eager"}
+        return module
+    try:
+        _check_weights_private(shared_weights)
+        inputs = samples()
+        candidate = build_backend(module, backend, inputs[0])
+        drift = output_drift(_run(module, inputs), _run(candidate, inputs))
+    except Exception as e:
+        _reject(name, backend, e)
+        return module
+    return candidate if _accept(name, backend, drift, min_cosine) else module
+
+
+def quantize_attributes(
+    owner: object,
+    probe: Callable[[], torch.Tensor],
+    backend: str = INFERENCE_BACKEND,
+    name: str = "model",
+    min_cosine: float = INFERENCE_DRIFT_MIN_COSINE,
+    shared_weights: bool = bool(SHARED_WEIGHTS_DIR),
+) -> bool:
+    """
+    Quantize the ``nn.Module`` attributes of an encoder used through its own
+    API. probe runs the encoder on fixed inputs and returns its outputs; the
+    float32 modules are restored if they drift. Returns True if quantized.
+    """
+    if backend == "eager":
+        _reports[name] = {"backend": "eager"}
+        return False
+    originals = {
+        attr: value for attr, value in vars(owner).items() if isinstance(value, nn.Module)
+    }
+    try:
+        _check_weights_private(shared_weights)
+        if backend != "int8":
+            raise ValueError(f"only int8 is supported for {type(owner).__name__}")
+        with torch.inference_mode():
+            reference = probe()
+        for attr, module in originals.items():
+            setattr(owner, attr, quantize_int8(module))
+        with torch.inference_mode():
+            drift = output_drift(reference, probe())
+    except Exception as e:
+        vars(owner).update(originals)
+        _reject(name, backend, e)
+        return False
+    if not _accept(name, backend, drift, min_cosine):
+        vars(owner).update(originals)
+        return False
+    return True
+
+
+def fixed_pixels(batch: int = 2, size: int = 224, seed: int = 0) -> torch.Tensor:
+    """Deterministic image batch used to probe image encoders."""
+    generator = torch.Generator().manual_seed(seed)
+    return torch.rand(batch, 3, size, size, generator=generator)
+
+
+def stats() -> dict:
+    return {
+        "requested": INFERENCE_BACKEND,
+        "threads": torch.get_num_threads(),
+        "models": dict(_reports),
+    }
+
+
+register_metrics_source("inference_backend", stats)
@@ -0,0 +1,131 @@
+"""
+Dynamic batching for model inference.
+
+Callers from any thread ``submit`` a single item and get a Future back. A
+worker thread collects items until ``max_batch_size`` is reached or
+``max_wait_ms`` has passed since the first one arrived, runs
+``process_batch`` once for the whole batch and resolves each Future with its
+own result (or with the exception raised for the batch). ``close`` finishes
+the items already submitted and stops the worker thread.
+"""
+
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from typing import Callable, Generic, List, Sequence, Tuple, TypeVar
+
+from services.metrics import LatencyHistogram, register_metrics_source
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Queued by close() to wake the worker; items submitted before it still run
+_STOP = object()
+
+
+class MicroBatcher(Generic[T, R]):
+    def __init__(
+        self,
+        process_batch: Callable[[List[T]], Sequence[R]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5,
+        name: str = "micro_batcher",
+    ):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[Tuple[T, Future, float]]" = queue.Queue()
+        self._batch_sizes: Counter = Counter()
+        self._queue_wait = LatencyHistogram()
+        self._batch_time = LatencyHistogram()
+        self._latency = LatencyHistogram()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        register_metrics_source(name, self.stats)
+
+    def submit(self, item: T) -> "Future[R]":
+        future: "Future[R]" = Future()
+        if self._closed:
+            future.set_exception(RuntimeError("MicroBatcher is closed"))
+            return future
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def __call__(self, item: T) -> R:
+        return self.submit(item).result()
+
+    def close(self, timeout: float = 5) -> None:
+        """Process the items already submitted, then stop the worker thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        # Items that raced with close() after the sentinel are failed, not left hanging
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is not _STOP:
+                entry[1].set_exception(RuntimeError("MicroBatcher is closed"))
+
+    def _run(self) -> None:
+        while True:
+            entry = self._queue.get()
+            if entry is _STOP:
+                return
+            batch = [entry]
+            stopping = False
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+            self._process(batch)
+            if stopping:
+                return
+
+    def _process(self, batch: List[Tuple[T, Future, float]]) -> None:
+        started = time.perf_counter()
+        for _, _, submitted in batch:
+            self._queue_wait.observe(started - submitted)
+        self._batch_sizes[len(batch)] += 1
+        try:
+            results = self.process_batch([item for item, _, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"Expected {len(batch)} results, got {len(results)}")
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        finished = time.perf_counter()
+        self._batch_time.observe(finished - started)
+        for (_, future, submitted), result in zip(batch, results):
+            self._latency.observe(finished - submitted)
+            future.set_result(result)
+
+    def stats(self) -> dict:
+        batches = sum(self._batch_sizes.values())
+        items = sum(size * count for size, count in self._batch_sizes.items())
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches": batches,
+            "avg_batch_size": round(items / batches, 2) if batches else 0.0,
+            "batch_sizes": dict(sorted(self._batch_sizes.items())),
+            "queue_wait": self._queue_wait.snapshot(),
+            "batch_time": self._batch_time.snapshot(),
+            "latency": self._latency.snapshot(),
+        }
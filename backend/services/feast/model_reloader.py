@@ -0,0 +1,173 @@
+"""
+Hot reload of versioned models.
+
+``VersionedModel`` holds the serving ``(version, model)`` pair. A new version
+is loaded and warmed by the caller's thread, then swapped in with a single
+reference assignment, so requests either see the old pair or the new one and
+never wait for a load. The previous pair is kept for ``rollback``; a
+rolled-back version is not loaded again until ``allow`` is called for it.
+
+``ModelVersionWatcher`` polls for the newest version and hands it to a
+callback off the request path; ``notify`` wakes it up immediately.
+"""
+
+import threading
+import time
+from collections import Counter
+from typing import Callable, Generic, Optional, Set, Tuple, TypeVar
+
+from services.metrics import register_metrics_source
+
+M = TypeVar("M")
+
+
+class VersionedModel(Generic[M]):
+    def __init__(
+        self,
+        loader: Callable[[str], M],
+        warmup: Optional[Callable[[M], None]] = None,
+        on_swap: Optional[Callable[[str, M], None]] = None,
+        name: str = "model",
+    ):
+        self.loader = loader
+        self.warmup = warmup
+        self.on_swap = on_swap
+        self._current: Optional[Tuple[str, M]] = None
+        self._previous: Optional[Tuple[str, M]] = None
+        self._rejected: Set[str] = set()
+        self._load_lock = threading.Lock()
+        self._served: Counter = Counter()
+        self.swaps = 0
+        self.rollbacks = 0
+        self.failures = 0
+        self.last_load_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+        register_metrics_source(name, self.stats)
+
+    @property
+    def version(self) -> Optional[str]:
+        current = self._current
+        return current[0] if current is not None else None
+
+    @property
+    def previous_version(self) -> Optional[str]:
+        previous = self._previous
+        return previous[0] if previous is not None else None
+
+    def current(self) -> Tuple[str, M]:
+        """Return the serving (version, model) pair."""
+        current = self._current
+        if current is None:
+            raise RuntimeError("No model version loaded")
+        return current
+
+    def acquire(self) -> Tuple[str, M]:
+        """Return the serving (version, model) pair and count one request against it."""
+        current = self.current()
+        self._served[current[0]] += 1
+        return current
+
+    def load(self, version: str) -> bool:
+        """
+        Load, warm and swap in ``version``. Returns False if it is already
+        serving or was rolled back; a failed load leaves the serving model
+        in place and re-raises.
+        """
+        version = str(version)
+        with self._load_lock:
+            if version == self.version or version in self._rejected:
+                return False
+            started = time.perf_counter()
+            try:
+                model = self.loader(version)
+                if self.warmup is not None:
+                    self.warmup(model)
+            except Exception as e:
+                self.failures += 1
+                self.last_error = f"{version}: {e}"
+                raise
+            self.last_load_seconds = time.perf_counter() - started
+            self._swap((version, model))
+            self.swaps += 1
+            self.last_error = None
+            return True
+
+    def rollback(self) -> str:
+        """Serve the previous version again and stop the watcher re-loading the current one."""
+        with self._load_lock:
+            if self._previous is None:
+                raise RuntimeError("No previous model version to roll back to")
+            self._rejected.add(self._current[0])
+            self._swap(self._previous)
+            self.rollbacks += 1
+            return self._current[0]
+
+    def allow(self, version: str) -> None:
+        """Let a rolled-back version be loaded again."""
+        self._rejected.discard(str(version))
+
+    def _swap(self, pair: Tuple[str, M]) -> None:
+        self._previous, self._current = self._current, pair
+        print(f"[Model] Serving version {pair[0]} (previous: {self.previous_version})")
+        if self.on_swap is not None:
+            self.on_swap(*pair)
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "previous_version": self.previous_version,
+            "served": dict(self._served),
+            "swaps": self.swaps,
+            "rollbacks": self.rollbacks,
+            "failures": self.failures,
+            "rejected_versions": sorted(self._rejected),
+            "last_load_ms": (
+                round(self.last_load_seconds * 1000, 2)
+                if self.last_load_seconds is not None
+                else None
+            ),
+            "last_error": self.last_error,
+        }
+
+
+class ModelVersionWatcher:
+    def __init__(
+        self,
+        poll_version: Callable[[], str],
+        on_version: Callable[[str], None],
+        interval: float,
+        name: str = "model-version-watcher",
+    ):
+        self.poll_version = poll_version
+        self.on_version = on_version
+        self.interval = interval
+        self.name = name
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "ModelVersionWatcher":
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        return self
+
+    def notify(self) -> None:
+        """Check for a new version now instead of at the next poll."""
+        self._wake.set()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wake.set()
+
+    def check(self) -> None:
+        try:
+            self.on_version(self.poll_version())
+        except Exception as e:
+            print(f"[Model] Model version check failed: {e}")
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if not self._stopped.is_set():
+                self.check()
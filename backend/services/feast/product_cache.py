@@ -0,0 +1,88 @@
+import os
+from typing import Callable, Dict, Iterable, List, Optional
+
+from models import Product
+from services.cache import LRUCache, SqliteCacheTier
+from services.metrics import register_metrics_source
+
+PRODUCT_CACHE_SIZE = int(os.getenv("PRODUCT_CACHE_SIZE", "10000"))
+PRODUCT_CACHE_TTL_SECONDS = float(os.getenv("PRODUCT_CACHE_TTL_SECONDS", "3600"))
+# Optional SQLite file shared by all workers on the host, e.g. /tmp/product-cache.db
+PRODUCT_CACHE_SHARED_PATH = os.getenv("PRODUCT_CACHE_SHARED_PATH")
+
+
+class ProductCache:
+    """
+    Read-through cache of catalogue products keyed by item_id.
+
+    Lookups go to the in-process LRU first, then to the optional shared tier,
+    and only the remaining IDs are handed to ``fetch`` in a single call.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = PRODUCT_CACHE_SIZE,
+        ttl: float = PRODUCT_CACHE_TTL_SECONDS,
+        shared_path: Optional[str] = PRODUCT_CACHE_SHARED_PATH,
+    ):
+        self.local = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.shared = (
+            SqliteCacheTier(shared_path, ttl=ttl, table="products") if shared_path else None
+        )
+        self.fetched = 0
+        self.fetch_calls = 0
+        register_metrics_source("product_cache", self.stats)
+
+    def get_many(
+        self,
+        item_ids: Iterable,
+        fetch: Callable[[List], Dict[str, Product]],
+    ) -> Dict[str, Product]:
+        """
+        Resolve ``item_ids`` to products, calling ``fetch`` once with the raw IDs
+        missing from both tiers. IDs unknown to the catalogue are left out.
+        """
+        raw_ids = {str(item_id): item_id for item_id in item_ids}
+        found = self.local.get_many(raw_ids)
+
+        missing = [key for key in raw_ids if key not in found]
+        if missing and self.shared is not None:
+            shared = {
+                key: Product.model_validate_json(value)
+                for key, value in self.shared.get_many(missing).items()
+            }
+            self.local.put_many(shared)
+            found.update(shared)
+            missing = [key for key in missing if key not in shared]
+
+        if missing:
+            self.fetch_calls += 1
+            fetched = fetch([raw_ids[key] for key in missing])
+            self.fetched += len(fetched)
+            self.put_many(fetched)
+            found.update(fetched)
+        return found
+
+    def put_many(self, products: Dict[str, Product]) -> None:
+        if not products:
+            return
+        self.local.put_many(products)
+        if self.shared is not None:
+            self.shared.put_many(
+                {key: product.model_dump_json() for key, product in products.items()}
+            )
+
+    def invalidate(self, item_ids: Optional[Iterable] = None) -> None:
+        """Drop the given items (or the whole catalogue) from every tier."""
+        keys = None if item_ids is None else [str(item_id) for item_id in item_ids]
+        self.local.invalidate(keys)
+        if self.shared is not None:
+            self.shared.invalidate(keys)
+
+    def stats(self) -> dict:
+        return {
+            **self.local.stats(),
+            "shared_tier": self.shared.path if self.shared is not None else None,
+            "fetch_calls": self.fetch_calls,
+            "fetched": self.fetched,
+        }
@@ -0,0 +1,58 @@
+from itertools import repeat
+from typing import List
+
+import numpy as np
+import pandas as pd
+from pydantic import TypeAdapter
+
+from models import Product
+
+PRODUCT_FIELDS = tuple(Product.model_fields)
+_STRING_FIELDS = {"item_id", "product_name", "category"}
+# Non-nullable fields, checked per column so errors name the items at fault
+_REQUIRED_FIELDS = ("item_id", "product_name", "category", "actual_price")
+_products_adapter = TypeAdapter(List[Product])
+
+
+def _column_values(frame: pd.DataFrame, field: str) -> list:
+    """Return one column as native Python values with nulls mapped to None."""
+    array = frame[field].to_numpy()
+    if field in _STRING_FIELDS and array.dtype != object:
+        array = array.astype(str)
+    values = array.tolist()
+    if array.dtype.kind in "fO":
+        for row in np.flatnonzero(pd.isna(array)).tolist():
+            values[row] = None
+    return values
+
+
+def products_from_frame(frame: pd.DataFrame) -> List[Product]:
+    """
+    Convert an item_service feature frame into Products, preserving row order.
+
+    Rows without a product_name (items unknown to the online store) are dropped.
+    Columns are converted to native Python values once per batch, and the
+    resulting records are validated in a single ``TypeAdapter`` call rather
+    than one model constructor call per row. Optional columns absent from the
+    frame are filled with None.
+
+    Raises ValueError if a known item lacks a required field.
+    """
+    missing = [None] * len(frame)
+    columns = {
+        field: _column_values(frame, field) if field in frame.columns else missing
+        for field in PRODUCT_FIELDS
+    }
+    known = [row for row, name in enumerate(columns["product_name"]) if name is not None]
+    if len(known) < len(frame):
+        columns = {field: [values[row] for row in known] for field, values in columns.items()}
+
+    for field in _REQUIRED_FIELDS:
+        invalid = [
+            item_id for item_id, value in zip(columns["item_id"], columns[field]) if value is None
+        ]
+        if invalid:
+            raise ValueError(f"Items {invalid[:5]} have no {field} ({len(invalid)} in total)")
+
+    records = map(dict, map(zip, repeat(PRODUCT_FIELDS), zip(*columns.values())))
+    return _products_adapter.validate_python(list(records))
@@ -0,0 +1,249 @@
+"""
+Precomputed recommendations for existing users, served from a memory-mapped file.
+
+A snapshot is built from the batch-scoring output (one row per user with its
+``top_k_item_ids``) and the item catalogue, and is laid out as:
+
+    magic | header length | JSON header | user ids | recommendations | item offsets | items
+
+* user ids        - sorted fixed-width byte strings, searched with binary search
+* recommendations - int32 matrix [n_users, k] of item indexes, -1 padded
+* item offsets    - int64 [n_items + 1] byte offsets into the items section
+* items           - product JSON documents, decoded only when served
+
+Every section is a zero-copy view over one read-only mmap, so all uvicorn
+workers on a host share the same page cache. Snapshots are named
+``recommendations-<model_version>.snap``; ``RecommendationSnapshotStore``
+swaps in the file matching the newest model version.
+
+Build one with:
+
+    python -m services.feast.recommendation_snapshot \\
+        --top-k user_top_k_items.parquet \\
+        --items services/feast/data/recommendation_items.parquet \\
+        --model-version <version> --out-dir /var/lib/recommender/snapshots
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from models import Product
+from services.feast.product_mapping import products_from_frame
+from services.metrics import register_metrics_source
+
+MAGIC = b"RECSNAP1"
+_HEADER_LEN = struct.Struct("<I")
+_ALIGN = 64
+RECOMMENDATION_SNAPSHOT_DIR = os.getenv("RECOMMENDATION_SNAPSHOT_DIR")
+
+
+def snapshot_path(directory: str, model_version: str) -> str:
+    return os.path.join(directory, f"recommendations-{model_version}.snap")
+
+
+def _pad(length: int) -> int:
+    return -length % _ALIGN
+
+
+def build_snapshot(
+    path: str,
+    model_version: str,
+    user_top_k: pd.DataFrame,
+    items: pd.DataFrame,
+) -> dict:
+    """
+    Write a snapshot atomically. ``user_top_k`` needs ``user_id`` and
+    ``top_k_item_ids`` columns; ``items`` is an item_service shaped frame.
+    Recommended items missing from ``items`` are skipped.
+    """
+    products = products_from_frame(items)
+    item_index = {product.item_id: i for i, product in enumerate(products)}
+
+    user_top_k = user_top_k.assign(user_id=user_top_k["user_id"].astype(str))
+    user_top_k = user_top_k.drop_duplicates("user_id").sort_values("user_id")
+    encoded_ids = [user_id.encode("utf-8") for user_id in user_top_k["user_id"]]
+    width = max((len(user_id) for user_id in encoded_ids), default=1)
+    user_ids = np.array(encoded_ids, dtype=f"S{width}")
+
+    rows = [
+        [item_index[str(i)] for i in top_k if str(i) in item_index]
+        for top_k in user_top_k["top_k_item_ids"]
+    ]
+    k = max((len(row) for row in rows), default=0)
+    recs = np.full((len(rows), max(k, 1)), -1, dtype=np.int32)
+    for r, row in enumerate(rows):
+        recs[r, : len(row)] = row
+
+    documents = [product.model_dump_json().encode("utf-8") for product in products]
+    offsets = np.zeros(len(documents) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(doc) for doc in documents])
+
+    sections = [user_ids.tobytes(), recs.tobytes(), offsets.tobytes(), b"".join(documents)]
+    header = {
+        "model_version": str(model_version),
+        "n_users": len(user_ids),
+        "user_id_width": user_ids.dtype.itemsize,
+        "k": recs.shape[1],
+        "n_items": len(documents),
+    }
+    # Section offsets depend on the header size, so settle the header first
+    header["sections"] = [0] * len(sections)
+    while True:
+        encoded = json.dumps(header).encode("utf-8")
+        position = len(MAGIC) + _HEADER_LEN.size + len(encoded)
+        position += _pad(position)
+        starts = []
+        for section in sections:
+            starts.append(position)
+            position += len(section) + _pad(len(section))
+        if starts == header["sections"]:
+            break
+        header["sections"] = starts
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(MAGIC + _HEADER_LEN.pack(len(encoded)) + encoded)
+        for start, section in zip(header["sections"], sections):
+            f.write(b"\0" * (start - f.tell()))
+            f.write(section)
+    os.replace(tmp_path, path)
+    return header
+
+
+class RecommendationSnapshot:
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a recommendation snapshot")
+        (header_len,) = _HEADER_LEN.unpack_from(self._mmap, len(MAGIC))
+        start = len(MAGIC) + _HEADER_LEN.size
+        self.header = json.loads(self._mmap[start : start + header_len])
+        self.model_version = self.header["model_version"]
+
+        users_at, recs_at, offsets_at, items_at = self.header["sections"]
+        n_users, k = self.header["n_users"], self.header["k"]
+        self._user_ids = np.frombuffer(
+            self._mmap, dtype=f"S{self.header['user_id_width']}", count=n_users, offset=users_at
+        )
+        self._recs = np.frombuffer(
+            self._mmap, dtype=np.int32, count=n_users * k, offset=recs_at
+        ).reshape(n_users, k)
+        self._offsets = np.frombuffer(
+            self._mmap, dtype=np.int64, count=self.header["n_items"] + 1, offset=offsets_at
+        )
+        self._items_at = items_at
+
+    def __len__(self) -> int:
+        return self.header["n_users"]
+
+    def item_indexes(self, user_id: str) -> Optional[np.ndarray]:
+        key = str(user_id).encode("utf-8")
+        if len(key) > self._user_ids.dtype.itemsize:
+            return None
+        position = np.searchsorted(self._user_ids, key)
+        if position >= len(self._user_ids) or self._user_ids[position] != key:
+            return None
+        row = self._recs[position]
+        return row[row >= 0]
+
+    def product(self, index: int) -> Product:
+        start = self._items_at + int(self._offsets[index])
+        end = self._items_at + int(self._offsets[index + 1])
+        return Product.model_validate_json(self._mmap[start:end])
+
+    def recommendations(self, user_id: str) -> Optional[List[Product]]:
+        indexes = self.item_indexes(user_id)
+        if indexes is None:
+            return None
+        return [self.product(i) for i in indexes.tolist()]
+
+
+class RecommendationSnapshotStore:
+    """
+    Holds the snapshot for the current model version and swaps it atomically.
+    Lookups return None when no snapshot is loaded or the user is not in it,
+    letting the caller fall back to the online store.
+    """
+
+    def __init__(self, directory: Optional[str] = RECOMMENDATION_SNAPSHOT_DIR):
+        self.directory = directory
+        self.current: Optional[RecommendationSnapshot] = None
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {"hits": 0, "misses": 0, "swaps": 0}
+        register_metrics_source("recommendation_snapshot", self.stats)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def refresh(self, model_version: str) -> bool:
+        """Load the snapshot for ``model_version`` if it exists and is not already live."""
+        if not self.enabled:
+            return False
+        current = self.current
+        if current is not None and current.model_version == str(model_version):
+            return False
+        path = snapshot_path(self.directory, model_version)
+        if not os.path.exists(path):
+            print(f"[Snapshot] No snapshot for model version {model_version} at {path}")
+            return False
+        with self._lock:
+            snapshot = RecommendationSnapshot(path)
+            # The previous mmap is released once in-flight lookups drop their reference
+            self.current = snapshot
+            self._counters["swaps"] += 1
+        print(f"[Snapshot] Serving {len(snapshot)} users from {path}")
+        return True
+
+    def recommendations(self, user_id: str) -> Optional[List[Product]]:
+        snapshot = self.current
+        products = snapshot.recommendations(user_id) if snapshot is not None else None
+        self._counters["hits" if products is not None else "misses"] += 1
+        return products
+
+    def stats(self) -> dict:
+        snapshot = self.current
+        return {
+            "enabled": self.enabled,
+            "model_version": snapshot.model_version if snapshot is not None else None,
+            "users": len(snapshot) if snapshot is not None else 0,
+            **self._counters,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a recommendation snapshot")
+    parser.add_argument("--top-k", required=True, help="Parquet with user_id, top_k_item_ids")
+    parser.add_argument("--items", required=True, help="Parquet with item details")
+    parser.add_argument("--model-version", required=True)
+    parser.add_argument("--out-dir", required=True)
+    args = parser.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    path = snapshot_path(args.out_dir, args.model_version)
+    header = build_snapshot(
+        path,
+        args.model_version,
+        pd.read_parquet(args.top_k),
+        pd.read_parquet(args.items),
+    )
+    print(
+        f"Wrote {path}: {header['n_users']} users x {header['k']} items, "
+        f"{header['n_items']} products, {os.path.getsize(path)} bytes"
+    )
+
+
+if __name__ == "__main__":
+    main()
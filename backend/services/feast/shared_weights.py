@@ -0,0 +1,177 @@
+"""
+Model weights shared by every uvicorn worker on a host.
+
+Parameters are stored once per host in a torch checkpoint and attached to
+each worker's module with ``torch.load(mmap=True)`` and
+``load_state_dict(assign=True)``: the tensors point straight into the
+read-only page cache instead of a private copy, so adding a worker costs
+almost no extra memory for the weights. Models must only be used for
+inference once attached; writing a parameter would copy its pages.
+Checkpoints are named by a digest of the weights they hold, so a worker that
+loaded a different revision of a model never attaches another's copy.
+
+Enable by setting ``SHARED_WEIGHTS_DIR`` (``/dev/shm/...`` or a local disk
+directory). Per-process memory is reported under ``memory``.
+"""
+
+import fcntl
+import hashlib
+import os
+import re
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, Tuple
+
+import torch
+from torch import nn
+
+from services.metrics import register_metrics_source
+
+SHARED_WEIGHTS_DIR = os.getenv("SHARED_WEIGHTS_DIR")
+
+# Modules attached per prefix; 0 means the model stays private to each worker
+_shared_modules: Dict[str, int] = {}
+
+
+@contextmanager
+def _exclusive(path: str):
+    with open(f"{path}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def export_weights(module: nn.Module, path: str) -> None:
+    """Write module's state dict to path atomically."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    torch.save(module.state_dict(), tmp_path)
+    os.replace(tmp_path, path)
+
+
+def weights_digest(module: nn.Module) -> str:
+    """Short hex digest of module's parameter and buffer names, dtypes and values."""
+    digest = hashlib.blake2b(digest_size=8)
+    for name, tensor in sorted(module.state_dict().items()):
+        tensor = tensor.detach().cpu().contiguous()
+        digest.update(f"{name}:{tensor.dtype}:{tuple(tensor.shape)}".encode())
+        digest.update(tensor.reshape(-1).view(torch.uint8).numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _remove_stale_copies(root: str, ext: str, keep: str) -> None:
+    """Delete the other digests of root; workers still mapping them keep their pages."""
+    directory, name = os.path.split(root)
+    pattern = re.compile(re.escape(name) + r"-[0-9a-f]{16}" + re.escape(ext))
+    for entry in os.listdir(directory):
+        path = os.path.join(directory, entry)
+        if pattern.fullmatch(entry) and path != keep:
+            try:
+                os.remove(path)
+            except OSError as e:
+                print(f"[SharedWeights] Could not remove {path}: {e}")
+
+
+def attach_weights(module: nn.Module, path: str) -> nn.Module:
+    """
+    Point module's parameters and buffers at the memory-mapped checkpoint in
+    path. The module may be built on the meta device, it is then not
+    materialised before attaching.
+    """
+    state = torch.load(path, mmap=True, weights_only=True, map_location="cpu")
+    module.load_state_dict(state, assign=True)
+    leftover = [name for name, tensor in module.state_dict().items() if tensor.is_meta]
+    if leftover:
+        raise ValueError(f"{path} does not provide {', '.join(leftover)}")
+    module.requires_grad_(False)
+    return module.eval()
+
+
+def share_module(module: nn.Module, path: str) -> nn.Module:
+    """
+    Replace the weights of an already loaded module with the host-wide copy
+    of them, writing that copy first if this is the first worker to get here.
+    The copy is stored as ``<path stem>-<weights digest><ext>``; copies of
+    other weights under the same path are removed when a new one is written.
+    """
+    path = os.path.abspath(path)
+    root, ext = os.path.splitext(path)
+    shared_path = f"{root}-{weights_digest(module)}{ext}"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with _exclusive(path):
+        if not os.path.exists(shared_path):
+            export_weights(module, shared_path)
+            _remove_stale_copies(root, ext, keep=shared_path)
+    return attach_weights(module, shared_path)
+
+
+def build_shared_module(skeleton: Callable[[], nn.Module], path: str) -> nn.Module:
+    """Build the architecture on the meta device and attach the checkpoint in path."""
+    with torch.device("meta"):
+        module = skeleton()
+    return attach_weights(module, path)
+
+
+def share_module_attributes(owner: object, directory: str, prefix: str) -> int:
+    """
+    Share every ``nn.Module`` attribute of owner (e.g. the models held by an
+    encoder class). Returns the number of modules attached.
+    """
+    shared = 0
+    for name, value in vars(owner).items():
+        if isinstance(value, nn.Module):
+            share_module(value, os.path.join(directory, f"{prefix}-{name}.pt"))
+            shared += 1
+    _shared_modules[prefix] = shared
+    return shared
+
+
+def share_nested_modules(
+    owner: object, directory: str, prefix: str, packages: Tuple[str, ...] = ("recsysapp",)
+) -> int:
+    """
+    Like share_module_attributes, but also shares the modules of helper
+    objects from packages that owner holds (e.g. the encoder inside a search
+    service), one level down. Returns the number of modules attached.
+    """
+    shared = share_module_attributes(owner, directory, prefix)
+    for name, value in list(vars(owner).items()):
+        package = type(value).__module__.split(".")[0]
+        if package in packages and not isinstance(value, nn.Module) and hasattr(value, "__dict__"):
+            shared += share_module_attributes(value, directory, f"{prefix}-{name}")
+            del _shared_modules[f"{prefix}-{name}"]
+    _shared_modules[prefix] = shared
+    return shared
+
+
+def memory_usage(pid: Optional[int] = None) -> Dict[str, float]:
+    """
+    Resident (RSS) and proportional (PSS) memory of a process in MiB. PSS
+    splits shared pages between the processes mapping them, so it shows
+    what each worker really adds.
+    """
+    proc = f"/proc/{pid or 'self'}"
+    usage = {}
+    try:
+        with open(f"{proc}/smaps_rollup") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("Rss", "Pss", "Shared_Clean", "Private_Clean", "Private_Dirty"):
+                    usage[f"{key.lower()}_mb"] = round(int(value.split()[0]) / 1024, 1)
+    except OSError:
+        # Not Linux, or smaps_rollup unavailable: fall back to peak RSS
+        import resource
+
+        usage["max_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return usage
+
+
+register_metrics_source(
+    "memory",
+    lambda: {
+        "pid": os.getpid(),
+        "shared_weights_dir": SHARED_WEIGHTS_DIR,
+        "shared_modules": dict(_shared_modules),
+        **memory_usage(),
+    },
+)
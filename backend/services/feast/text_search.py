@@ -0,0 +1,143 @@
+"""
+Text search built once per worker and shared by all requests.
+
+``TextSearchEngine`` wraps a single ``SearchService`` and memoizes results by
+normalized query (case and whitespace folded) and ``k``. When an ANN index
+named ``text`` is loaded, queries are instead embedded in-process with
+``TextQueryEncoder``: concurrent queries are coalesced into one forward pass
+and embeddings are memoized too, then searched in the index.
+
+Each search is timed in three phases, reported under ``text_search``:
+``encode`` (query embedding, ANN path only), ``retrieve`` (nearest items;
+includes encoding on the ``SearchService`` path) and ``hydrate`` (product
+details).
+"""
+
+import os
+from collections import Counter
+from typing import Callable, List, Optional
+
+import numpy as np
+import torch
+from transformers import AutoModel, AutoTokenizer
+
+from models import Product
+from services.cache import LRUCache
+from services.feast.ann_index import AnnIndexRegistry
+from services.feast.micro_batcher import MicroBatcher
+from services.metrics import LatencyHistogram, register_metrics_source
+
+TEXT_SEARCH_CACHE_SIZE = int(os.getenv("TEXT_SEARCH_CACHE_SIZE", "10000"))
+TEXT_SEARCH_CACHE_TTL_SECONDS = float(os.getenv("TEXT_SEARCH_CACHE_TTL_SECONDS", "600"))
+TEXT_ENCODER_MAX_BATCH = int(os.getenv("TEXT_ENCODER_MAX_BATCH", "32"))
+TEXT_ENCODER_MAX_WAIT_MS = float(os.getenv("TEXT_ENCODER_MAX_WAIT_MS", "5"))
+TEXT_INDEX = "text"
+
+
+def normalize_query(text: str) -> str:
+    """Fold case and whitespace so trivially different queries share cache entries."""
+    return " ".join(text.casefold().split())
+
+
+class TextQueryEncoder:
+    """BGE sentence embeddings (CLS token, L2-normalised) for a batch of queries."""
+
+    def __init__(self, model_name: str):
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModel.from_pretrained(model_name).eval()
+
+    def __call__(self, texts: List[str]) -> List[np.ndarray]:
+        inputs = self.tokenizer(
+            texts, padding=True, truncation=True, max_length=512, return_tensors="pt"
+        )
+        with torch.inference_mode():
+            embeddings = self.model(**inputs).last_hidden_state[:, 0]
+        embeddings = torch.nn.functional.normalize(embeddings, dim=-1)
+        return list(embeddings.numpy())
+
+
+class TextSearchEngine:
+    def __init__(
+        self,
+        search_service,
+        ann_indexes: Optional[AnnIndexRegistry] = None,
+        encoder: Optional[Callable[[List[str]], List[np.ndarray]]] = None,
+        cache_size: int = TEXT_SEARCH_CACHE_SIZE,
+        cache_ttl: float = TEXT_SEARCH_CACHE_TTL_SECONDS,
+    ):
+        self.search_service = search_service
+        self.ann_indexes = ann_indexes
+        self.results = LRUCache(maxsize=cache_size, ttl=cache_ttl)
+        self.embeddings = LRUCache(maxsize=cache_size)
+        self.batcher = None
+        if encoder is not None:
+            self.batcher = MicroBatcher(
+                encoder,
+                max_batch_size=TEXT_ENCODER_MAX_BATCH,
+                max_wait_ms=TEXT_ENCODER_MAX_WAIT_MS,
+                name="text_encoder_batcher",
+            )
+        self.phases = {phase: LatencyHistogram() for phase in ("encode", "retrieve", "hydrate")}
+        self.searches: Counter = Counter()
+        register_metrics_source("text_search", self.stats)
+
+    @property
+    def uses_index(self) -> bool:
+        return (
+            self.batcher is not None
+            and self.ann_indexes is not None
+            and self.ann_indexes.get(TEXT_INDEX) is not None
+        )
+
+    def search(self, text: str, k: int, hydrate: Callable[[List], List[Product]]) -> List[Product]:
+        """Return the top-k products for text, hydrated from item IDs by hydrate."""
+        item_ids = self.search_ids(text, k)
+        with self.phases["hydrate"].time():
+            return hydrate(item_ids)
+
+    def search_ids(self, text: str, k: int) -> List:
+        """Top-k item IDs for text, memoized per normalized query."""
+        query = normalize_query(text)
+        item_ids = self.results.get((query, k))
+        if item_ids is None:
+            item_ids = self._search_ids(query, k)
+            self.results.put((query, k), item_ids)
+        return item_ids
+
+    def embed(self, query: str) -> np.ndarray:
+        """Embedding of an already normalized query."""
+        embedding = self.embeddings.get(query)
+        if embedding is None:
+            with self.phases["encode"].time():
+                embedding = self.batcher(query)
+            self.embeddings.put(query, embedding)
+        return embedding
+
+    def _search_ids(self, query: str, k: int) -> List:
+        if self.uses_index:
+            embedding = self.embed(query)
+            with self.phases["retrieve"].time():
+                item_ids = self.ann_indexes.search(TEXT_INDEX, embedding, k)
+            self.searches["ann_index"] += 1
+            return item_ids
+        with self.phases["retrieve"].time():
+            results_df = self.search_service.search_by_text(query, k)
+        self.searches["search_service"] += 1
+        return results_df["item_id"].tolist()
+
+    def close(self) -> None:
+        """Stop the query encoding thread, if any."""
+        if self.batcher is not None:
+            self.batcher.close()
+
+    def invalidate(self) -> None:
+        """Forget cached results, e.g. after the item embeddings were rebuilt."""
+        self.results.invalidate()
+
+    def stats(self) -> dict:
+        return {
+            "searches": dict(self.searches),
+            "result_cache": self.results.stats(),
+            "embedding_cache": self.embeddings.stats(),
+            "phases": {phase: histogram.snapshot() for phase, histogram in self.phases.items()},
+        }
@@ -0,0 +1,195 @@
+"""
+Bounded, single-download fetching of image URLs for image search.
+
+``ImageFetcher`` streams the response through one ``httpx.AsyncClient`` per
+worker (a shared, keep-alive connection pool) on the event loop. A fetch is
+abandoned as soon as it exceeds ``IMAGE_FETCH_MAX_BYTES``, takes longer than
+``IMAGE_FETCH_TIMEOUT_SECONDS`` in total, or its image header declares more
+than ``IMAGE_MAX_PIXELS``; only the header is parsed here, the full decode
+happens once in the encoder. Fetched bytes are kept in a small URL-keyed LRU
+and concurrent requests for the same URL share one download.
+"""
+
+import asyncio
+import os
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from fastapi import HTTPException, status
+from PIL import ImageFile
+
+from services.cache import LRUCache
+from services.metrics import LatencyHistogram, register_metrics_source
+
+IMAGE_FETCH_TIMEOUT_SECONDS = float(os.getenv("IMAGE_FETCH_TIMEOUT_SECONDS", "10"))
+IMAGE_FETCH_MAX_BYTES = int(os.getenv("IMAGE_FETCH_MAX_BYTES", str(5 * 1024 * 1024)))
+IMAGE_FETCH_MAX_CONNECTIONS = int(os.getenv("IMAGE_FETCH_MAX_CONNECTIONS", "20"))
+IMAGE_FETCH_CACHE_SIZE = int(os.getenv("IMAGE_FETCH_CACHE_SIZE", "32"))
+IMAGE_FETCH_CACHE_TTL_SECONDS = float(os.getenv("IMAGE_FETCH_CACHE_TTL_SECONDS", "600"))
+IMAGE_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", str(40_000_000)))
+
+
+class ImageFetchError(HTTPException):
+    def __init__(self, detail: str = "Invalid or unreachable image URL."):
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+class ImageTooLargeError(HTTPException):
+    def __init__(self, detail: str):
+        super().__init__(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=detail)
+
+
+class ImageFetchTimeoutError(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Image URL did not respond within {IMAGE_FETCH_TIMEOUT_SECONDS:g}s.",
+        )
+
+
+class ImageFetcher:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ImageFetcher, cls).__new__(cls)
+            cls._instance._initialize()
+        return cls._instance
+
+    def _initialize(self):
+        self.client: Optional[httpx.AsyncClient] = None
+        self.cache = LRUCache(maxsize=IMAGE_FETCH_CACHE_SIZE, ttl=IMAGE_FETCH_CACHE_TTL_SECONDS)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.latency = LatencyHistogram()
+        self.downloads = 0
+        self.shared = 0
+        self.rejected = 0
+        self.bytes_fetched = 0
+        register_metrics_source("image_fetcher", self.stats)
+
+    @classmethod
+    async def shutdown(cls) -> None:
+        """Close the connection pool"""
+        if cls._instance is not None:
+            if cls._instance.client is not None:
+                await cls._instance.client.aclose()
+            cls._instance = None
+
+    def _client(self) -> httpx.AsyncClient:
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                timeout=IMAGE_FETCH_TIMEOUT_SECONDS,
+                limits=httpx.Limits(max_connections=IMAGE_FETCH_MAX_CONNECTIONS),
+                follow_redirects=True,
+                max_redirects=3,
+            )
+        return self.client
+
+    async def fetch(self, url: str) -> bytes:
+        """
+        Return the bytes of the image at url, downloading it at most once
+        for concurrent and repeated requests. The download runs as its own
+        task, so a requester that is cancelled does not cancel it for others.
+        """
+        content = self.cache.get(url)
+        if content is not None:
+            return content
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._download_and_cache(url))
+            self._inflight[url] = task
+            task.add_done_callback(lambda done: self._download_finished(url, done))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    async def _download_and_cache(self, url: str) -> bytes:
+        content = await self._download(url)
+        self.cache.put(url, content)
+        return content
+
+    def _download_finished(self, url: str, task: asyncio.Task) -> None:
+        if self._inflight.get(url) is task:
+            del self._inflight[url]
+        if not task.cancelled():
+            # Mark retrieved so a download every requester gave up on doesn't log a warning
+            task.exception()
+
+    async def _download(self, url: str) -> bytes:
+        if urlsplit(url).scheme not in ("http", "https"):
+            self.rejected += 1
+            raise ImageFetchError("Only http(s) image URLs are supported.")
+        self.downloads += 1
+        try:
+            with self.latency.time():
+                return await asyncio.wait_for(self._stream(url), IMAGE_FETCH_TIMEOUT_SECONDS)
+        except (asyncio.TimeoutError, httpx.TimeoutException):
+            self.rejected += 1
+            raise ImageFetchTimeoutError()
+        except HTTPException:
+            self.rejected += 1
+            raise
+        except Exception as e:
+            self.rejected += 1
+            print(f"[ImageFetcher] Could not fetch {url}: {e}")
+            raise ImageFetchError()
+
+    async def _stream(self, url: str) -> bytes:
+        async with self._client().stream("GET", url) as response:
+            response.raise_for_status()
+            declared = response.headers.get("content-length")
+            if (
+                declared is not None
+                and declared.isdigit()
+                and int(declared) > IMAGE_FETCH_MAX_BYTES
+            ):
+                raise ImageTooLargeError(_too_many_bytes())
+
+            parser: Optional[ImageFile.Parser] = ImageFile.Parser()
+            chunks = []
+            size = 0
+            async for chunk in response.aiter_bytes():
+                size += len(chunk)
+                if size > IMAGE_FETCH_MAX_BYTES:
+                    raise ImageTooLargeError(_too_many_bytes())
+                chunks.append(chunk)
+                if parser is not None:
+                    parser = _check_header(parser, chunk)
+
+        if parser is not None:
+            # The whole body arrived without a recognisable image header
+            raise ImageFetchError("URL does not point to a supported image.")
+        self.bytes_fetched += size
+        return b"".join(chunks)
+
+    def stats(self) -> dict:
+        return {
+            "downloads": self.downloads,
+            "shared_downloads": self.shared,
+            "rejected": self.rejected,
+            "bytes_fetched": self.bytes_fetched,
+            "latency": self.latency.snapshot(),
+            "cache": self.cache.stats(),
+        }
+
+
+def _too_many_bytes() -> str:
+    return f"Image is larger than {IMAGE_FETCH_MAX_BYTES // 1024} KiB."
+
+
+def _check_header(parser: ImageFile.Parser, chunk: bytes) -> Optional[ImageFile.Parser]:
+    """
+    Feed chunk to parser until the image header has been read, then reject
+    images declaring too many pixels. Returns None once the header passed.
+    """
+    try:
+        parser.feed(chunk)
+    except Exception:
+        raise ImageFetchError("URL does not point to a supported image.")
+    if parser.image is None:
+        return parser
+    width, height = parser.image.size
+    if width * height > IMAGE_MAX_PIXELS:
+        raise ImageTooLargeError(f"Image is {width}x{height}, at most {IMAGE_MAX_PIXELS} pixels.")
+    return None
@@ -0,0 +1,123 @@
+"""
+Bounded thread pool for blocking model inference and feature-store calls.
+
+Async route handlers hand CPU-bound or blocking work to the executor so the
+event loop keeps serving other requests. Admission is capped at
+``max_workers + max_queue`` in-flight calls; anything beyond that is rejected
+immediately with a 429 instead of queueing without bound.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, status
+
+from services.metrics import LatencyHistogram, register_metrics_source
+
+INFERENCE_MAX_WORKERS = int(os.getenv("INFERENCE_MAX_WORKERS", "4"))
+INFERENCE_MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", "32"))
+INFERENCE_TIMEOUT_SECONDS = float(os.getenv("INFERENCE_TIMEOUT_SECONDS", "30"))
+
+
+class InferenceSaturatedError(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Inference capacity exhausted, please retry shortly.",
+            headers={"Retry-After": "1"},
+        )
+
+
+class InferenceTimeoutError(HTTPException):
+    def __init__(self, timeout: float):
+        super().__init__(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Inference did not complete within {timeout:g} seconds.",
+        )
+
+
+class InferenceExecutor:
+    def __init__(
+        self,
+        max_workers: int = INFERENCE_MAX_WORKERS,
+        max_queue: int = INFERENCE_MAX_QUEUE,
+        timeout: float = INFERENCE_TIMEOUT_SECONDS,
+        name: str = "inference",
+    ):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._queue_wait = LatencyHistogram()
+        self._run_time = LatencyHistogram()
+        register_metrics_source(name, self.metrics)
+
+    def _acquire(self) -> None:
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise InferenceSaturatedError()
+            self._in_flight += 1
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def _call(self, submitted_at: float, fn: Callable, args, kwargs):
+        started_at = time.perf_counter()
+        self._queue_wait.observe(started_at - submitted_at)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._run_time.observe(time.perf_counter() - started_at)
+
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Run ``fn(*args, **kwargs)`` on the pool and await its result.
+
+        Raises InferenceSaturatedError when the pool and its queue are full and
+        InferenceTimeoutError when the call exceeds its timeout. A timed-out call
+        that already started keeps its slot until the worker thread finishes.
+        """
+        self._acquire()
+        try:
+            future = self._pool.submit(self._call, time.perf_counter(), fn, args, kwargs)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._timed_out += 1
+            raise InferenceTimeoutError(timeout)
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            in_flight = self._in_flight
+            rejected = self._rejected
+            timed_out = self._timed_out
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": in_flight,
+            "queued": max(in_flight - self.max_workers, 0),
+            "rejected": rejected,
+            "timed_out": timed_out,
+            "queue_wait": self._queue_wait.snapshot(),
+            "run_time": self._run_time.snapshot(),
+        }
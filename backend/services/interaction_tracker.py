@@ -0,0 +1,72 @@
+"""
+Interaction tracking off the request path.
+
+Route handlers hand events to ``interaction_tracker.track`` together with the
+request's ``BackgroundTasks``; FastAPI delivers them to Kafka in its thread
+pool after the response has been sent. Producer start-up, serialisation,
+spilling and broker errors therefore never delay or fail the request, a
+failed delivery is only counted and logged.
+"""
+
+from typing import Any, Dict, List
+
+from fastapi import BackgroundTasks
+
+from services.kafka_service import KafkaService
+from services.metrics import LatencyHistogram, register_metrics_source
+
+
+class InteractionTracker:
+    def __init__(self):
+        self.scheduled = 0
+        self.delivered = 0
+        self.failed = 0
+        self.delivery = LatencyHistogram()
+        register_metrics_source("interaction_tracking", self.stats)
+
+    def track(
+        self,
+        background_tasks: BackgroundTasks,
+        user_id: str,
+        item_id: str,
+        interaction_type: str,
+        **fields: Any,
+    ) -> None:
+        """Send one interaction event once the response is on its way."""
+        event = {"item_id": item_id, "interaction_type": interaction_type, **fields}
+        self.track_many(background_tasks, user_id, [event])
+
+    def track_many(
+        self, background_tasks: BackgroundTasks, user_id: str, events: List[Dict[str, Any]]
+    ) -> None:
+        """Send a user's interaction events (``send_interaction`` kwargs) in one task."""
+        if events:
+            self.scheduled += len(events)
+            background_tasks.add_task(self._deliver, str(user_id), events)
+
+    def _deliver(self, user_id: str, events: List[Dict[str, Any]]) -> None:
+        with self.delivery.time():
+            try:
+                kafka = KafkaService()
+            except Exception as e:
+                self.failed += len(events)
+                print(f"[Tracking] Kafka unavailable, dropped {len(events)} events: {e}")
+                return
+            for event in events:
+                try:
+                    kafka.send_interaction(user_id=user_id, **event)
+                    self.delivered += 1
+                except Exception as e:
+                    self.failed += 1
+                    print(f"[Tracking] Failed to send {event['interaction_type']} event: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "scheduled": self.scheduled,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "delivery": self.delivery.snapshot(),
+        }
+
+
+interaction_tracker = InteractionTracker()
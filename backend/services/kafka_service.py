@@ -1,117 +1,59 @@
-import json
 import os
+import threading
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional, Union
 
 from kafka import KafkaProducer
 
+from services.event_pipeline import EventPipeline
+from services.event_serializers import get_serializer
+from services.memory_broker import InMemoryBroker
+
 
 class KafkaService:
     _instance = None
+    # First use can come from several threadpool tasks at once; without the
+    # lock each would start its own producer and pipeline thread
+    _instance_lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(KafkaService, cls).__new__(cls)
-            cls._instance._initialize()
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super(KafkaService, cls).__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
         return cls._instance
 
     def _initialize(self):
-        """Initialize the Kafka producer"""
+        """Initialize the Kafka producer and the background delivery pipeline"""
+        self.producer = self._create_producer()
+        self.serializer = get_serializer()
+        self.pipeline = EventPipeline(self.producer).start()
+
+    @staticmethod
+    def _create_producer():
+        if os.getenv("KAFKA_BROKER", "kafka") == "memory":
+            return InMemoryBroker()
         kafka_service = os.getenv(
             "KAFKA_SERVICE_ADDR",
             "rec-sys-cluster-kafka-bootstrap.rec-sys.svc.cluster.local:9092",
         )
-        self.producer = KafkaProducer(
+        return KafkaProducer(
             bootstrap_servers=kafka_service,
-            value_serializer=lambda v: json.dumps(v).encode("utf-8"),
+            compression_type=os.getenv("KAFKA_COMPRESSION", "gzip"),
         )
 
-    def _build_interaction_schema(self) -> Dict[str, Any]:
-        """Build the schema for interaction messages"""
-        return {
-            "type": "struct",
-            "fields": [
-                {
-                    "field": "user_id",
-                    "type": "string",
-                    "optional": False,
-                },
-                {
-                    "field": "item_id",
-                    "type": "string",
-                    "optional": False,
-                },
-                {
-                    "field": "timestamp",
-                    "type": "string",
-                    "optional": False,
-                    "format": "timestamp",
-                },
-                {
-                    "field": "interaction_type",
-                    "type": "string",
-                    "optional": False,
-                },
-                {
-                    "field": "rating",
-                    "type": "float64",
-                    "optional": True,
-                },
-                {
-                    "field": "quantity",
-                    "type": "float64",
-                    "optional": True,
-                },
-                {
-                    "field": "interaction_id",
-                    "type": "string",
-                    "optional": False,
-                },
-                {
-                    "field": "review_title",
-                    "type": "string",
-                    "optional": True,
-                },
-                {
-                    "field": "review_content",
-                    "type": "string",
-                    "optional": True,
-                },
-            ],
-            "optional": False,
-            "name": "interaction",
-        }
+    @classmethod
+    def shutdown(cls) -> None:
+        """Deliver (or spill) queued events and close the producer"""
+        with cls._instance_lock:
+            if cls._instance is not None:
+                cls._instance.pipeline.close()
+                cls._instance = None
 
-    def _build_new_user_schema(self) -> Dict[str, Any]:
-        """Build the schema for new user messages"""
-        return {
-            "type": "struct",
-            "fields": [
-                {
-                    "field": "user_id",
-                    "type": "string",
-                    "optional": False,
-                },
-                {
-                    "field": "user_name",
-                    "type": "string",
-                    "optional": False,
-                },
-                {
-                    "field": "preferences",
-                    "type": "string",
-                    "optional": False,
-                },
-                {
-                    "field": "signup_date",
-                    "type": "string",
-                    "optional": False,
-                    "format": "timestamp",
-                },
-            ],
-            "optional": False,
-            "name": "new-users",
-        }
+    def _publish(self, topic: str, payload: Dict[str, Any]) -> None:
+        self.pipeline.publish(topic, self.serializer.encode(topic, payload))
 
     def send_interaction(
         self,
@@ -124,7 +66,6 @@ class KafkaService:
         review_content: Optional[str] = None,
     ) -> None:
         """Send an interaction event to Kafka"""
-        schema = self._build_interaction_schema()
         interaction = {
             "user_id": str(user_id),
             "item_id": item_id,
@@ -138,19 +79,14 @@ class KafkaService:
                 {datetime.now(timezone.utc).timestamp()}",
             # example unique ID
         }
-        message = {"schema": schema, "payload": interaction}
-        self.producer.send("interactions", message)
-        self.producer.flush()
+        self._publish("interactions", interaction)
 
     def send_new_user(self, user_id: Union[int, str], user_name: str, preferences: str) -> None:
         """Send a new user event to Kafka"""
-        schema = self._build_new_user_schema()
         user_data = {
             "user_id": str(user_id),
             "user_name": str(user_name),
             "preferences": str(preferences),
             "signup_date": datetime.now().isoformat(" "),
         }
-        message = {"schema": schema, "payload": user_data}
-        self.producer.send("new-users", message)
-        self.producer.flush()
+        self._publish("new-users", user_data)
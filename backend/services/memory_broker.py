@@ -0,0 +1,70 @@
+"""
+In-memory stand-in for KafkaProducer.
+
+Implements the subset of the kafka-python producer API used by EventPipeline
+(send / flush / close) so the event path can be tested and benchmarked without
+a broker. Enable it for the whole app with ``KAFKA_BROKER=memory``.
+"""
+
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+
+class BrokerUnavailableError(Exception):
+    pass
+
+
+class _MemoryFuture:
+    def __init__(self):
+        self.exception: Optional[Exception] = None
+        self.is_done = False
+
+    def _resolve(self, exception: Optional[Exception] = None) -> None:
+        self.exception = exception
+        self.is_done = True
+
+    def succeeded(self) -> bool:
+        return self.is_done and self.exception is None
+
+    def failed(self) -> bool:
+        return self.is_done and self.exception is not None
+
+
+class InMemoryBroker:
+    def __init__(self, flush_latency: float = 0.0):
+        self.flush_latency = flush_latency
+        self.messages: Dict[str, List[bytes]] = defaultdict(list)
+        self.flush_calls = 0
+        self._pending = []
+        self._fail_remaining = 0
+        self._lock = threading.Lock()
+
+    def fail_next(self, count: int) -> None:
+        """Make the next ``count`` sends fail with BrokerUnavailableError."""
+        with self._lock:
+            self._fail_remaining = count
+
+    def send(self, topic: str, value: bytes) -> _MemoryFuture:
+        future = _MemoryFuture()
+        with self._lock:
+            if self._fail_remaining > 0:
+                self._fail_remaining -= 1
+                future._resolve(BrokerUnavailableError("simulated broker failure"))
+            else:
+                self._pending.append((topic, value, future))
+        return future
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        if self.flush_latency:
+            time.sleep(self.flush_latency)
+        with self._lock:
+            self.flush_calls += 1
+            pending, self._pending = self._pending, []
+            for topic, value, future in pending:
+                self.messages[topic].append(value)
+                future._resolve()
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        self.flush(timeout)
@@ -0,0 +1,106 @@
+"""
+Lightweight in-process metrics shared by the backend services.
+
+Subsystems register a callable returning a JSON-serialisable dict with
+`register_metrics_source`; `/health/metrics` reports all of them at once.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Sequence
+
+# Upper bounds in seconds, roughly log-spaced from 1ms to 10s
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class LatencyHistogram:
+    """Thread-safe bucketed latency histogram reporting in milliseconds."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self._buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts = [0] * (len(self._buckets) + 1)
+            self._count = 0
+            self._sum = 0.0
+            self._max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        index = bisect.bisect_left(self._buckets, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += seconds
+            if seconds > self._max:
+                self._max = seconds
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def _quantile(self, counts, q: float) -> float:
+        rank = q * self._count
+        seen = 0
+        for index, count in enumerate(counts):
+            seen += count
+            if count and seen >= rank:
+                if index < len(self._buckets):
+                    return min(self._buckets[index], self._max)
+                return self._max
+        return 0.0
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            counts = list(self._counts)
+            if not self._count:
+                return {"count": 0}
+            return {
+                "count": self._count,
+                "avg_ms": round(self._sum / self._count * 1000, 3),
+                "p50_ms": round(self._quantile(counts, 0.50) * 1000, 3),
+                "p95_ms": round(self._quantile(counts, 0.95) * 1000, 3),
+                "p99_ms": round(self._quantile(counts, 0.99) * 1000, 3),
+                "max_ms": round(self._max * 1000, 3),
+            }
+
+
+_sources: Dict[str, Callable[[], dict]] = {}
+
+
+def register_metrics_source(name: str, source: Callable[[], dict]) -> None:
+    """Register (or replace) a named metrics provider."""
+    _sources[name] = source
+
+
+def collect_metrics() -> Dict[str, dict]:
+    """Snapshot every registered metrics provider."""
+    metrics = {}
+    for name, source in list(_sources.items()):
+        try:
+            metrics[name] = source()
+        except Exception as e:
+            metrics[name] = {"error": str(e)}
+    return metrics
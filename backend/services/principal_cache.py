@@ -0,0 +1,84 @@
+"""
+Resolution of the authenticated user behind a JWT without a query per request.
+
+Resolved users are kept in a short-lived LRU keyed by user_id and handed out
+as fresh, session-less ``User`` instances, so concurrent requests never share
+an ORM object. Routes that modify the user must load it into their own
+session (``db.get(User, user.user_id)``) and call ``invalidate`` afterwards.
+Other workers see the change once their entry expires.
+
+With ``AUTH_STATELESS_TOKENS`` enabled, tokens also carry the profile claims
+and requests presenting such a token skip both the cache and the database.
+A token is then only as fresh as its claims; endpoints that change the
+profile return a new token.
+"""
+
+import os
+from datetime import date
+from typing import Optional
+
+from database.models_sql import User
+from services.cache import LRUCache
+from services.metrics import register_metrics_source
+
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "30"))
+AUTH_STATELESS_TOKENS = os.getenv("AUTH_STATELESS_TOKENS", "false").lower() == "true"
+
+# Columns exposed to route handlers; password hashes are never cached
+PRINCIPAL_FIELDS = ("user_id", "email", "age", "gender", "signup_date", "preferences")
+_CLAIMS = "profile"
+
+
+def principal_claims(user: User) -> dict:
+    """Profile claims to embed in a token when stateless tokens are enabled."""
+    if not AUTH_STATELESS_TOKENS:
+        return {}
+    profile = {field: getattr(user, field) for field in PRINCIPAL_FIELDS if field != "user_id"}
+    if profile["signup_date"] is not None:
+        profile["signup_date"] = profile["signup_date"].isoformat()
+    return {_CLAIMS: profile}
+
+
+def user_from_claims(user_id: str, payload: dict) -> Optional[User]:
+    """Rebuild the user from a token's profile claims, or None if it has none."""
+    profile = payload.get(_CLAIMS)
+    if not AUTH_STATELESS_TOKENS or not isinstance(profile, dict):
+        return None
+    values = {field: profile.get(field) for field in PRINCIPAL_FIELDS if field != "user_id"}
+    if values["signup_date"] is not None:
+        values["signup_date"] = date.fromisoformat(values["signup_date"])
+    return User(user_id=user_id, **values)
+
+
+class PrincipalCache:
+    def __init__(self, maxsize: int = AUTH_CACHE_SIZE, ttl: float = AUTH_CACHE_TTL_SECONDS):
+        self.users = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.token_hits = 0
+        self.db_lookups = 0
+        register_metrics_source("auth", self.stats)
+
+    def get(self, user_id: str) -> Optional[User]:
+        values = self.users.get(user_id)
+        return User(**values) if values is not None else None
+
+    def put(self, user: User) -> None:
+        self.users.put(user.user_id, {field: getattr(user, field) for field in PRINCIPAL_FIELDS})
+
+    def invalidate(self, user_id: str) -> None:
+        self.users.invalidate([user_id])
+
+    def stats(self) -> dict:
+        avoided = self.users.hits + self.token_hits
+        resolved = avoided + self.db_lookups
+        return {
+            "stateless_tokens": AUTH_STATELESS_TOKENS,
+            "cache": self.users.stats(),
+            "token_hits": self.token_hits,
+            "db_lookups": self.db_lookups,
+            "db_lookups_avoided": avoided,
+            "avoided_ratio": round(avoided / resolved, 4) if resolved else 0.0,
+        }
+
+
+principal_cache = PrincipalCache()
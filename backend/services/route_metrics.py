@@ -0,0 +1,65 @@
+"""
+Per-route request latency.
+
+``RouteLatencyMiddleware`` times every HTTP request until the last byte of
+its response has been sent and records it under the route's path template
+(``GET /products/{product_id}``), reported under ``routes``. Background
+tasks run after that point, so work moved into them does not count
+towards the route's latency.
+"""
+
+import time
+from typing import Callable, Dict, Optional
+
+from services.metrics import LatencyHistogram, register_metrics_source
+
+
+class RouteLatencyMiddleware:
+    def __init__(self, app, name: str = "routes"):
+        self.app = app
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._templates: Optional[Dict[Callable, str]] = None
+        register_metrics_source(name, self.stats)
+
+    def _route(self, scope) -> Optional[str]:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return None
+        if self._templates is None:
+            # Routes are all registered by the first request
+            self._templates = {
+                route.endpoint: route.path
+                for route in scope["app"].routes
+                if hasattr(route, "endpoint")
+            }
+        return self._templates.get(endpoint)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        elapsed = None
+
+        async def timed_send(message):
+            nonlocal elapsed
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body"):
+                elapsed = time.perf_counter() - started
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            path = self._route(scope)
+            if path is not None:
+                key = f"{scope['method']} {path}"
+                histogram = self.histograms.get(key)
+                if histogram is None:
+                    histogram = self.histograms.setdefault(key, LatencyHistogram())
+                histogram.observe(
+                    elapsed if elapsed is not None else time.perf_counter() - started
+                )
+
+    def stats(self) -> dict:
+        return {key: histogram.snapshot() for key, histogram in sorted(self.histograms.items())}
@@ -1,14 +1,26 @@
 # services/security.py
+import asyncio
+import multiprocessing
 import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Sequence
 
+from fastapi import HTTPException, status
 from jose import jwt
 from passlib.context import CryptContext
 
+from services.metrics import LatencyHistogram, register_metrics_source
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=6)
 SECRET_KEY = os.getenv("SECRET_KEY", "supersecret")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 1 day
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+PASSWORD_HASH_CHUNK_SIZE = 64
 
 
 def hash_password(plain: str) -> str:
@@ -19,7 +31,119 @@ def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
 
-def create_access_token(subject: str) -> str:
+def hash_passwords(passwords: Sequence[str]) -> List[str]:
+    return [pwd_context.hash(plain) for plain in passwords]
+
+
+class PasswordHashingSaturatedError(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many concurrent sign-ins, please retry shortly.",
+            headers={"Retry-After": "1"},
+        )
+
+
+class PasswordHasher:
+    """
+    bcrypt hashing and verification on a bounded process pool.
+
+    bcrypt is deliberately slow CPU work; running it in the request handler
+    stalls every other request on the event loop. Calls from route handlers
+    are admitted up to ``max_workers + max_queue`` in flight and rejected with
+    a 429 beyond that. ``hash_many`` is for bulk jobs (seeding) and spreads
+    chunks across all workers without admission control.
+    """
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(PasswordHasher, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(
+        self,
+        max_workers: int = PASSWORD_HASH_WORKERS,
+        max_queue: int = PASSWORD_HASH_MAX_QUEUE,
+    ):
+        if not self._initialized:
+            self._initialized = True
+            self.max_workers = max_workers
+            self.max_queue = max_queue
+            self._pool: Optional[ProcessPoolExecutor] = None
+            self._lock = threading.Lock()
+            self._in_flight = 0
+            self._rejected = 0
+            self._hash_time = LatencyHistogram()
+            self._verify_time = LatencyHistogram()
+            register_metrics_source("password_hashing", self.metrics)
+
+    @classmethod
+    def shutdown(cls) -> None:
+        if cls._instance is not None and cls._instance._pool is not None:
+            cls._instance._pool.shutdown(wait=False, cancel_futures=True)
+        cls._instance = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a worker that already runs Kafka/Feast threads is unsafe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    async def _run(self, histogram: LatencyHistogram, fn, *args):
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise PasswordHashingSaturatedError()
+            self._in_flight += 1
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor(), fn, *args)
+        finally:
+            histogram.observe(time.perf_counter() - started)
+            with self._lock:
+                self._in_flight -= 1
+
+    async def hash(self, plain: str) -> str:
+        return await self._run(self._hash_time, hash_password, plain)
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        return await self._run(self._verify_time, verify_password, plain, hashed)
+
+    async def hash_many(
+        self, passwords: Sequence[str], chunk_size: int = PASSWORD_HASH_CHUNK_SIZE
+    ) -> List[str]:
+        """Hash passwords in parallel chunks, preserving order."""
+        loop = asyncio.get_running_loop()
+        executor = self._executor()
+        chunks = [
+            loop.run_in_executor(executor, hash_passwords, passwords[i : i + chunk_size])
+            for i in range(0, len(passwords), chunk_size)
+        ]
+        return [hashed for chunk in await asyncio.gather(*chunks) for hashed in chunk]
+
+    def metrics(self) -> dict:
+        with self._lock:
+            in_flight = self._in_flight
+            rejected = self._rejected
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": in_flight,
+            "rejected": rejected,
+            "hash_time": self._hash_time.snapshot(),
+            "verify_time": self._verify_time.snapshot(),
+        }
+
+
+def create_access_token(subject: str, claims: Optional[dict] = None) -> str:
     expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode = {"sub": subject, "exp": expire}
+    to_encode = {**(claims or {}), "sub": subject, "exp": expire}
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
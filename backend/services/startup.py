@@ -0,0 +1,148 @@
+"""
+Background loading of slow service components (models, stores, indexes).
+
+Components are registered with a factory and loaded on their own threads as
+soon as ``start`` is called, so independent ones initialise concurrently.
+A factory may ``get`` another component; it simply waits for it. Lazy
+components are only loaded on first use. Hot paths that should not wait use
+``require``, which returns a loaded component or raises a 503 while it is
+still loading. A failed component is retried on its next use.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException, status
+
+from services.metrics import register_metrics_source
+
+
+class ComponentNotReadyError(HTTPException):
+    def __init__(self, name: str, retry_after: int = 5):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"'{name}' is still loading, please retry shortly",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class _Component:
+    def __init__(self, name: str, factory: Callable[[], Any], lazy: bool):
+        self.name = name
+        self.factory = factory
+        self.lazy = lazy
+        self.state = "pending"
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+        self.done = threading.Event()
+        self.attempts = 0
+        self.started_at: Optional[float] = None
+        self.duration: Optional[float] = None
+
+
+class ComponentLoader:
+    def __init__(self, name: str = "startup"):
+        self._components: Dict[str, _Component] = {}
+        self._lock = threading.Lock()
+        self._created_at = time.perf_counter()
+        register_metrics_source(name, self.stats)
+
+    def register(self, name: str, factory: Callable[[], Any], lazy: bool = False) -> None:
+        self._components[name] = _Component(name, factory, lazy)
+
+    def start(self) -> None:
+        """Begin loading every eager component concurrently."""
+        for component in self._components.values():
+            if not component.lazy:
+                self._load_async(component)
+
+    def _load_async(self, component: _Component) -> threading.Event:
+        with self._lock:
+            if component.state in ("pending", "failed"):
+                component.state = "loading"
+                component.done = threading.Event()
+                threading.Thread(
+                    target=self._load,
+                    args=(component,),
+                    name=f"load-{component.name}",
+                    daemon=True,
+                ).start()
+            return component.done
+
+    def _load(self, component: _Component) -> None:
+        component.attempts += 1
+        component.started_at = time.perf_counter()
+        try:
+            value = component.factory()
+        except Exception as e:
+            print(f"[Startup] Failed to load {component.name}: {e}")
+            component.error = e
+            component.state = "failed"
+        else:
+            component.value = value
+            component.error = None
+            component.state = "ready"
+        finally:
+            component.duration = time.perf_counter() - component.started_at
+            if component.state == "ready":
+                print(f"[Startup] Loaded {component.name} in {component.duration:.2f}s")
+            component.done.set()
+
+    def get(self, name: str, timeout: Optional[float] = None) -> Any:
+        """Return the component, loading it (or retrying a failed load) and waiting if needed."""
+        component = self._components[name]
+        if component.state == "ready":
+            return component.value
+        if not self._load_async(component).wait(timeout):
+            raise TimeoutError(f"Timed out waiting for '{name}' to load")
+        if component.state != "ready":
+            raise RuntimeError(f"'{name}' failed to load") from component.error
+        return component.value
+
+    def loaded(self, name: str) -> Any:
+        """Return the component if it has loaded, otherwise None (without loading it)."""
+        component = self._components[name]
+        return component.value if component.state == "ready" else None
+
+    def require(self, name: str) -> Any:
+        """Return the component if loaded, otherwise start loading it and raise a 503."""
+        component = self._components[name]
+        if component.state != "ready":
+            self._load_async(component)
+            raise ComponentNotReadyError(name)
+        return component.value
+
+    def set(self, name: str, value: Any) -> None:
+        """Replace a loaded component, e.g. after a model update."""
+        component = self._components[name]
+        component.value = value
+        component.state = "ready"
+        component.done.set()
+
+    def ready(self) -> bool:
+        """True once every eager component has loaded; retries eager components that failed."""
+        eager = [c for c in self._components.values() if not c.lazy]
+        for component in eager:
+            if component.state == "failed":
+                self._load_async(component)
+        return all(c.state == "ready" for c in eager)
+
+    def stats(self) -> dict:
+        return {
+            name: {
+                "state": component.state,
+                "lazy": component.lazy,
+                "attempts": component.attempts,
+                "started_after_ms": (
+                    round((component.started_at - self._created_at) * 1000, 2)
+                    if component.started_at is not None
+                    else None
+                ),
+                "duration_ms": (
+                    round(component.duration * 1000, 2) if component.duration is not None else None
+                ),
+                "error": str(component.error) if component.error is not None else None,
+            }
+            for name, component in self._components.items()
+        }
@@ -0,0 +1,64 @@
+"""
+Recall-vs-latency of IVFIndex against exact NumPy brute-force search.
+
+    python -m tests.benchmarks.ann_index_benchmark --items 20000 --dim 64
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from services.feast.ann_index import IVFIndex
+
+
+def clustered(n: int, dim: int, clusters: int, rng) -> np.ndarray:
+    centers = rng.normal(size=(clusters, dim))
+    points = centers[rng.integers(0, clusters, n)] + 0.3 * rng.normal(size=(n, dim))
+    return points.astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=64)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = clustered(args.items, args.dim, 100, rng)
+    queries = clustered(args.queries, args.dim, 100, rng)
+    normed = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    start = time.perf_counter()
+    index = IVFIndex.build(range(args.items), vectors, nlist=args.nlist)
+    print(f"built {len(index)} x {args.dim} index, nlist={index.nlist}")
+    print(f"build time {time.perf_counter() - start:.2f}s\n")
+
+    start = time.perf_counter()
+    exact = []
+    for query in queries:
+        scores = normed @ (query / np.linalg.norm(query))
+        top = np.argpartition(-scores, args.k)[: args.k]
+        exact.append({str(i) for i in top})
+    brute_ms = (time.perf_counter() - start) / len(queries) * 1000
+    print(f"{'search':<16}{'recall@k':>10}{'ms/query':>10}")
+    print(f"{'brute force':<16}{1.0:>10.3f}{brute_ms:>10.3f}")
+
+    for nprobe in (1, 2, 4, 8, 16, 32):
+        if nprobe > index.nlist:
+            break
+        start = time.perf_counter()
+        hits = 0
+        for query, truth in zip(queries, exact):
+            ids, _ = index.search(query, args.k, nprobe=nprobe)
+            hits += len(truth.intersection(ids))
+        elapsed = (time.perf_counter() - start) / len(queries) * 1000
+        recall = hits / (len(queries) * args.k)
+        print(f"{f'ivf nprobe={nprobe}':<16}{recall:>10.3f}{elapsed:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
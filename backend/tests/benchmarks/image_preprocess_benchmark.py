@@ -0,0 +1,82 @@
+"""
+Per-image preprocessing time for image search, before and after.
+
+``baseline`` is the previous upload path: open, ``verify()``, reopen, decode
+at full resolution and let the CLIP processor resize to 224px.
+``prepare_image`` decodes once (JPEG in draft mode) and hands the encoder an
+image that is already at its input size. Both finish with the same resize so
+the numbers compare the work done per upload:
+
+    python -m tests.benchmarks.image_preprocess_benchmark --repeat 10
+"""
+
+import argparse
+import time
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from services.feast.image_preprocess import CLIP_IMAGE_SIZE, prepare_image
+
+SIZES = ((640, 480), (1920, 1080), (4000, 3000))
+FORMATS = ("JPEG", "PNG", "WEBP")
+
+
+def make_image(width: int, height: int, fmt: str) -> bytes:
+    rng = np.random.default_rng(0)
+    # Smooth noise compresses like a photo rather than like a flat colour
+    small = rng.integers(0, 255, (height // 16 + 1, width // 16 + 1, 3), dtype=np.uint8)
+    image = Image.fromarray(small, "RGB").resize((width, height), Image.Resampling.BILINEAR)
+    buffer = BytesIO()
+    image.save(buffer, format=fmt, quality=90)
+    return buffer.getvalue()
+
+
+def clip_resize(image: Image.Image) -> Image.Image:
+    scale = CLIP_IMAGE_SIZE / min(image.size)
+    target = (round(image.width * scale), round(image.height * scale))
+    return image.resize(target, Image.Resampling.BICUBIC)
+
+
+def baseline(content: bytes) -> Image.Image:
+    image = Image.open(BytesIO(content))
+    image.verify()
+    image = Image.open(BytesIO(content)).convert("RGB")
+    return clip_resize(image)
+
+
+def prepared(content: bytes) -> Image.Image:
+    return clip_resize(prepare_image(content))
+
+
+def median_ms(fn, content: bytes, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(content)
+        timings.append(time.perf_counter() - started)
+    return float(np.median(timings)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    print(
+        f"{'format':>6} {'size':>10} {'KiB':>7} {'baseline':>10} {'prepared':>10} {'speed-up':>9}"
+    )
+    for fmt in FORMATS:
+        for width, height in SIZES:
+            content = make_image(width, height, fmt)
+            before = median_ms(baseline, content, args.repeat)
+            after = median_ms(prepared, content, args.repeat)
+            print(
+                f"{fmt:>6} {width:>4}x{height:<5} {len(content) / 1024:7.0f} "
+                f"{before:8.1f}ms {after:8.1f}ms {before / after:8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
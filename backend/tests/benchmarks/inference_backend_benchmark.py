@@ -0,0 +1,179 @@
+"""
+CPU latency, throughput and output drift of each inference backend.
+
+``--model tower`` (default) is a synthetic stand-in for the user tower
+(categorical embeddings feeding an MLP, tensor-only inputs), so the numbers
+show what each backend does to that shape of model without needing the
+trained weights. ``onnx`` is measured only when onnxruntime is installed.
+
+``--model clip`` and ``--model bge`` compare float32 with int8 (the only
+backend those encoders support) on the CLIP image tower and BGE-small. The
+cached pretrained weights are used when present; otherwise the models are
+randomly initialised from the same architecture, which gives representative
+latencies but not representative drift:
+
+    python -m tests.benchmarks.inference_backend_benchmark --threads 1 --repeat 200
+    python -m tests.benchmarks.inference_backend_benchmark --model clip --batch 8 --repeat 20
+"""
+
+import argparse
+import importlib.util
+import time
+
+import numpy as np
+import torch
+from torch import nn
+
+from services.feast.inference_backend import (
+    BACKENDS,
+    build_backend,
+    fixed_pixels,
+    output_drift,
+    quantize_int8,
+)
+
+
+class SyntheticTower(nn.Module):
+    def __init__(self, categories: int = 1000, dim: int = 64, hidden: int = 512):
+        super().__init__()
+        self.user = nn.Embedding(categories, dim)
+        self.preference = nn.Embedding(categories, dim)
+        self.mlp = nn.Sequential(
+            nn.Linear(2 * dim + 16, hidden),
+            nn.ReLU(),
+            nn.Linear(hidden, hidden),
+            nn.ReLU(),
+            nn.Linear(hidden, dim),
+        )
+
+    def forward(self, user, preference, numeric):
+        features = torch.cat([self.user(user), self.preference(preference), numeric], dim=-1)
+        return nn.functional.normalize(self.mlp(features), dim=-1)
+
+
+def make_inputs(batch: int, seed: int = 0) -> dict:
+    generator = torch.Generator().manual_seed(seed)
+    return {
+        "user": torch.randint(0, 1000, (batch,), generator=generator),
+        "preference": torch.randint(0, 1000, (batch,), generator=generator),
+        "numeric": torch.randn(batch, 16, generator=generator),
+    }
+
+
+class ClipImageTower(nn.Module):
+    """CLIP image embeddings as the image search encoder computes them."""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, pixel_values):
+        return nn.functional.normalize(self.model(pixel_values=pixel_values).image_embeds, dim=-1)
+
+
+class BgeTower(nn.Module):
+    """CLS-pooled, normalised BGE sentence embeddings."""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        output = self.model(input_ids=input_ids, attention_mask=attention_mask)
+        return nn.functional.normalize(output.last_hidden_state[:, 0], dim=-1)
+
+
+def _pretrained_or_random(model_class, model_name: str, config):
+    try:
+        return model_class.from_pretrained(model_name, local_files_only=True), "pretrained"
+    except Exception:
+        return model_class(config), "random weights"
+
+
+def load_encoder(name: str):
+    """Return (model, make_inputs, description) for clip or bge."""
+    from transformers import BertConfig, BertModel, CLIPVisionConfig, CLIPVisionModelWithProjection
+
+    from services.feast.feast_service import CLIP_MODEL_NAME, EMBEDDING_MODEL
+
+    if name == "clip":
+        model, weights = _pretrained_or_random(
+            CLIPVisionModelWithProjection, CLIP_MODEL_NAME, CLIPVisionConfig(projection_dim=512)
+        )
+
+        def inputs(batch, seed=0):
+            return {"pixel_values": fixed_pixels(batch, seed=seed)}
+
+        return ClipImageTower(model).eval(), inputs, f"{CLIP_MODEL_NAME} ({weights})"
+
+    config = BertConfig(hidden_size=384, intermediate_size=1536, num_attention_heads=12)
+    model, weights = _pretrained_or_random(BertModel, EMBEDDING_MODEL, config)
+
+    def inputs(batch, seed=0, length=32):
+        generator = torch.Generator().manual_seed(seed)
+        return {
+            "input_ids": torch.randint(1000, 20000, (batch, length), generator=generator),
+            "attention_mask": torch.ones(batch, length, dtype=torch.long),
+        }
+
+    return BgeTower(model).eval(), inputs, f"{EMBEDDING_MODEL} ({weights})"
+
+
+def timings_ms(model, inputs: dict, repeat: int) -> np.ndarray:
+    with torch.inference_mode():
+        for _ in range(10):
+            model(**inputs)
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            model(**inputs)
+            timings.append(time.perf_counter() - started)
+    return np.array(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--model", choices=["tower", "clip", "bge"], default="tower")
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    torch.set_num_threads(args.threads)
+    if args.model == "tower":
+        tower, inputs, description, backends = SyntheticTower().eval(), make_inputs, "", BACKENDS
+    else:
+        tower, inputs, description = load_encoder(args.model)
+        backends = ("eager", "int8")
+    single, batch = inputs(1), inputs(args.batch, seed=1)
+    with torch.inference_mode():
+        reference = tower(**batch)
+
+    print(f"model={args.model} {description} threads={args.threads} batch={args.batch}")
+    print(
+        f"{'backend':>12} {'p50 (1)':>9} {'p99 (1)':>9} "
+        f"{'rows/s (' + str(args.batch) + ')':>13} {'min cos':>9} {'max err':>9}"
+    )
+    for backend in backends:
+        if backend == "onnx" and importlib.util.find_spec("onnxruntime") is None:
+            print(f"{backend:>12} skipped (onnxruntime not installed)")
+            continue
+        if backend == "eager":
+            model = tower
+        elif backend == "int8" and args.model != "tower":
+            model = quantize_int8(tower)
+        else:
+            model = build_backend(tower, backend, single)
+        p50, p99 = np.percentile(timings_ms(model, single, args.repeat), [50, 99])
+        throughput = args.batch / (np.median(timings_ms(model, batch, args.repeat)) / 1000)
+        with torch.inference_mode():
+            drift = output_drift(reference, model(**batch))
+        print(
+            f"{backend:>12} {p50:7.3f}ms {p99:7.3f}ms "
+            f"{throughput:13.0f} {drift['min_cosine']:9.5f} {drift['max_abs_error']:9.5f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Compare request-path cost of flush-per-event delivery with EventPipeline.
+
+Uses the in-memory broker with a simulated broker round-trip, so it runs
+without Kafka:
+
+    python -m tests.benchmarks.kafka_pipeline_benchmark --events 2000 --rtt-ms 2
+"""
+
+import argparse
+import tempfile
+import time
+
+from services.event_pipeline import EventPipeline
+from services.memory_broker import InMemoryBroker
+
+
+def flush_per_event(events: int, rtt: float) -> float:
+    broker = InMemoryBroker(flush_latency=rtt)
+    start = time.perf_counter()
+    for i in range(events):
+        broker.send("interactions", f"event-{i}".encode())
+        broker.flush()
+    return time.perf_counter() - start
+
+
+def pipelined(events: int, rtt: float, spill_dir: str):
+    broker = InMemoryBroker(flush_latency=rtt)
+    pipeline = EventPipeline(broker, spill_path=f"{spill_dir}/spill.jsonl", name="bench").start()
+    start = time.perf_counter()
+    for i in range(events):
+        pipeline.publish("interactions", f"event-{i}".encode())
+    request_path = time.perf_counter() - start
+    pipeline.flush()
+    delivered = time.perf_counter() - start
+    metrics = pipeline.metrics()
+    pipeline.close()
+    return request_path, delivered, metrics
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--rtt-ms", type=float, default=2.0)
+    args = parser.parse_args()
+    rtt = args.rtt_ms / 1000
+
+    baseline = flush_per_event(args.events, rtt)
+    with tempfile.TemporaryDirectory() as spill_dir:
+        request_path, delivered, metrics = pipelined(args.events, rtt, spill_dir)
+
+    per_event = 1e6 / args.events
+    print(f"events={args.events} simulated_rtt={args.rtt_ms}ms")
+    print(f"flush-per-event  request path: {baseline * per_event:9.1f} us/event")
+    print(f"pipeline         request path: {request_path * per_event:9.1f} us/event")
+    print(f"pipeline         end-to-end:   {delivered:9.3f} s total")
+    print(f"pipeline         batches:      {metrics['batches']}")
+    print(f"pipeline         delivery:     {metrics['delivery_latency']}")
+
+
+if __name__ == "__main__":
+    main()
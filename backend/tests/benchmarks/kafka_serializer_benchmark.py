@@ -0,0 +1,62 @@
+"""
+Bytes-per-event and encode cost of the Kafka event serializers.
+
+    python -m tests.benchmarks.kafka_serializer_benchmark --events 50000
+"""
+
+import argparse
+import json
+import time
+
+from services.event_serializers import (
+    INTERACTION_SCHEMA,
+    AvroBinarySerializer,
+    ConnectJsonSerializer,
+)
+
+
+def make_event(i: int) -> dict:
+    return {
+        "user_id": f"{i:027d}",
+        "item_id": f"B0{i % 9973:08d}",
+        "timestamp": "2025-01-01 12:00:00.000000",
+        "interaction_type": "positive_view",
+        "rating": None,
+        "quantity": None,
+        "review_title": "",
+        "review_content": "",
+        "interaction_id": f"{i:027d}-B0{i % 9973:08d}-1735732800.123456",
+    }
+
+
+def legacy_encode(topic: str, payload: dict) -> bytes:
+    # Previous behaviour: schema dict rebuilt and serialised with every message
+    schema = {**INTERACTION_SCHEMA, "fields": [dict(f) for f in INTERACTION_SCHEMA["fields"]]}
+    return json.dumps({"schema": schema, "payload": payload}).encode("utf-8")
+
+
+def measure(encode, events):
+    start = time.perf_counter()
+    total = sum(len(encode("interactions", event)) for event in events)
+    elapsed = time.perf_counter() - start
+    return total / len(events), elapsed / len(events) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=50000)
+    args = parser.parse_args()
+    events = [make_event(i) for i in range(args.events)]
+
+    print(f"{'serializer':<26}{'bytes/event':>12}{'us/event':>10}")
+    for name, encode in (
+        ("connect-json (rebuilt)", legacy_encode),
+        ("connect-json", ConnectJsonSerializer().encode),
+        ("avro-binary", AvroBinarySerializer().encode),
+    ):
+        size, cost = measure(encode, events)
+        print(f"{name:<26}{size:>12.1f}{cost:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
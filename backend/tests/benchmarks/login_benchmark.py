@@ -0,0 +1,79 @@
+"""
+Login throughput and event-loop latency with inline vs pooled bcrypt.
+
+Runs ``--logins`` password verifications, ``--concurrency`` at a time, the way
+the login handler does, while a probe task measures how late the event loop
+wakes it up. Inline verification blocks the loop for every hash; the
+PasswordHasher keeps it responsive.
+
+    python -m tests.benchmarks.login_benchmark --logins 400 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from services.security import PasswordHasher, hash_password, verify_password
+
+PROBE_INTERVAL = 0.001
+
+
+async def probe(lags: list, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        expected = time.perf_counter() + PROBE_INTERVAL
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(max(time.perf_counter() - expected, 0.0))
+
+
+async def run(mode: str, hashed: str, logins: int, concurrency: int) -> None:
+    hasher = PasswordHasher()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login() -> bool:
+        async with semaphore:
+            if mode == "inline":
+                return verify_password("correct horse", hashed)
+            return await hasher.verify("correct horse", hashed)
+
+    lags: list = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(lags, stop))
+    started = time.perf_counter()
+    results = await asyncio.gather(*[login() for _ in range(logins)])
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe_task
+
+    assert all(results)
+    lag_ms = np.array(lags or [0.0]) * 1000
+    print(
+        f"{mode:>7}: {logins / elapsed:8.1f} logins/s   loop lag "
+        f"p50 {np.percentile(lag_ms, 50):7.2f} ms  p99 {np.percentile(lag_ms, 99):7.2f} ms  "
+        f"max {lag_ms.max():7.2f} ms"
+    )
+
+
+async def main_async(args) -> None:
+    hashed = hash_password("correct horse")
+    PasswordHasher(max_workers=args.workers, max_queue=args.logins)
+    # Start the worker processes before timing
+    await PasswordHasher().hash_many(["warmup"] * args.workers, chunk_size=1)
+    try:
+        await run("inline", hashed, args.logins, args.concurrency)
+        await run("pooled", hashed, args.logins, args.concurrency)
+    finally:
+        PasswordHasher.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=2)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
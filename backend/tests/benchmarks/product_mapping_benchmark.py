@@ -0,0 +1,76 @@
+"""
+Feature frame to Product conversion time, row by row versus columnar.
+
+``itertuples`` is the previous per-row ``Product(...)`` construction with full
+validation; ``columnar`` is ``products_from_frame``, which converts each column
+once and validates all records in one ``TypeAdapter`` call:
+
+    python -m tests.benchmarks.product_mapping_benchmark --rounds 5
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from models import Product
+from services.feast.product_mapping import products_from_frame
+
+ITEMS_PARQUET = Path(__file__).parents[2] / "services/feast/data/recommendation_items.parquet"
+SIZES = (10, 100, 1000)
+
+
+def itertuples_products(frame: pd.DataFrame):
+    # Row-by-row conversion previously used by FeastService, kept as the baseline
+    return [
+        Product(
+            item_id=row.item_id,
+            product_name=row.product_name,
+            category=row.category,
+            about_product=getattr(row, "about_product", None),
+            img_link=getattr(row, "img_link", None),
+            discount_percentage=getattr(row, "discount_percentage", None),
+            discounted_price=getattr(row, "discounted_price", None),
+            actual_price=row.actual_price,
+            product_link=getattr(row, "product_link", None),
+            rating_count=getattr(row, "rating_count", None),
+            rating=getattr(row, "rating", None),
+        )
+        for row in frame.itertuples()
+    ]
+
+
+def items_frame(n: int) -> pd.DataFrame:
+    items = pd.read_parquet(ITEMS_PARQUET)
+    repeats = -(-n // len(items))
+    return pd.concat([items] * repeats, ignore_index=True).head(n)
+
+
+def best_of(fn, frame: pd.DataFrame, rounds: int) -> float:
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn(frame)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'items':>6} {'itertuples':>12} {'columnar':>10} {'speed-up':>9}")
+    for n in SIZES:
+        frame = items_frame(n)
+        baseline = best_of(itertuples_products, frame, args.rounds)
+        columnar = best_of(products_from_frame, frame, args.rounds)
+        print(
+            f"{n:>6} {baseline * 1e3:10.3f}ms {columnar * 1e3:8.3f}ms "
+            f"{baseline / columnar:8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Product page latency while the Kafka path is slow.
+
+Serves ``GET /products/{product_id}`` in-process with the catalogue lookup
+stubbed out and a Kafka stand-in that stalls for ``--delays-ms`` per event
+(producer reconnects, spilling to disk). The page latency comes from the
+route metrics, which stop timing once the response is sent, so it should
+not move with the broker delay while tracking delivery does:
+
+    python -m tests.benchmarks.product_page_benchmark --requests 500 --delays-ms 0,50,200
+"""
+
+import argparse
+import asyncio
+import time
+
+from httpx import ASGITransport, AsyncClient
+
+from database.models_sql import User
+from main import app
+from models import Product
+from routes.auth import get_current_user
+from services import interaction_tracker as interaction_tracker_module
+from services.feast.async_feast_service import AsyncFeastService
+from services.interaction_tracker import interaction_tracker
+from services.metrics import collect_metrics
+
+ROUTE = "GET /products/{product_id}"
+
+
+class StalledKafka:
+    delay = 0.0
+
+    def send_interaction(self, **event):
+        time.sleep(self.delay)
+
+
+async def get_item_by_id(self, item_id):
+    return Product(
+        item_id=item_id,
+        product_name=f"Product {item_id}",
+        category="Electronics",
+        about_product=None,
+        img_link=None,
+        discount_percentage=None,
+        discounted_price=None,
+        actual_price=9.99,
+        product_link=None,
+        rating_count=None,
+        rating=None,
+    )
+
+
+async def run(delay_ms: int, requests: int, concurrency: int) -> None:
+    StalledKafka.delay = delay_ms / 1000
+    interaction_tracker.delivery.reset()
+
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def view(i: int) -> None:
+            async with semaphore:
+                response = await client.get(f"/products/p{i}")
+                response.raise_for_status()
+
+        # Warm up, then measure only this round
+        await view(0)
+        for histogram in _route_histograms():
+            histogram.reset()
+        await asyncio.gather(*[view(i) for i in range(requests)])
+
+    page = collect_metrics()["routes"][ROUTE]
+    delivery = collect_metrics()["interaction_tracking"]["delivery"]
+    print(
+        f"broker delay {delay_ms:4d} ms:  page p50 {page['p50_ms']:7.2f} ms  "
+        f"p99 {page['p99_ms']:7.2f} ms   tracking delivery p99 {delivery.get('p99_ms', 0):8.2f} ms"
+    )
+
+
+def _route_histograms():
+    middleware = app.middleware_stack
+    while middleware is not None and not hasattr(middleware, "histograms"):
+        middleware = getattr(middleware, "app", None)
+    return middleware.histograms.values() if middleware is not None else []
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--delays-ms", default="0,50,200")
+    args = parser.parse_args()
+
+    AsyncFeastService.get_item_by_id = get_item_by_id
+    interaction_tracker_module.KafkaService = StalledKafka
+    app.dependency_overrides[get_current_user] = lambda: User(user_id="bench")
+
+    for delay_ms in map(int, args.delays_ms.split(",")):
+        asyncio.run(run(delay_ms, args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Per-worker memory with private vs memory-mapped shared model weights.
+
+Starts ``--workers`` processes that each load the same model, the way uvicorn
+workers each build their own FeastService, and reports every worker's RSS
+and PSS before and after loading it.
+
+    python -m tests.benchmarks.shared_weights_benchmark --workers 4 --mb 256
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import tempfile
+
+import torch
+from torch import nn
+
+from services.feast.shared_weights import build_shared_module, memory_usage
+
+
+def make_model(mb: int) -> nn.Module:
+    width = 1024
+    layers = max(1, mb * 1024 * 1024 // (width * width * 4))
+    return nn.Sequential(*[nn.Linear(width, width, bias=False) for _ in range(layers)])
+
+
+def worker(mode: str, path: str, mb: int, imported, loaded, release) -> None:
+    imported.wait()
+    # Second round: hold until the parent has measured the baseline
+    imported.wait()
+    if mode == "shared":
+        model = build_shared_module(lambda: make_model(mb), path)
+    else:
+        model = make_model(mb)
+        model.load_state_dict(torch.load(path))
+    with torch.inference_mode():
+        model(torch.ones(1, 1024))
+    loaded.wait()
+    release.wait()
+
+
+def run(mode: str, path: str, workers: int, mb: int) -> None:
+    ctx = mp.get_context("spawn")
+    imported = ctx.Barrier(workers + 1)
+    loaded = ctx.Barrier(workers + 1)
+    release = ctx.Event()
+    processes = [
+        ctx.Process(target=worker, args=(mode, path, mb, imported, loaded, release))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    imported.wait()
+    before = [memory_usage(process.pid) for process in processes]
+    imported.wait()
+    loaded.wait()
+    after = [memory_usage(process.pid) for process in processes]
+    release.set()
+    for process in processes:
+        process.join()
+
+    print(f"{mode}:                 rss before / after      pss before / after (MiB)")
+    for process, start, end in zip(processes, before, after):
+        print(
+            f"  pid {process.pid:>7}:  {start['rss_mb']:8.1f} / {end['rss_mb']:8.1f}"
+            f"    {start['pss_mb']:8.1f} / {end['pss_mb']:8.1f}"
+        )
+    added = sum(end["pss_mb"] - start["pss_mb"] for start, end in zip(before, after))
+    print(f"  pss added by the model across workers: {added:.1f} MiB\n")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--mb", type=int, default=256, help="Approximate model size")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "model.pt")
+        torch.save(make_model(args.mb).state_dict(), path)
+        print(f"{args.workers} workers, {os.path.getsize(path) / 2**20:.0f} MiB checkpoint\n")
+        run("private", path, args.workers, args.mb)
+        run("shared", path, args.workers, args.mb)
+
+
+if __name__ == "__main__":
+    main()
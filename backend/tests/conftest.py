@@ -0,0 +1,59 @@
+from datetime import date
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+
+from database.models_sql import User
+from models import Product
+
+
+@pytest.fixture
+def make_product():
+    """Factory for valid Products; keyword arguments override any field."""
+
+    def make(item_id: str, **fields) -> Product:
+        values = dict(
+            item_id=item_id,
+            product_name=f"Product {item_id}",
+            category="Electronics",
+            about_product=None,
+            img_link=None,
+            discount_percentage=None,
+            discounted_price=None,
+            actual_price=9.99,
+            product_link=None,
+            rating_count=None,
+            rating=None,
+        )
+        return Product(**{**values, **fields})
+
+    return make
+
+
+@pytest_asyncio.fixture
+async def client():
+    """HTTP client calling the app in-process."""
+    from main import app
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def current_user():
+    """Signed-in user returned by get_current_user for the duration of a test."""
+    from main import app
+    from routes.auth import get_current_user
+
+    user = User(
+        user_id="u1",
+        email="u1@example.com",
+        age=30,
+        gender="Other",
+        signup_date=date(2024, 1, 1),
+        preferences="Electronics",
+    )
+    app.dependency_overrides[get_current_user] = lambda: user
+    yield user
+    app.dependency_overrides.pop(get_current_user, None)
@@ -0,0 +1,35 @@
+import pandas as pd
+
+from database.fetch_feast_users import feast_user_ids, iter_feast_users
+
+
+def _write_users(path, user_ids):
+    pd.DataFrame(
+        {
+            "user_id": user_ids,
+            "user_name": "Customer",
+            "signup_date": pd.Timestamp("2024-01-01"),
+            "preferences": ["Books|Electronics", None] * (len(user_ids) // 2)
+            + ["Books"] * (len(user_ids) % 2),
+        }
+    ).to_parquet(path, row_group_size=4)
+
+
+def test_users_are_streamed_in_chunks_without_new_users(tmp_path):
+    path = tmp_path / "users.parquet"
+    new_user = "1" * 27
+    _write_users(path, ["A1", "B2", new_user, "C3", "D4", "E5"])
+
+    chunks = list(iter_feast_users(path, chunk_size=2))
+
+    assert [len(chunk) for chunk in chunks] == [2, 1, 2]
+    assert new_user not in pd.concat(chunks)["user_id"].tolist()
+    assert list(chunks[0].columns) == ["user_id", "preferences"]
+
+
+def test_feast_user_ids_stops_at_limit(tmp_path):
+    path = tmp_path / "users.parquet"
+    _write_users(path, [f"U{i}" for i in range(20)])
+
+    assert feast_user_ids(3, path) == ["U0", "U1", "U2"]
+    assert len(feast_user_ids(50, path)) == 20
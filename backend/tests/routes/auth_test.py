@@ -0,0 +1,103 @@
+from datetime import date
+
+import pytest
+
+from database.db import get_db
+from database.models_sql import User
+from main import app
+from services import principal_cache as principal_cache_module
+from services.principal_cache import principal_cache, principal_claims, user_from_claims
+from services.security import create_access_token
+
+
+def _user():
+    return User(
+        user_id="123",
+        email="shopper@example.com",
+        age=31,
+        gender="F",
+        signup_date=date(2024, 5, 1),
+        preferences="Electronics",
+        hashed_password="not-cached",
+    )
+
+
+class CountingSession:
+    def __init__(self):
+        self.queries = 0
+
+    async def execute(self, stmt):
+        self.queries += 1
+
+        class Result:
+            def scalar_one_or_none(self):
+                return _user()
+
+        return Result()
+
+
+@pytest.fixture
+def session():
+    session = CountingSession()
+
+    async def fake_get_db():
+        yield session
+
+    app.dependency_overrides[get_db] = fake_get_db
+    principal_cache.users.invalidate()
+    yield session
+    app.dependency_overrides.clear()
+
+
+async def _me(client, token):
+    return await client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+
+
+@pytest.mark.asyncio
+async def test_resolved_user_is_cached(session, client):
+    token = create_access_token(subject="123")
+
+    first = await _me(client, token)
+    second = await _me(client, token)
+
+    assert first.status_code == second.status_code == 200
+    assert second.json()["email"] == "shopper@example.com"
+    assert session.queries == 1
+    assert principal_cache.stats()["db_lookups_avoided"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_invalidate_forces_a_lookup(session, client):
+    token = create_access_token(subject="123")
+    await _me(client, token)
+
+    principal_cache.invalidate("123")
+    await _me(client, token)
+
+    assert session.queries == 2
+
+
+def test_cached_principal_has_no_password_hash():
+    principal_cache.put(_user())
+    cached = principal_cache.get("123")
+
+    assert cached is not principal_cache.get("123")
+    assert cached.preferences == "Electronics"
+    assert cached.hashed_password is None
+
+
+@pytest.mark.asyncio
+async def test_stateless_token_skips_the_database(session, client, monkeypatch):
+    monkeypatch.setattr(principal_cache_module, "AUTH_STATELESS_TOKENS", True)
+    token = create_access_token(subject="123", claims=principal_claims(_user()))
+
+    response = await _me(client, token)
+
+    assert response.status_code == 200
+    assert response.json()["signup_date"] == "2024-05-01"
+    assert session.queries == 0
+
+
+def test_claims_are_ignored_unless_stateless_tokens_are_enabled():
+    assert principal_claims(_user()) == {}
+    assert user_from_claims("123", {"profile": {"email": "x"}}) is None
@@ -0,0 +1,168 @@
+import asyncio
+import os
+import time
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from database.db import get_db
+from database.models_sql import CartItem as CartItemDB
+from main import app
+from models import CartChange, CartOperation
+from routes.cart import _upsert, fold_cart_changes
+from services.feast.async_feast_service import AsyncFeastService
+from services.kafka_service import KafkaService
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+def _change(product_id, operation=CartOperation.ADD, quantity=1):
+    return CartChange(product_id=product_id, operation=operation, quantity=quantity)
+
+
+def test_changes_fold_to_net_effect_per_product():
+    increments, quantities = fold_cart_changes(
+        [
+            _change("a"),
+            _change("a", quantity=2),
+            _change("b", CartOperation.SET, 5),
+            _change("b"),
+            _change("c"),
+            _change("c", CartOperation.REMOVE),
+            _change("d", CartOperation.REMOVE),
+            _change("d", quantity=3),
+        ]
+    )
+
+    assert increments == {"a": 3}
+    assert quantities == {"b": 6, "c": 0, "d": 3}
+
+
+def test_add_is_a_single_upsert_on_the_cart_line():
+    stmt = _upsert([{"user_id": "u", "product_id": "p", "quantity": 1}], increment=True)
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+    assert "ON CONFLICT (user_id, product_id) DO UPDATE" in sql
+    assert "cart_items.quantity + excluded.quantity" in sql
+
+
+class CartSession:
+    def __init__(self, lines):
+        self.lines = lines
+
+    async def execute(self, stmt):
+        lines = self.lines
+
+        class Result:
+            def scalars(self):
+                return self
+
+            def all(self):
+                return [CartItemDB(user_id="u", product_id=p, quantity=q) for p, q in lines]
+
+        return Result()
+
+
+@pytest.fixture
+def product_lookups(monkeypatch, make_product):
+    lookups = []
+
+    async def get_items_by_ids(self, item_ids):
+        lookups.append(list(item_ids))
+        return {item_id: make_product(item_id) for item_id in item_ids if item_id != "unknown"}
+
+    async def fake_get_db():
+        yield CartSession([("p1", 2), ("p2", 1), ("unknown", 1)])
+
+    monkeypatch.setattr(AsyncFeastService, "get_items_by_ids", get_items_by_ids)
+    app.dependency_overrides[get_db] = fake_get_db
+    yield lookups
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_cart_includes_products_from_one_batched_lookup(product_lookups, client):
+    response = await client.get("/cart/u", params={"include_products": "true"})
+
+    assert response.status_code == 200
+    lines = response.json()
+    assert product_lookups == [["p1", "p2", "unknown"]]
+    assert [line["product"]["product_name"] for line in lines[:2]] == ["Product p1", "Product p2"]
+    assert lines[0]["quantity"] == 2
+    assert lines[2]["product"] is None
+
+
+@pytest.mark.asyncio
+async def test_cart_without_products_skips_the_lookup(product_lookups, client):
+    response = await client.get("/cart/u")
+
+    assert response.status_code == 200
+    assert product_lookups == []
+    assert [line["product"] for line in response.json()] == [None, None, None]
+
+
+@pytest_asyncio.fixture
+async def cart_db(monkeypatch):
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    engine = create_async_engine(TEST_DATABASE_URL, pool_size=20)
+    async with engine.begin() as conn:
+        await conn.run_sync(CartItemDB.__table__.drop, checkfirst=True)
+        await conn.run_sync(CartItemDB.__table__.create)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def test_get_db():
+        async with sessions() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = test_get_db
+    monkeypatch.setattr(KafkaService, "send_interaction", lambda *args, **kwargs: None)
+    yield sessions
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+
+async def _quantities(sessions, user_id):
+    async with sessions() as session:
+        result = await session.execute(select(CartItemDB).where(CartItemDB.user_id == user_id))
+        return {item.product_id: item.quantity for item in result.scalars()}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_adds_never_lose_increments(cart_db, client):
+    adds = 200
+    started = time.perf_counter()
+    responses = await asyncio.gather(
+        *[
+            client.post("/cart", json={"user_id": "u1", "product_id": "p1", "quantity": 1})
+            for _ in range(adds)
+        ]
+    )
+    elapsed = time.perf_counter() - started
+
+    assert all(response.status_code == 204 for response in responses)
+    assert await _quantities(cart_db, "u1") == {"p1": adds}
+    print(f"{adds / elapsed:.0f} concurrent cart adds/s")
+
+
+@pytest.mark.asyncio
+async def test_batch_applies_changes_in_one_transaction(cart_db, client):
+    await client.post("/cart", json={"user_id": "u2", "product_id": "gone", "quantity": 1})
+    response = await client.post(
+        "/cart/batch",
+        json={
+            "user_id": "u2",
+            "changes": [
+                {"product_id": "p1", "quantity": 2},
+                {"product_id": "p1", "quantity": 1},
+                {"product_id": "p2", "quantity": 4, "operation": "set"},
+                {"product_id": "gone", "operation": "remove"},
+            ],
+        },
+    )
+
+    assert response.status_code == 204
+    assert await _quantities(cart_db, "u2") == {"p1": 3, "p2": 4}
@@ -69,3 +69,13 @@ async def test_readiness_failure(override_get_db):
         assert response.status_code == 503
 
     await run_with_client(inner)
+
+
+@pytest.mark.asyncio
+async def test_metrics_reports_db_pool():
+    async def inner(client):
+        response = await client.get("/health/metrics")
+        assert response.status_code == 200
+        assert "db_pool" in response.json()
+
+    await run_with_client(inner)
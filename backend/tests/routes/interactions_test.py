@@ -0,0 +1,91 @@
+import pytest
+
+from routes import interactions as interactions_module
+from services import interaction_tracker as interaction_tracker_module
+
+
+class RecordingKafka:
+    sent = []
+
+    def send_interaction(self, **event):
+        self.sent.append(event)
+
+
+@pytest.fixture
+def kafka(monkeypatch, current_user):
+    RecordingKafka.sent = []
+    monkeypatch.setattr(interaction_tracker_module, "KafkaService", RecordingKafka)
+    return RecordingKafka
+
+
+@pytest.fixture
+def post_batch(client):
+    async def post(events):
+        return await client.post("/interactions/batch", json={"events": events})
+
+    return post
+
+
+@pytest.mark.asyncio
+async def test_batch_beacons_are_sent_for_the_current_user(kafka, post_batch):
+    response = await post_batch(
+        [
+            {"item_id": "p1", "interaction_type": "negative_view"},
+            {"item_id": "p2", "interaction_type": "positive_view"},
+        ]
+    )
+
+    assert response.status_code == 202
+    assert response.json() == {"accepted": 2}
+    assert [(event["user_id"], event["item_id"]) for event in kafka.sent] == [
+        ("u1", "p1"),
+        ("u1", "p2"),
+    ]
+    assert kafka.sent[1]["interaction_type"] == "positive_view"
+
+
+@pytest.mark.asyncio
+async def test_batch_rejects_unknown_types_and_oversized_batches(kafka, post_batch, monkeypatch):
+    monkeypatch.setattr(interactions_module, "INTERACTION_BATCH_MAX_EVENTS", 1)
+
+    invalid = await post_batch([{"item_id": "p1", "interaction_type": "stare"}])
+    oversized = await post_batch([{"item_id": "p1", "interaction_type": "negative_view"}] * 2)
+
+    assert invalid.status_code == 422
+    assert oversized.status_code == 413
+    assert kafka.sent == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "event",
+    [
+        {"item_id": "p1", "interaction_type": "purchase", "quantity": 100},
+        {"item_id": "p1", "interaction_type": "rate", "rating": 5},
+        {"item_id": "p1", "interaction_type": "cart"},
+        {"item_id": "p1", "interaction_type": "positive_view", "rating": 5},
+    ],
+)
+async def test_batch_only_accepts_view_beacons(kafka, post_batch, event):
+    response = await post_batch([{"item_id": "p2", "interaction_type": "negative_view"}, event])
+
+    assert response.status_code == 422
+    assert kafka.sent == []
+
+
+@pytest.mark.asyncio
+async def test_simulated_interaction_route_is_not_mounted(kafka, client):
+    response = await client.post(
+        "/interactions",
+        json={
+            "item_id": "p1",
+            "interaction_type": "purchase",
+            "rating": 5,
+            "review_title": "t",
+            "review_content": "c",
+            "quantity": 1,
+        },
+    )
+
+    assert response.status_code == 405
+    assert kafka.sent == []
@@ -0,0 +1,199 @@
+import time
+
+import pytest
+
+from routes import products as products_module
+from services import interaction_tracker as interaction_tracker_module
+from services.feast.async_feast_service import AsyncFeastService
+from services.interaction_tracker import interaction_tracker
+from services.metrics import collect_metrics
+
+
+@pytest.fixture
+def lookups(monkeypatch, make_product):
+    lookups = []
+
+    async def get_items_by_ids(self, item_ids):
+        lookups.append(list(item_ids))
+        return {item_id: make_product(item_id) for item_id in item_ids if item_id.startswith("p")}
+
+    monkeypatch.setattr(AsyncFeastService, "get_items_by_ids", get_items_by_ids)
+    return lookups
+
+
+@pytest.mark.asyncio
+async def test_batch_returns_products_in_request_order(lookups, client, current_user):
+    response = await client.post(
+        "/products/batch", json={"item_ids": ["p3", "x1", "p1", "p3", "p2"]}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [product["item_id"] for product in body["products"]] == ["p3", "p1", "p2"]
+    assert body["missing"] == ["x1"]
+    assert lookups == [["p3", "x1", "p1", "p2"]]
+
+
+@pytest.mark.asyncio
+async def test_batch_size_is_limited(lookups, client, current_user, monkeypatch):
+    monkeypatch.setattr(products_module, "PRODUCT_BATCH_MAX_IDS", 2)
+
+    response = await client.post("/products/batch", json={"item_ids": ["p1", "p2", "p3"]})
+
+    assert response.status_code == 413
+    assert lookups == []
+
+
+@pytest.mark.asyncio
+async def test_batch_requires_a_signed_in_user(lookups, client):
+    response = await client.post("/products/batch", json={"item_ids": ["p1"]})
+
+    assert response.status_code == 401
+    assert lookups == []
+
+
+class SlowKafka:
+    delay = 0.3
+    fail = False
+    sent = []
+
+    def send_interaction(self, **event):
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("broker unavailable")
+        self.sent.append(event)
+
+
+@pytest.fixture
+def product_page(monkeypatch, make_product, current_user):
+    async def get_item_by_id(self, item_id):
+        return make_product(item_id)
+
+    SlowKafka.sent = []
+    monkeypatch.setattr(AsyncFeastService, "get_item_by_id", get_item_by_id)
+    monkeypatch.setattr(interaction_tracker_module, "KafkaService", SlowKafka)
+    return SlowKafka
+
+
+@pytest.mark.asyncio
+async def test_view_is_tracked_after_the_response(product_page, client):
+    response = await client.get("/products/p1")
+
+    assert response.status_code == 200
+    assert product_page.sent == [
+        {"user_id": "u1", "item_id": "p1", "interaction_type": "negative_view"}
+    ]
+    latency = collect_metrics()["routes"]["GET /products/{product_id}"]
+    assert latency["max_ms"] < product_page.delay * 1000
+
+
+@pytest.mark.asyncio
+async def test_broker_failure_does_not_fail_the_page(product_page, client, monkeypatch):
+    monkeypatch.setattr(product_page, "fail", True)
+    monkeypatch.setattr(product_page, "delay", 0)
+    failed = interaction_tracker.failed
+
+    response = await client.get("/products/p2")
+
+    assert response.status_code == 200
+    assert response.json()["item_id"] == "p2"
+    assert interaction_tracker.failed == failed + 1
+
+
+@pytest.fixture
+def image_search(monkeypatch, make_product):
+    calls = []
+
+    async def search_items_by_images(self, contents, k=5):
+        calls.append(contents)
+        return [[make_product(f"p{i}")] for i in range(len(contents))]
+
+    monkeypatch.setattr(AsyncFeastService, "search_items_by_images", search_items_by_images)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_several_images_are_searched_in_one_call(image_search, client):
+    files = [("images", (f"{i}.jpg", b"image %d" % i)) for i in range(3)]
+
+    response = await client.post("/products/search/images", files=files)
+
+    assert response.status_code == 200
+    assert [[product["item_id"] for product in r] for r in response.json()] == [
+        ["p0"],
+        ["p1"],
+        ["p2"],
+    ]
+    assert image_search == [[b"image 0", b"image 1", b"image 2"]]
+
+
+@pytest.mark.asyncio
+async def test_image_uploads_are_limited(image_search, client, monkeypatch):
+    monkeypatch.setattr(products_module, "IMAGE_SEARCH_MAX_IMAGES", 2)
+    monkeypatch.setattr(products_module, "IMAGE_UPLOAD_MAX_BYTES", 8)
+
+    too_many = await client.post(
+        "/products/search/images", files=[("images", (f"{i}.jpg", b"x")) for i in range(3)]
+    )
+    too_large = await client.post(
+        "/products/search/images", files=[("images", ("big.jpg", b"x" * 9))]
+    )
+
+    assert too_many.status_code == 413
+    assert too_large.status_code == 413
+    assert image_search == []
+
+
+@pytest.fixture
+def hybrid_search(monkeypatch, make_product, current_user):
+    calls = []
+
+    async def hybrid_search(self, user, text=None, image=None, k=10, weights=None, method="rrf"):
+        calls.append((user.user_id, text, image, k, method, weights))
+        return [make_product("p1"), make_product("p2")][:k]
+
+    monkeypatch.setattr(AsyncFeastService, "hybrid_search", hybrid_search)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_fuses_query_image_and_user(hybrid_search, client):
+    response = await client.post(
+        "/products/search/hybrid",
+        data={"query": " headphones ", "k": "1", "fusion": "weighted", "popularity_weight": "0"},
+        files=[("image", ("q.jpg", b"image"))],
+    )
+
+    assert response.status_code == 200
+    assert [product["item_id"] for product in response.json()] == ["p1"]
+    assert hybrid_search == [
+        (
+            "u1",
+            "headphones",
+            b"image",
+            1,
+            "weighted",
+            {"text": 1.0, "image": 1.0, "user": 0.5, "popularity": 0.0},
+        )
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "data, files, status_code",
+    [
+        ({"query": "  "}, None, 400),
+        ({"query": "lamp", "fusion": "borda"}, None, 400),
+        ({"query": "lamp", "text_weight": "0"}, None, 400),
+        ({"image_weight": "0"}, [("image", ("q.jpg", b"x"))], 400),
+        ({"query": "lamp", "user_weight": "-1"}, None, 422),
+        ({"query": "lamp", "k": "1000"}, None, 422),
+    ],
+)
+async def test_hybrid_search_rejects_invalid_requests(
+    hybrid_search, client, data, files, status_code
+):
+    response = await client.post("/products/search/hybrid", data=data, files=files)
+
+    assert response.status_code == status_code
+    assert hybrid_search == []
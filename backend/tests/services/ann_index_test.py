@@ -0,0 +1,105 @@
+import threading
+
+import numpy as np
+import pytest
+
+from services.feast.ann_index import AnnIndexRegistry, IVFIndex
+
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(8, 16))
+    points = centers[rng.integers(0, 8, 400)] + 0.1 * rng.normal(size=(400, 16))
+    return points.astype(np.float32)
+
+
+def exact_top_k(vectors, query, k):
+    normed = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = normed @ (query / np.linalg.norm(query))
+    return [str(i) for i in np.argsort(-scores)[:k]]
+
+
+def test_full_probe_matches_exact_search(vectors):
+    index = IVFIndex.build(range(len(vectors)), vectors, nlist=10)
+    query = vectors[3] + 0.05
+    ids, scores = index.search(query, 10, nprobe=index.nlist)
+
+    assert ids == exact_top_k(vectors, query, 10)
+    assert np.all(np.diff(scores) <= 0)
+
+
+def test_partial_probe_has_high_recall(vectors):
+    index = IVFIndex.build(range(len(vectors)), vectors, nlist=16, nprobe=4)
+    recalls = []
+    for query in vectors[:50]:
+        ids, _ = index.search(query, 10)
+        recalls.append(len(set(ids) & set(exact_top_k(vectors, query, 10))) / 10)
+    assert np.mean(recalls) > 0.9
+
+
+def test_incremental_add_and_remove(vectors):
+    index = IVFIndex.build(range(100), vectors[:100], nlist=8)
+    index.add(["new"], vectors[200:201])
+    assert index.search(vectors[200], 1, nprobe=8)[0] == ["new"]
+
+    index.remove(["new"])
+    assert "new" not in index.search(vectors[200], 5, nprobe=8)[0]
+    assert len(index) == 100
+
+
+def test_replacing_vectors_keeps_storage_bounded(vectors, tmp_path):
+    index = IVFIndex.build(range(100), vectors[:100], nlist=8)
+    for _ in range(10):
+        index.add(range(50), vectors[200:250])
+
+    assert len(index._ids) <= 2 * len(index)
+    assert index.search(vectors[210], 1, nprobe=8)[0] == ["10"]
+
+    index.save(str(tmp_path / "item.npz"))
+    assert len(index._ids) == len(index._vectors) == 100
+
+
+def test_search_while_retraining(vectors):
+    index = IVFIndex.build(range(len(vectors)), vectors, nlist=16)
+    errors = []
+    stop = threading.Event()
+
+    def search():
+        while not stop.is_set():
+            try:
+                index.search(vectors[0], 5, nprobe=16)
+            except Exception as e:
+                errors.append(e)
+
+    searcher = threading.Thread(target=search)
+    searcher.start()
+    for nlist in [2, 16] * 20:
+        index.nlist = nlist
+        index.train(vectors, iterations=2)
+    stop.set()
+    searcher.join()
+
+    assert errors == []
+
+
+def test_registry_loads_saved_indexes(vectors, tmp_path):
+    IVFIndex.build(range(len(vectors)), vectors, nlist=8).save(str(tmp_path / "item.npz"))
+
+    registry = AnnIndexRegistry(str(tmp_path))
+    registry.load_all()
+
+    assert registry.search("item", vectors[7], 1) == ["7"]
+    assert registry.search("clip_image", vectors[7], 1) is None
+
+
+def test_scores_for_given_ids(vectors):
+    index = IVFIndex.build(range(100), vectors[:100], nlist=8)
+    query = vectors[3]
+
+    scores = index.score([3, "7", "missing"], query)
+
+    expected = exact_top_k(vectors[:100], query, 100)
+    assert scores[0] == pytest.approx(1.0, abs=1e-5)
+    assert scores[0] > scores[1] and expected.index("3") < expected.index("7")
+    assert np.isnan(scores[2])
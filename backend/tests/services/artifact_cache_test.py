@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+import pytest
+
+from services.feast.artifact_cache import ArtifactCache
+
+
+class FakeMinio:
+    def __init__(self, content=b"weights", etag="etag-1"):
+        self.content = content
+        self.etag = etag
+        self.online = True
+        self.downloads = 0
+
+    def stat_object(self, bucket_name, object_name):
+        if not self.online:
+            raise ConnectionError("minio unavailable")
+        return SimpleNamespace(etag=self.etag)
+
+    def fget_object(self, bucket_name, object_name, file_path):
+        self.downloads += 1
+        with open(file_path, "wb") as f:
+            f.write(self.content)
+
+
+def test_download_is_reused_until_etag_changes(tmp_path):
+    client = FakeMinio()
+    cache = ArtifactCache(str(tmp_path))
+
+    path = cache.fetch(client, "user-encoder", "user-encoder-1.pth")
+    assert cache.fetch(client, "user-encoder", "user-encoder-1.pth") == path
+    assert client.downloads == 1
+
+    client.content, client.etag = b"retrained", "etag-2"
+    cache.fetch(client, "user-encoder", "user-encoder-1.pth")
+    assert client.downloads == 2
+    with open(path, "rb") as f:
+        assert f.read() == b"retrained"
+    assert cache.stats()["hits"] == 1
+
+
+def test_cached_copy_is_used_when_minio_is_down(tmp_path):
+    client = FakeMinio()
+    cache = ArtifactCache(str(tmp_path))
+    path = cache.fetch(client, "user-encoder", "user-encoder-1.pth")
+
+    client.online = False
+    assert cache.fetch(client, "user-encoder", "user-encoder-1.pth") == path
+    assert cache.stats()["offline_hits"] == 1
+    with pytest.raises(ConnectionError):
+        cache.fetch(client, "user-encoder", "user-encoder-2.pth")
@@ -0,0 +1,59 @@
+import torch
+
+from services.feast.embedding_cache import UserEmbeddingCache, feature_fingerprint
+
+
+def _features(age):
+    return {
+        "numerical_features": torch.tensor([[float(age), 1.0]]),
+        "categorical_features": torch.tensor([[2, 0]]),
+    }
+
+
+def test_fingerprint_depends_on_features_and_model_version():
+    assert feature_fingerprint(_features(30), "v1") == feature_fingerprint(_features(30), "v1")
+    assert feature_fingerprint(_features(30), "v1") != feature_fingerprint(_features(31), "v1")
+    assert feature_fingerprint(_features(30), "v1") != feature_fingerprint(_features(30), "v2")
+
+
+def test_fingerprint_distinguishes_dtype_and_shape():
+    values = torch.zeros(4)
+    assert feature_fingerprint({"x": values}, "v1") != feature_fingerprint(
+        {"x": values.reshape(2, 2)}, "v1"
+    )
+    assert feature_fingerprint({"x": values}, "v1") != feature_fingerprint(
+        {"x": values.double()}, "v1"
+    )
+
+
+def test_identical_features_share_an_entry():
+    cache = UserEmbeddingCache(maxsize=4)
+    key = feature_fingerprint(_features(30), "v1")
+    cache.put(key, [0.1, 0.2], user_id=1)
+
+    assert cache.get(feature_fingerprint(_features(30), "v1")) == [0.1, 0.2]
+    assert cache.stats()["hit_rate"] == 1.0
+
+
+def test_forget_user_drops_their_last_embedding():
+    cache = UserEmbeddingCache(maxsize=4)
+    key = feature_fingerprint(_features(30), "v1")
+    cache.put(key, [0.1, 0.2], user_id=1)
+
+    cache.forget_user(1)
+    cache.forget_user(2)
+
+    assert cache.get(key) is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_invalidate_clears_everything():
+    cache = UserEmbeddingCache(maxsize=4)
+    for age in range(3):
+        cache.put(feature_fingerprint(_features(age), "v1"), [float(age)], user_id=age)
+
+    cache.invalidate()
+
+    assert cache.stats()["size"] == 0
+    cache.forget_user(0)
+    assert cache.stats()["invalidations"] == 1
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from services.feast.embedding_export import item_text, text_embeddings
+
+
+def test_text_embeddings_cover_every_item_in_order():
+    items = pd.DataFrame(
+        {
+            "item_id": ["a", "b", "c"],
+            "product_name": ["Watch", "Kettle", "Lamp"],
+            "category": ["Electronics|Wearables", "Home|Kitchen", None],
+            "about_product": ["Tracks steps", None, "Warm light"],
+        }
+    )
+    batches = []
+
+    def encode(texts):
+        batches.append(list(texts))
+        return [np.full(2, len(text), dtype=np.float32) for text in texts]
+
+    ids, embeddings = text_embeddings(items, encode, batch_size=2)
+
+    assert ids == ["a", "b", "c"]
+    assert batches == [
+        ["Watch. Electronics Wearables. Tracks steps", "Kettle. Home Kitchen"],
+        ["Lamp. Warm light"],
+    ]
+    assert embeddings.shape == (3, 2)
+    assert item_text({"product_name": "Lamp"}) == "Lamp"
@@ -0,0 +1,143 @@
+import threading
+
+import pytest
+
+from services.event_pipeline import EventPipeline
+from services.memory_broker import InMemoryBroker
+
+
+@pytest.fixture
+def broker():
+    return InMemoryBroker()
+
+
+def make_pipeline(broker, tmp_path, **kwargs):
+    options = dict(
+        batch_size=10,
+        linger_ms=20,
+        max_retries=1,
+        retry_backoff_ms=1,
+        spill_path=str(tmp_path / "spill.jsonl"),
+        name="test_events",
+    )
+    options.update(kwargs)
+    return EventPipeline(broker, **options).start()
+
+
+def test_publish_batches_messages(broker, tmp_path):
+    pipeline = make_pipeline(broker, tmp_path)
+    for i in range(25):
+        pipeline.publish("interactions", f"event-{i}".encode())
+    assert pipeline.flush(timeout=5)
+
+    assert broker.messages["interactions"] == [f"event-{i}".encode() for i in range(25)]
+    # One flush per batch rather than one per event
+    assert broker.flush_calls <= 5
+    pipeline.close()
+
+
+def test_failed_messages_are_retried(broker, tmp_path):
+    pipeline = make_pipeline(broker, tmp_path)
+    broker.fail_next(2)
+    for i in range(3):
+        pipeline.publish("interactions", f"event-{i}".encode())
+    assert pipeline.flush(timeout=5)
+
+    assert sorted(broker.messages["interactions"]) == [b"event-0", b"event-1", b"event-2"]
+    assert pipeline.metrics()["retries"] == 2
+    pipeline.close()
+
+
+def test_undeliverable_messages_spill_and_replay(broker, tmp_path):
+    pipeline = make_pipeline(broker, tmp_path, max_retries=0)
+    broker.fail_next(1)
+    pipeline.publish("new-users", b"lost-then-found")
+    assert pipeline.flush(timeout=5)
+    assert pipeline.metrics()["spilled"] == 1
+
+    # The next successful batch triggers a replay of the spill file
+    pipeline.publish("new-users", b"healthy")
+    assert pipeline.flush(timeout=5)
+    pipeline.close()
+
+    assert sorted(broker.messages["new-users"]) == [b"healthy", b"lost-then-found"]
+    assert not (tmp_path / "spill.jsonl").exists()
+
+
+def test_full_queue_overflow_is_spilled_by_the_sender(broker, tmp_path):
+    pipeline = EventPipeline(
+        broker, max_queue=1, spill_path=str(tmp_path / "spill.jsonl"), name="test_events"
+    )
+    pipeline.publish("interactions", b"queued")
+    pipeline.publish("interactions", b"overflow")
+    pipeline.publish("interactions", b"dropped")
+
+    # publish never writes to disk itself; beyond the overflow limit it drops
+    metrics = pipeline.metrics()
+    assert metrics["spilled"] == 0
+    assert metrics["overflow_depth"] == 1
+    assert metrics["dropped"] == 1
+    assert not (tmp_path / "spill.jsonl").exists()
+
+    # The sender spills the overflow, then replays it after the queued batch
+    pipeline.start()
+    assert pipeline.flush(timeout=5)
+    pipeline.publish("interactions", b"after")
+    assert pipeline.flush(timeout=5)
+    pipeline.close()
+    assert sorted(broker.messages["interactions"]) == [b"after", b"overflow", b"queued"]
+    assert pipeline.metrics()["spilled"] == 1
+
+
+def test_counters_are_exact_under_concurrent_publishers(broker, tmp_path):
+    pipeline = EventPipeline(
+        broker, max_queue=100_000, spill_path=str(tmp_path / "spill.jsonl"), name="test_events"
+    )
+
+    def publish_many():
+        for _ in range(5000):
+            pipeline.publish("interactions", b"x")
+
+    publishers = [threading.Thread(target=publish_many) for _ in range(8)]
+    for publisher in publishers:
+        publisher.start()
+    for publisher in publishers:
+        publisher.join()
+
+    assert pipeline.metrics()["enqueued"] == 40_000
+
+
+def test_torn_spill_lines_are_quarantined(broker, tmp_path):
+    spill = tmp_path / "spill.jsonl"
+    pipeline = EventPipeline(broker, spill_path=str(spill), name="test_events")
+    pipeline.publish("interactions", b"before")
+    pipeline._spill([("interactions", b"spilled", 0.0)])
+    # A worker killed mid-write leaves half a record behind
+    with open(spill, "a") as f:
+        f.write('{"topic": "interactions", "val')
+
+    pipeline.start()
+    assert pipeline.flush(timeout=5)
+    pipeline.publish("interactions", b"after")
+    assert pipeline.flush(timeout=5)
+    pipeline.close()
+
+    assert sorted(broker.messages["interactions"]) == [b"after", b"before", b"spilled"]
+    assert pipeline.metrics()["corrupt"] == 1
+    assert (tmp_path / "spill.jsonl.corrupt").read_text().startswith('{"topic": "interactions"')
+    assert not spill.exists()
+
+
+def test_replay_errors_do_not_stop_delivery(broker, tmp_path, monkeypatch):
+    pipeline = make_pipeline(broker, tmp_path, max_retries=0)
+
+    def broken_replay():
+        raise OSError("disk unavailable")
+
+    monkeypatch.setattr(pipeline, "_replay_spill", broken_replay)
+    for i in range(3):
+        pipeline.publish("interactions", f"event-{i}".encode())
+        assert pipeline.flush(timeout=5)
+    pipeline.close()
+
+    assert broker.messages["interactions"] == [b"event-0", b"event-1", b"event-2"]
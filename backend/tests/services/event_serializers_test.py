@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from services.event_serializers import (
+    INTERACTION_SCHEMA,
+    AvroBinarySerializer,
+    ConnectJsonSerializer,
+    get_serializer,
+)
+
+INTERACTION = {
+    "user_id": "user-1",
+    "item_id": "B07XYZ",
+    "timestamp": "2025-01-01 12:00:00",
+    "interaction_type": "positive_view",
+    "rating": None,
+    "quantity": 2,
+    "review_title": "",
+    "review_content": "Très bien",
+    "interaction_id": "user-1-B07XYZ-1735732800.0",
+}
+
+
+def test_connect_json_matches_envelope_format():
+    encoded = ConnectJsonSerializer().encode("interactions", INTERACTION)
+    assert encoded == json.dumps({"schema": INTERACTION_SCHEMA, "payload": INTERACTION}).encode()
+
+
+def test_avro_binary_round_trip():
+    serializer = AvroBinarySerializer(schema_ids={"interactions": 7, "new-users": 8})
+    encoded = serializer.encode("interactions", INTERACTION)
+
+    assert encoded[:5] == b"\x00\x00\x00\x00\x07"
+    decoded = serializer.decode("interactions", encoded)
+    assert decoded == {**INTERACTION, "quantity": 2.0}
+
+
+def test_avro_binary_is_smaller_than_connect_json():
+    json_size = len(ConnectJsonSerializer().encode("interactions", INTERACTION))
+    binary_size = len(AvroBinarySerializer().encode("interactions", INTERACTION))
+    assert binary_size * 5 < json_size
+
+
+def test_unknown_serializer():
+    with pytest.raises(ValueError):
+        get_serializer("protobuf")
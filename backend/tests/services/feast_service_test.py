@@ -0,0 +1,87 @@
+from io import BytesIO
+
+import numpy as np
+import torch
+from PIL import Image
+
+from services.cache import LRUCache
+from services.feast import feast_service
+from services.feast.ann_index import AnnIndexRegistry, IVFIndex
+from services.feast.feast_service import FeastService, _drift_samples
+from services.feast.image_search import IMAGE_INDEX
+from services.metrics import LatencyHistogram
+from services.startup import ComponentLoader
+
+
+def _service(**components):
+    """FeastService without its models, serving the given components."""
+    service = object.__new__(FeastService)
+    service.components = ComponentLoader(name="test_components")
+    for name, value in components.items():
+        service.components.register(name, lambda: value)
+        service.components.set(name, value)
+    return service
+
+
+class FakeUserEncoders:
+    def __init__(self):
+        self.batches = []
+
+    def current(self):
+        return "v1", self.encode
+
+    def encode(self, user_id, age):
+        self.batches.append(user_id)
+        return torch.as_tensor(age, dtype=torch.float32).reshape(-1, 1)
+
+
+def test_users_that_cannot_be_collated_are_encoded_one_by_one():
+    encoders = FakeUserEncoders()
+    service = _service(user_encoder=encoders)
+    features = [
+        {"user_id": "u1", "age": torch.tensor([[30.0]])},
+        {"user_id": "u2", "age": torch.tensor([[40.0]])},
+    ]
+
+    assert service._encode_users(features) == [("v1", [30.0]), ("v1", [40.0])]
+    assert encoders.batches == ["u1", "u2"]
+
+
+def test_drift_samples_end_with_the_users_collated_into_one_batch(monkeypatch):
+    def preprocess(frame):
+        return {"user_id": list(frame["user_id"]), "age": torch.tensor([[float(frame["age"][0])]])}
+
+    monkeypatch.setattr(feast_service, "data_preproccess", preprocess)
+
+    samples = _drift_samples(count=4)
+
+    assert len(samples) == 5
+    assert samples[-1]["user_id"] == [sample["user_id"][0] for sample in samples[:4]]
+    assert samples[-1]["age"].shape == (4, 1)
+
+
+def _png(color):
+    buffer = BytesIO()
+    Image.new("RGB", (8, 8), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_uncached_images_are_embedded_in_one_forward_pass():
+    colors = {"red": 0, "green": 1, "blue": 2}
+    batches = []
+
+    def encode(images):
+        batches.append(len(images))
+        return [np.eye(3, dtype=np.float32)[np.argmax(image.getpixel((0, 0)))] for image in images]
+
+    indexes = AnnIndexRegistry(directory=None)
+    indexes.register(IMAGE_INDEX, IVFIndex.build(list(colors), np.eye(3), 1, 1))
+    service = _service(image_encoder=encode, ann_indexes=indexes)
+    service.image_results = LRUCache(maxsize=16)
+    service.image_preprocess = LatencyHistogram()
+    service._images_search_ids([_png("red")], 1)
+
+    results = service._images_search_ids([_png(c) for c in ("red", "green", "blue", "green")], 1)
+
+    assert results == [["red"], ["green"], ["blue"], ["green"]]
+    assert batches == [1, 2]
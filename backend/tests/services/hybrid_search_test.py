@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from services.feast.hybrid_search import (
+    cosine_scores,
+    fuse_rankings,
+    popularity_ranking,
+    score_ranking,
+)
+
+
+def test_items_ranked_by_several_signals_come_first():
+    rankings = {"text": ["a", "b", "c"], "image": ["d", "b", "e"], "user": ["c", "b"]}
+    weights = {"text": 1.0, "image": 1.0, "user": 0.5}
+
+    for method in ("rrf", "weighted"):
+        fused = [item_id for item_id, _ in fuse_rankings(rankings, weights, method)]
+        assert fused[0] == "b"
+        assert sorted(fused) == ["a", "b", "c", "d", "e"]
+
+
+def test_rrf_scores_are_weighted_reciprocal_ranks():
+    fused = dict(fuse_rankings({"text": [1, 2], "image": [2]}, {"text": 1, "image": 2}, rrf_k=0))
+
+    assert fused == pytest.approx({"1": 1.0, "2": 0.5 + 2.0})
+
+
+def test_unweighted_signals_are_ignored():
+    rankings = {"text": ["a", "b"], "image": ["c"]}
+
+    fused = fuse_rankings(rankings, {"text": 1.0, "image": 0.0}, "weighted")
+
+    assert fused == [("a", 1.0), ("b", 0.5)]
+    assert fuse_rankings(rankings, {}) == []
+    with pytest.raises(ValueError):
+        fuse_rankings(rankings, {"text": 1.0}, "borda")
+
+
+def test_candidates_are_ranked_by_cosine_similarity():
+    user = [1.0, 0.0]
+    vectors = [[0.0, 2.0], None, [3.0, 0.1], [1.0, 1.0]]
+
+    scores = cosine_scores(vectors, user)
+
+    assert np.isnan(scores[1])
+    assert scores[2] == pytest.approx(3.0 / np.hypot(3.0, 0.1))
+    assert score_ranking(["a", "b", "c", "d"], scores) == ["c", "d", "a"]
+    assert score_ranking([], cosine_scores([], user)) == []
+
+
+def test_popularity_favours_many_good_ratings(make_product):
+    products = [
+        make_product("new", rating=5.0, rating_count=2),
+        make_product("unrated"),
+        make_product("bestseller", rating=4.4, rating_count=25000),
+        make_product("poor", rating=2.0, rating_count=25000),
+        make_product("good", rating=4.0, rating_count=300),
+    ]
+
+    ranking = popularity_ranking(products)
+
+    assert ranking[0] == "bestseller"
+    assert ranking[-1] == "poor"
+    assert ranking.index("good") < ranking.index("new")
@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+import pytest
+import pytest_asyncio
+from PIL import Image
+
+from services import image_fetcher
+from services.image_fetcher import (
+    ImageFetcher,
+    ImageFetchError,
+    ImageFetchTimeoutError,
+    ImageTooLargeError,
+)
+
+
+def _png(size=(32, 32)) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", size, "red").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class ImageHandler(BaseHTTPRequestHandler):
+    hits: Counter = Counter()
+    bodies = {
+        "/small.png": _png(),
+        "/wide.png": _png((400, 300)),
+        "/text": b"definitely not an image" * 10,
+    }
+
+    def do_GET(self):
+        self.hits[self.path] += 1
+        if self.path == "/slow.png":
+            time.sleep(0.5)
+        if self.path == "/missing.png":
+            self.send_error(404)
+            return
+        if self.path == "/unsized.png":
+            # No Content-Length: the size limit must be enforced while streaming
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(self.bodies["/small.png"] + b"\0" * 4096)
+            return
+        body = self.bodies.get(self.path, self.bodies["/small.png"])
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class QuietServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # Clients giving up on slow or oversized responses close the socket
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = QuietServer(("127.0.0.1", 0), ImageHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+@pytest_asyncio.fixture
+async def fetcher():
+    ImageHandler.hits.clear()
+    yield ImageFetcher()
+    await ImageFetcher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_url_is_downloaded_once(server, fetcher):
+    url = f"{server}/small.png"
+
+    results = await asyncio.gather(*[fetcher.fetch(url) for _ in range(5)])
+    again = await fetcher.fetch(url)
+
+    assert all(content == ImageHandler.bodies["/small.png"] for content in results + [again])
+    assert ImageHandler.hits["/small.png"] == 1
+    assert fetcher.stats()["shared_downloads"] == 4
+
+
+@pytest.mark.asyncio
+async def test_cancelled_requester_does_not_cancel_shared_download(server, fetcher):
+    url = f"{server}/slow.png"
+    first = asyncio.ensure_future(fetcher.fetch(url))
+    await asyncio.sleep(0.05)
+    second = asyncio.ensure_future(fetcher.fetch(url))
+    await asyncio.sleep(0.05)
+
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert await second == ImageHandler.bodies["/small.png"]
+    assert ImageHandler.hits["/slow.png"] == 1
+
+
+@pytest.mark.asyncio
+async def test_oversized_images_are_rejected(server, fetcher, monkeypatch):
+    monkeypatch.setattr(image_fetcher, "IMAGE_FETCH_MAX_BYTES", 1024)
+    with pytest.raises(ImageTooLargeError):
+        await fetcher.fetch(f"{server}/unsized.png")
+
+    monkeypatch.setattr(image_fetcher, "IMAGE_FETCH_MAX_BYTES", 10 * 1024 * 1024)
+    monkeypatch.setattr(image_fetcher, "IMAGE_MAX_PIXELS", 100_000)
+    with pytest.raises(ImageTooLargeError) as error:
+        await fetcher.fetch(f"{server}/wide.png")
+    assert "400x300" in error.value.detail
+
+
+@pytest.mark.asyncio
+async def test_invalid_and_slow_urls_fail_fast(server, fetcher, monkeypatch):
+    with pytest.raises(ImageFetchError):
+        await fetcher.fetch(f"{server}/text")
+    with pytest.raises(ImageFetchError):
+        await fetcher.fetch(f"{server}/missing.png")
+    with pytest.raises(ImageFetchError):
+        await fetcher.fetch("file:///etc/passwd")
+
+    monkeypatch.setattr(image_fetcher, "IMAGE_FETCH_TIMEOUT_SECONDS", 0.1)
+    started = time.perf_counter()
+    with pytest.raises(ImageFetchTimeoutError):
+        await fetcher.fetch(f"{server}/slow.png")
+    assert time.perf_counter() - started < 0.4
+    assert fetcher.stats()["rejected"] == 4
@@ -0,0 +1,77 @@
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from services.feast.image_preprocess import (
+    CLIP_IMAGE_SIZE,
+    InvalidImageError,
+    image_digest,
+    prepare_image,
+)
+from services.image_fetcher import ImageTooLargeError
+
+
+def _encode(image, fmt, **params):
+    buffer = BytesIO()
+    image.save(buffer, format=fmt, **params)
+    return buffer.getvalue()
+
+
+def _gradient(width, height):
+    x = np.linspace(0, 255, width, dtype=np.uint8)
+    y = np.linspace(0, 255, height, dtype=np.uint8)
+    pixels = np.stack(np.broadcast_arrays(x[None, :], y[:, None], 128 * np.ones((1, 1))), -1)
+    return Image.fromarray(pixels.astype(np.uint8), "RGB")
+
+
+@pytest.mark.parametrize("fmt", ["JPEG", "PNG", "WEBP"])
+def test_large_images_are_reduced_to_the_encoder_size(fmt):
+    source = _gradient(3000, 2000)
+
+    image = prepare_image(_encode(source, fmt))
+
+    assert image.mode == "RGB"
+    assert image.size == (336, CLIP_IMAGE_SIZE)
+    reference = source.resize(image.size, Image.Resampling.BICUBIC)
+    difference = np.abs(np.asarray(image, float) - np.asarray(reference, float)).mean()
+    assert difference < 4
+
+
+def test_small_images_are_not_upscaled():
+    image = prepare_image(_encode(Image.new("P", (120, 80)), "PNG"))
+
+    assert image.size == (120, 80)
+    assert image.mode == "RGB"
+
+
+def test_exif_orientation_is_applied():
+    exif = Image.Exif()
+    exif[0x0112] = 6  # rotated 90 degrees clockwise
+    content = _encode(_gradient(400, 300), "JPEG", exif=exif)
+
+    assert prepare_image(content).size == (CLIP_IMAGE_SIZE, 299)
+
+
+def test_pixel_limit_is_checked_before_decoding():
+    content = _encode(_gradient(400, 300), "PNG")
+
+    with pytest.raises(ImageTooLargeError):
+        prepare_image(content, max_pixels=100_000)
+
+
+def test_invalid_and_truncated_images_are_rejected():
+    content = _encode(_gradient(400, 300), "JPEG")
+
+    with pytest.raises(InvalidImageError):
+        prepare_image(b"not an image")
+    with pytest.raises(InvalidImageError):
+        prepare_image(content[: len(content) // 2])
+
+
+def test_digest_identifies_content():
+    content = _encode(_gradient(40, 30), "PNG")
+
+    assert image_digest(content) == image_digest(bytes(content))
+    assert image_digest(content) != image_digest(content + b"\0")
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from PIL import Image
+from transformers import CLIPImageProcessor, CLIPVisionConfig, CLIPVisionModelWithProjection
+
+from services.feast.image_search import ImageQueryEncoder
+
+
+@pytest.fixture
+def encoder(monkeypatch):
+    config = CLIPVisionConfig(
+        hidden_size=32,
+        intermediate_size=64,
+        num_hidden_layers=2,
+        num_attention_heads=4,
+        image_size=32,
+        patch_size=8,
+        projection_dim=16,
+    )
+    monkeypatch.setattr(
+        CLIPVisionModelWithProjection,
+        "from_pretrained",
+        classmethod(lambda cls, name: cls(config)),
+    )
+    monkeypatch.setattr(
+        CLIPImageProcessor,
+        "from_pretrained",
+        classmethod(lambda cls, name: cls(size={"shortest_edge": 32}, crop_size=32)),
+    )
+    return ImageQueryEncoder("tiny-clip")
+
+
+def test_batched_embeddings_match_single_images(encoder):
+    images = [Image.new("RGB", (48, 40), color) for color in ("red", "green", "blue")]
+
+    batched = encoder(images)
+    single = [encoder([image])[0] for image in images]
+
+    assert np.allclose(batched, single, atol=1e-5)
+    assert np.allclose(np.linalg.norm(batched, axis=1), 1.0, atol=1e-5)
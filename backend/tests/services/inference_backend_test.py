@@ -0,0 +1,125 @@
+import importlib.util
+
+import pytest
+import torch
+from torch import nn
+
+from services.feast import inference_backend
+from services.feast.inference_backend import optimize_module, quantize_attributes
+
+
+class Tower(nn.Module):
+    """Small stand-in for EntityTower: categorical embedding plus an MLP."""
+
+    def __init__(self):
+        super().__init__()
+        torch.manual_seed(0)
+        self.category = nn.Embedding(10, 16)
+        self.mlp = nn.Sequential(nn.Linear(24, 64), nn.ReLU(), nn.Linear(64, 32))
+
+    def forward(self, category, numeric):
+        return self.mlp(torch.cat([self.category(category), numeric], dim=-1))
+
+
+def _samples(count=8):
+    generator = torch.Generator().manual_seed(1)
+    return [
+        {
+            "category": torch.randint(0, 10, (1,), generator=generator),
+            "numeric": torch.randn(1, 8, generator=generator),
+        }
+        for _ in range(count)
+    ]
+
+
+def _outputs(model, samples):
+    with torch.inference_mode():
+        return torch.cat([model(**sample) for sample in samples])
+
+
+def test_int8_and_torchscript_stay_close_to_float32():
+    tower = Tower().eval()
+    samples = _samples()
+
+    for backend in ("int8", "torchscript"):
+        optimized = optimize_module(
+            tower, lambda: samples, backend=backend, name=f"tower_{backend}", shared_weights=False
+        )
+        assert optimized is not tower
+        report = inference_backend.stats()["models"][f"tower_{backend}"]
+        assert report["backend"] == backend
+        assert report["min_cosine"] >= 0.99
+        assert torch.allclose(_outputs(optimized, samples), _outputs(tower, samples), atol=0.05)
+
+
+@pytest.mark.parametrize("backend", ["tensorrt", "onnx"])
+def test_unavailable_backends_keep_float32(backend):
+    if backend == "onnx" and importlib.util.find_spec("onnxruntime") is not None:
+        pytest.skip("onnxruntime is installed")
+    tower = Tower().eval()
+
+    optimized = optimize_module(
+        tower, _samples, backend=backend, name="tower_missing", shared_weights=False
+    )
+    assert optimized is tower
+    report = inference_backend.stats()["models"]["tower_missing"]
+    assert report == {"backend": "eager", "requested": backend, "error": report["error"]}
+
+
+def test_drifting_candidates_are_rejected():
+    tower = Tower().eval()
+
+    optimized = optimize_module(
+        tower, _samples, "int8", "tower_strict", min_cosine=1.01, shared_weights=False
+    )
+    assert optimized is tower
+    assert inference_backend.stats()["models"]["tower_strict"]["backend"] == "eager"
+
+
+def test_quantized_attributes_are_restored_on_drift():
+    class Encoder:
+        def __init__(self):
+            self.model = Tower().eval()
+
+        def __call__(self, samples):
+            return _outputs(self.model, samples)
+
+    encoder = Encoder()
+    original = encoder.model
+    samples = _samples()
+
+    def probe():
+        return encoder(samples)
+
+    assert not quantize_attributes(
+        encoder, probe, "int8", "enc", min_cosine=1.01, shared_weights=False
+    )
+    assert encoder.model is original
+    assert not quantize_attributes(encoder, probe, "int8", "enc", shared_weights=True)
+    assert encoder.model is original
+    assert quantize_attributes(encoder, probe, "int8", "enc", shared_weights=False)
+    assert encoder.model is not original
+
+
+def test_onnx_export_matches_float32_for_any_batch_size():
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("onnxscript")
+    tower = Tower().eval()
+
+    optimized = optimize_module(tower, _samples, "onnx", "tower_onnx", shared_weights=False)
+
+    assert isinstance(optimized, inference_backend.OnnxModule)
+    assert inference_backend.stats()["models"]["tower_onnx"]["backend"] == "onnx"
+    batch = {"category": torch.arange(5), "numeric": torch.randn(5, 8)}
+    assert torch.allclose(optimized(**batch), _outputs(tower, [batch]), atol=1e-5)
+
+
+def test_eager_and_shared_weights_skip_building_samples():
+    tower = Tower().eval()
+
+    def samples():
+        raise AssertionError("samples must not be built")
+
+    assert optimize_module(tower, samples, "eager", "tower_eager") is tower
+    assert optimize_module(tower, samples, "int8", "tower_shared", shared_weights=True) is tower
+    assert "SHARED_WEIGHTS_DIR" in inference_backend.stats()["models"]["tower_shared"]["error"]
@@ -0,0 +1,47 @@
+import asyncio
+import threading
+
+import pytest
+
+from services.inference_executor import (
+    InferenceExecutor,
+    InferenceSaturatedError,
+    InferenceTimeoutError,
+)
+
+
+@pytest.fixture
+def executor():
+    pool = InferenceExecutor(max_workers=1, max_queue=1, timeout=5, name="test_inference")
+    yield pool
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_run_returns_result(executor):
+    assert await executor.run(lambda a, b: a + b, 2, 3) == 5
+    assert executor.metrics()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_saturated(executor):
+    release = threading.Event()
+    running = [asyncio.create_task(executor.run(release.wait)) for _ in range(2)]
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(InferenceSaturatedError) as exc_info:
+        await executor.run(lambda: None)
+    assert exc_info.value.status_code == 429
+
+    release.set()
+    await asyncio.gather(*running)
+    assert executor.metrics()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_timeout(executor):
+    release = threading.Event()
+    with pytest.raises(InferenceTimeoutError) as exc_info:
+        await executor.run(release.wait, timeout=0.05)
+    assert exc_info.value.status_code == 504
+    release.set()
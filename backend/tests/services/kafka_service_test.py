@@ -0,0 +1,26 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from services.kafka_service import KafkaService
+
+
+def test_concurrent_first_use_gets_one_initialized_service(monkeypatch):
+    created = []
+
+    def initialize(self):
+        time.sleep(0.05)
+        self.pipeline = object()
+        created.append(self)
+
+    def first_use(_):
+        service = KafkaService()
+        return service, hasattr(service, "pipeline")
+
+    monkeypatch.setattr(KafkaService, "_instance", None)
+    monkeypatch.setattr(KafkaService, "_initialize", initialize)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(first_use, range(8)))
+
+    assert len(created) == 1
+    assert all(service is created[0] and ready for service, ready in results)
@@ -0,0 +1,45 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services.feast.micro_batcher import MicroBatcher
+
+
+def test_concurrent_requests_are_coalesced():
+    batches = []
+
+    def square_all(items):
+        batches.append(list(items))
+        return [item * item for item in items]
+
+    batcher = MicroBatcher(square_all, max_batch_size=8, max_wait_ms=50, name="test_batcher")
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(batcher, range(8)))
+
+    assert results == [i * i for i in range(8)]
+    assert len(batches) < 8
+    assert max(len(batch) for batch in batches) <= 8
+    assert batcher.stats()["avg_batch_size"] > 1
+    batcher.close()
+
+
+def test_batch_errors_reach_every_caller():
+    def fail(items):
+        raise ValueError("model unavailable")
+
+    batcher = MicroBatcher(fail, max_wait_ms=1, name="test_batcher")
+    future = batcher.submit(1)
+    with pytest.raises(ValueError, match="model unavailable"):
+        future.result(timeout=1)
+    batcher.close()
+
+
+def test_close_finishes_pending_items_and_stops_the_thread():
+    batcher = MicroBatcher(lambda items: list(items), max_wait_ms=50, name="test_batcher")
+    pending = [batcher.submit(i) for i in range(3)]
+    batcher.close()
+
+    assert [future.result(timeout=1) for future in pending] == [0, 1, 2]
+    assert not batcher._thread.is_alive()
+    with pytest.raises(RuntimeError, match="closed"):
+        batcher.submit(3).result(timeout=1)
@@ -0,0 +1,100 @@
+import threading
+
+import pytest
+
+from services.feast.model_reloader import ModelVersionWatcher, VersionedModel
+
+
+def _model(loads=None, warmed=None, swapped=None, fail_versions=()):
+    def loader(version):
+        if version in fail_versions:
+            raise OSError(f"artefacts for {version} are missing")
+        if loads is not None:
+            loads.append(version)
+        return f"encoder-{version}"
+
+    return VersionedModel(
+        loader,
+        warmup=warmed.append if warmed is not None else None,
+        on_swap=(lambda version, model: swapped.append(version)) if swapped is not None else None,
+        name="test_model",
+    )
+
+
+def test_load_warms_then_swaps_and_keeps_previous():
+    warmed, swapped = [], []
+    model = _model(warmed=warmed, swapped=swapped)
+
+    assert model.load("1")
+    assert model.load("2")
+    assert not model.load("2")
+
+    assert model.current() == ("2", "encoder-2")
+    assert model.previous_version == "1"
+    assert warmed == ["encoder-1", "encoder-2"]
+    assert swapped == ["1", "2"]
+
+
+def test_failed_load_keeps_serving_model():
+    model = _model(fail_versions={"2"})
+    model.load("1")
+
+    with pytest.raises(OSError):
+        model.load("2")
+
+    assert model.version == "1"
+    assert model.stats()["failures"] == 1
+    assert "artefacts for 2" in model.stats()["last_error"]
+
+
+def test_rollback_pins_previous_version():
+    loads = []
+    model = _model(loads=loads)
+    model.load("1")
+    model.load("2")
+
+    assert model.rollback() == "1"
+    assert not model.load("2")
+    assert model.version == "1"
+
+    model.allow("2")
+    assert model.load("2")
+    assert loads == ["1", "2", "2"]
+
+
+def test_served_requests_are_counted_per_version():
+    model = _model()
+    model.load("1")
+    model.acquire()
+    model.load("2")
+    model.acquire()
+    model.acquire()
+
+    assert model.stats()["served"] == {"1": 1, "2": 2}
+
+
+def test_requests_keep_their_model_during_a_swap():
+    release = threading.Event()
+    model = VersionedModel(
+        lambda version: release.wait(1) and f"encoder-{version}", name="test_model"
+    )
+    release.set()
+    model.load("1")
+    release.clear()
+
+    loading = threading.Thread(target=model.load, args=("2",))
+    loading.start()
+    assert model.acquire() == ("1", "encoder-1")
+    release.set()
+    loading.join()
+    assert model.acquire() == ("2", "encoder-2")
+
+
+def test_watcher_notify_triggers_an_immediate_check():
+    seen = threading.Event()
+    watcher = ModelVersionWatcher(lambda: "3", lambda version: seen.set(), interval=60).start()
+    try:
+        watcher.notify()
+        assert seen.wait(1)
+    finally:
+        watcher.stop()
@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+from services.security import PasswordHasher, PasswordHashingSaturatedError, verify_password
+
+
+@pytest.fixture
+def hasher():
+    PasswordHasher.shutdown()
+    yield PasswordHasher(max_workers=2, max_queue=0)
+    PasswordHasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_round_trip(hasher):
+    hashed = await hasher.hash("s3cret")
+
+    assert await hasher.verify("s3cret", hashed)
+    assert not await hasher.verify("wrong", hashed)
+    assert hasher.metrics()["hash_time"]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_hash_many_preserves_order(hasher):
+    passwords = [f"password-{i}" for i in range(10)]
+
+    hashed = await hasher.hash_many(passwords, chunk_size=3)
+
+    assert len(hashed) == len(passwords)
+    assert all(verify_password(plain, h) for plain, h in zip(passwords, hashed))
+
+
+@pytest.mark.asyncio
+async def test_requests_beyond_capacity_are_rejected(hasher):
+    results = await asyncio.gather(
+        *[hasher.hash(f"password-{i}") for i in range(4)], return_exceptions=True
+    )
+
+    rejected = [r for r in results if isinstance(r, PasswordHashingSaturatedError)]
+    assert len(rejected) == 2
+    assert rejected[0].status_code == 429
+    assert hasher.metrics()["rejected"] == 2
@@ -0,0 +1,64 @@
+import time
+
+from services.cache import LRUCache
+from services.feast.product_cache import ProductCache
+
+
+class FakeCatalog:
+    def __init__(self, known, make_product):
+        self.known = set(known)
+        self.make_product = make_product
+        self.calls = []
+
+    def fetch(self, item_ids):
+        self.calls.append(list(item_ids))
+        return {str(i): self.make_product(str(i)) for i in item_ids if str(i) in self.known}
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put_many({"a": 1, "b": 2})
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_expires_entries():
+    cache = LRUCache(maxsize=10, ttl=0.01)
+    cache.put("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+def test_only_missing_ids_are_fetched_in_one_call(make_product):
+    catalog = FakeCatalog(["1", "2", "3"], make_product)
+    cache = ProductCache(maxsize=10, ttl=60, shared_path=None)
+
+    cache.get_many(["1", "2"], catalog.fetch)
+    products = cache.get_many(["2", "3", "404"], catalog.fetch)
+
+    assert catalog.calls == [["1", "2"], ["3", "404"]]
+    assert set(products) == {"2", "3"}
+    assert cache.stats()["hits"] == 1
+
+
+def test_shared_tier_is_visible_to_other_caches(tmp_path, make_product):
+    catalog = FakeCatalog(["1"], make_product)
+    path = str(tmp_path / "products.db")
+    ProductCache(shared_path=path).get_many(["1"], catalog.fetch)
+
+    other_worker = ProductCache(shared_path=path)
+    products = other_worker.get_many(["1"], catalog.fetch)
+
+    assert products["1"] == make_product("1")
+    assert len(catalog.calls) == 1
+
+
+def test_invalidate_forces_refetch(tmp_path, make_product):
+    catalog = FakeCatalog(["1"], make_product)
+    cache = ProductCache(shared_path=str(tmp_path / "products.db"))
+    cache.get_many(["1"], catalog.fetch)
+    cache.invalidate(["1"])
+    cache.get_many(["1"], catalog.fetch)
+    assert len(catalog.calls) == 2
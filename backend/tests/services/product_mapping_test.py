@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.feast.product_mapping import products_from_frame
+from tests.benchmarks.product_mapping_benchmark import items_frame, itertuples_products
+
+
+def test_matches_row_by_row_conversion():
+    # Shuffle so ordering is checked against something other than catalogue order
+    frame = items_frame(100).sample(frac=1, random_state=0).reset_index(drop=True)
+    expected = itertuples_products(frame)
+    products = products_from_frame(frame)
+
+    assert [p.item_id for p in products] == frame["item_id"].tolist()
+    assert [p.model_dump() for p in products] == [p.model_dump() for p in expected]
+    assert products[0].model_dump_json() == expected[0].model_dump_json()
+
+
+def test_missing_optional_columns_and_unknown_items():
+    frame = pd.DataFrame(
+        {
+            "item_id": ["a", "b", "c"],
+            "product_name": ["A", None, "C"],
+            "category": ["x", None, "y"],
+            "actual_price": [1.0, np.nan, 2.5],
+            "rating_count": [3.0, np.nan, np.nan],
+        }
+    )
+    products = products_from_frame(frame)
+
+    assert [p.item_id for p in products] == ["a", "c"]
+    assert products[0].rating_count == 3
+    assert products[1].rating_count is None
+    assert products[1].img_link is None
+
+
+def test_missing_required_values_fail_at_mapping_time():
+    frame = pd.DataFrame(
+        {
+            "item_id": ["a", "b"],
+            "product_name": ["A", "B"],
+            "category": ["x", None],
+            "actual_price": [1.0, 2.0],
+        }
+    )
+    with pytest.raises(ValueError, match=r"\['b'\] have no category"):
+        products_from_frame(frame)
+
+    frame["category"] = "x"
+    frame.loc[0, "actual_price"] = np.nan
+    with pytest.raises(ValueError, match=r"\['a'\] have no actual_price"):
+        products_from_frame(frame)
@@ -0,0 +1,64 @@
+from pathlib import Path
+
+import pandas as pd
+
+from services.feast.recommendation_snapshot import (
+    RecommendationSnapshot,
+    RecommendationSnapshotStore,
+    build_snapshot,
+    snapshot_path,
+)
+
+ITEMS_PARQUET = Path(__file__).parents[2] / "services/feast/data/recommendation_items.parquet"
+
+
+def scoring_output(item_ids, model_offset=0):
+    return pd.DataFrame(
+        {
+            "user_id": ["user-b", "user-a", "üser-c"],
+            "top_k_item_ids": [
+                item_ids[model_offset : model_offset + 3],
+                item_ids[model_offset + 3 : model_offset + 5] + ["unknown-item"],
+                [],
+            ],
+        }
+    )
+
+
+def test_round_trip(tmp_path):
+    items = pd.read_parquet(ITEMS_PARQUET)
+    item_ids = items["item_id"].tolist()
+    path = str(tmp_path / "snap")
+    header = build_snapshot(path, "v1", scoring_output(item_ids), items)
+    snapshot = RecommendationSnapshot(path)
+
+    assert header["n_users"] == 3 and header["k"] == 3
+    assert [p.item_id for p in snapshot.recommendations("user-b")] == item_ids[:3]
+    # Unknown items are dropped while the order of the rest is kept
+    assert [p.item_id for p in snapshot.recommendations("user-a")] == item_ids[3:5]
+    assert snapshot.recommendations("üser-c") == []
+    assert snapshot.recommendations("missing-user") is None
+
+    product = snapshot.recommendations("user-b")[0]
+    expected = items.iloc[0]
+    assert product.product_name == expected["product_name"]
+    assert product.actual_price == expected["actual_price"]
+
+
+def test_store_swaps_on_new_model_version(tmp_path):
+    items = pd.read_parquet(ITEMS_PARQUET)
+    item_ids = items["item_id"].tolist()
+    build_snapshot(snapshot_path(tmp_path, "v1"), "v1", scoring_output(item_ids), items)
+    build_snapshot(snapshot_path(tmp_path, "v2"), "v2", scoring_output(item_ids, 10), items)
+
+    store = RecommendationSnapshotStore(str(tmp_path))
+    assert store.recommendations("user-b") is None
+
+    assert store.refresh("v1")
+    assert not store.refresh("v1")
+    assert [p.item_id for p in store.recommendations("user-b")] == item_ids[:3]
+
+    assert store.refresh("v2")
+    assert [p.item_id for p in store.recommendations("user-b")] == item_ids[10:13]
+    assert not store.refresh("v3")
+    assert store.stats()["model_version"] == "v2"
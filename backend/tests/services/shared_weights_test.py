@@ -0,0 +1,135 @@
+import os
+
+import torch
+from torch import nn
+
+from services.feast.shared_weights import (
+    build_shared_module,
+    memory_usage,
+    share_module,
+    share_module_attributes,
+    share_nested_modules,
+    weights_digest,
+)
+from services.metrics import collect_metrics
+
+
+class TinyTower(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.embedding = nn.Embedding(10, 4)
+        self.linear = nn.Linear(4, 3)
+        self.norm = nn.BatchNorm1d(3)
+
+    def forward(self, ids):
+        return self.norm(self.linear(self.embedding(ids)))
+
+
+def _trained_tower():
+    torch.manual_seed(0)
+    return TinyTower().eval()
+
+
+def _checkpoint(tmp_path, stem, module):
+    return tmp_path / f"{stem}-{weights_digest(module)}.pt"
+
+
+def test_shared_module_matches_private_copy(tmp_path):
+    path = str(tmp_path / "tower.pt")
+    private = _trained_tower()
+    ids = torch.tensor([1, 2, 3])
+    expected = private(ids)
+
+    shared = share_module(_trained_tower(), path)
+
+    assert _checkpoint(tmp_path, "tower", private).exists()
+    assert torch.equal(shared(ids), expected)
+    assert not any(p.requires_grad for p in shared.parameters())
+    assert not shared.training
+
+
+def test_workers_attach_the_existing_checkpoint(tmp_path):
+    path = str(tmp_path / "tower.pt")
+    share_module(_trained_tower(), path)
+    checkpoint = _checkpoint(tmp_path, "tower", _trained_tower())
+    written = os.path.getmtime(checkpoint)
+
+    other = share_module(_trained_tower(), path)
+
+    assert os.path.getmtime(checkpoint) == written
+    assert torch.equal(other.linear.weight, _trained_tower().linear.weight)
+
+
+def test_changed_weights_never_attach_a_stale_checkpoint(tmp_path):
+    path = str(tmp_path / "tower.pt")
+    old = share_module(_trained_tower(), path)
+    ids = torch.tensor([1, 2])
+    old_output = old(ids)
+    torch.manual_seed(1)
+    updated = TinyTower().eval()
+    expected = updated(ids)
+
+    shared = share_module(updated, path)
+
+    assert torch.equal(shared(ids), expected)
+    assert not torch.equal(shared(ids), old_output)
+    # The old copy is removed, but a worker that mapped it can still use it
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        [_checkpoint(tmp_path, "tower", updated).name, "tower.pt.lock"]
+    )
+    assert torch.equal(old(ids), old_output)
+
+
+def test_digest_covers_values_and_dtypes():
+    tower = _trained_tower()
+
+    assert weights_digest(tower) == weights_digest(_trained_tower())
+    assert weights_digest(tower) != weights_digest(_trained_tower().double())
+    with torch.no_grad():
+        tower.linear.bias[0] += 1
+    assert weights_digest(tower) != weights_digest(_trained_tower())
+
+
+def test_skeleton_is_built_without_allocating_weights(tmp_path):
+    path = str(tmp_path / "tower.pt")
+    torch.save(_trained_tower().state_dict(), path)
+
+    tower = build_shared_module(TinyTower, path)
+
+    assert not any(t.is_meta for t in tower.state_dict().values())
+    assert torch.equal(tower(torch.tensor([4])), _trained_tower()(torch.tensor([4])))
+
+
+def test_module_attributes_of_an_encoder_are_shared(tmp_path):
+    class Encoder:
+        def __init__(self):
+            self.model = _trained_tower()
+            self.name = "tiny"
+
+    assert share_module_attributes(Encoder(), str(tmp_path), "tiny") == 1
+    assert len(list(tmp_path.glob("tiny-model-*.pt"))) == 1
+
+
+def test_modules_inside_helper_objects_are_shared(tmp_path):
+    class Encoder:
+        def __init__(self):
+            self.model = _trained_tower()
+
+    class SearchService:
+        def __init__(self):
+            self.encoder = Encoder()
+            self.store = object()
+
+    package = Encoder.__module__.split(".")[0]
+    service = SearchService()
+
+    assert share_nested_modules(service, str(tmp_path), "bge", packages=(package,)) == 1
+    assert len(list(tmp_path.glob("bge-encoder-model-*.pt"))) == 1
+    assert collect_metrics()["memory"]["shared_modules"]["bge"] == 1
+    assert share_nested_modules(SearchService(), str(tmp_path), "none", packages=()) == 0
+    assert collect_metrics()["memory"]["shared_modules"]["none"] == 0
+
+
+def test_memory_usage_reports_resident_memory():
+    usage = memory_usage()
+    assert usage.get("rss_mb", usage.get("max_rss_mb", 0)) > 0
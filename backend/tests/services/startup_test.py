@@ -0,0 +1,67 @@
+import threading
+import time
+
+import pytest
+
+from services.startup import ComponentLoader, ComponentNotReadyError
+
+
+def test_eager_components_load_concurrently():
+    loader = ComponentLoader(name="test_startup")
+    for name in ("a", "b", "c"):
+        loader.register(name, lambda name=name: time.sleep(0.2) or name)
+
+    started = time.perf_counter()
+    loader.start()
+    assert [loader.get(name) for name in ("a", "b", "c")] == ["a", "b", "c"]
+
+    assert time.perf_counter() - started < 0.5
+    assert loader.ready()
+    assert all(stats["duration_ms"] >= 200 for stats in loader.stats().values())
+
+
+def test_factories_can_depend_on_other_components():
+    loader = ComponentLoader(name="test_startup")
+    loader.register("version", lambda: time.sleep(0.05) or "v2")
+    loader.register("model", lambda: f"model-{loader.get('version')}")
+    loader.start()
+
+    assert loader.get("model", timeout=1) == "model-v2"
+
+
+def test_lazy_component_is_gated_until_loaded():
+    release = threading.Event()
+    loader = ComponentLoader(name="test_startup")
+    loader.register("image_search", lambda: release.wait(1) and "loaded", lazy=True)
+    loader.start()
+
+    assert loader.ready()
+    assert loader.stats()["image_search"]["state"] == "pending"
+    with pytest.raises(ComponentNotReadyError) as error:
+        loader.require("image_search")
+    assert error.value.status_code == 503
+
+    release.set()
+    assert loader.get("image_search", timeout=1) == "loaded"
+    assert loader.require("image_search") == "loaded"
+
+
+def test_failed_component_is_retried_on_next_use():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            time.sleep(0.1)
+            raise ConnectionError("minio unavailable")
+        return "encoder"
+
+    loader = ComponentLoader(name="test_startup")
+    loader.register("encoder", flaky)
+    loader.start()
+    with pytest.raises(RuntimeError, match="failed to load"):
+        loader.get("encoder", timeout=1)
+    assert loader.stats()["encoder"]["error"] == "minio unavailable"
+
+    assert loader.get("encoder", timeout=1) == "encoder"
+    assert loader.stats()["encoder"]["attempts"] == 2
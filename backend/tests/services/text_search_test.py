@@ -0,0 +1,94 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from services.feast import text_search
+from services.feast.ann_index import AnnIndexRegistry, IVFIndex
+from services.feast.text_search import TextSearchEngine, normalize_query
+
+
+class FakeSearchService:
+    def __init__(self):
+        self.queries = []
+
+    def search_by_text(self, text, k):
+        self.queries.append((text, k))
+        return pd.DataFrame({"item_id": [f"{text}-{i}" for i in range(k)]})
+
+
+class FakeEncoder:
+    """Maps the first letter of each query onto a one-hot vector."""
+
+    def __init__(self):
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def __call__(self, texts):
+        with self.lock:
+            self.batches.append(list(texts))
+        vectors = np.zeros((len(texts), 4), dtype=np.float32)
+        for row, text in enumerate(texts):
+            vectors[row, "abcd".index(text[0])] = 1.0
+        return list(vectors)
+
+
+def hydrate(item_ids):
+    return [f"product:{item_id}" for item_id in item_ids]
+
+
+def test_queries_are_normalized_for_caching():
+    assert normalize_query("  Wireless   HEADPHONES\t") == "wireless headphones"
+
+
+def test_results_are_cached_per_normalized_query_and_k():
+    service = FakeSearchService()
+    engine = TextSearchEngine(service)
+
+    first = engine.search("Red Shoes", 2, hydrate)
+    second = engine.search("  red   shoes ", 2, hydrate)
+    engine.search("red shoes", 3, hydrate)
+
+    assert first == second == ["product:red shoes-0", "product:red shoes-1"]
+    assert service.queries == [("red shoes", 2), ("red shoes", 3)]
+    phases = engine.stats()["phases"]
+    assert phases["retrieve"]["count"] == 2
+    assert phases["hydrate"]["count"] == 3
+
+
+def test_text_index_is_searched_with_batched_query_embeddings(monkeypatch):
+    monkeypatch.setattr(text_search, "TEXT_ENCODER_MAX_WAIT_MS", 100)
+    registry = AnnIndexRegistry(directory=None)
+    registry.register("text", IVFIndex.build(["a1", "b1", "c1", "d1"], np.eye(4), 1, 1))
+    service = FakeSearchService()
+    encoder = FakeEncoder()
+    engine = TextSearchEngine(service, registry, encoder)
+
+    results = {}
+    threads = [
+        threading.Thread(target=lambda q=q: results.update({q: engine.search(q, 1, hydrate)}))
+        for q in ("apple", "banana", "cherry", "date")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.results.invalidate()
+    engine.search("Apple", 1, hydrate)
+    engine.close()
+
+    assert results == {
+        "apple": ["product:a1"],
+        "banana": ["product:b1"],
+        "cherry": ["product:c1"],
+        "date": ["product:d1"],
+    }
+    assert service.queries == []
+    assert sorted(q for batch in encoder.batches for q in batch) == [
+        "apple",
+        "banana",
+        "cherry",
+        "date",
+    ]
+    assert len(encoder.batches) < 4
+    assert engine.stats()["embedding_cache"]["hits"] == 1
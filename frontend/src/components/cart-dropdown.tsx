@@ -2,7 +2,6 @@ import { Card, CardBody, Button, Flex, FlexItem } from '@patternfly/react-core';
 import { TrashIcon } from '@patternfly/react-icons';
 import { useAuth } from '../contexts/AuthProvider';
 import { useCart, useRemoveFromCart, useUpdateCart } from '../hooks/useCart';
-import { useProduct } from '../hooks/useProducts';
 import { useState, useEffect } from 'react';
 interface CartDropdownProps {
   isOpen: boolean;
@@ -31,9 +30,8 @@ const CartItemRow = ({
   isUpdating,
   onPriceCalculated,
 }: any) => {
-  const { data: productData, isLoading: isProductLoading } = useProduct(
-    item.product_id
-  );
+  // Product details come with the cart, no request per line item
+  const productData = item.product;
   const quantity = item.quantity || 1;
 
   // Use product name if available, fallback to product ID
@@ -64,7 +62,7 @@ const CartItemRow = ({
       <Flex alignItems={{ default: 'alignItemsCenter' }}>
         <FlexItem flex={{ default: 'flex_1' }}>
           <div style={{ fontSize: '14px', fontWeight: '500' }}>
-            {isProductLoading ? 'Loading...' : displayName}
+            {displayName}
           </div>
 
           {/* Quantity Controls */}
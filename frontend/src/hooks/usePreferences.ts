@@ -1,5 +1,6 @@
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { setPreferences, fetchNewPreferences } from '../services/preferences';
+import { setToken } from '../services/auth';
 import { createNewUserRecommendations } from '../services/recommendations';
 import type { PreferencesRequest } from '../services/preferences';
 import { useNavigate } from '@tanstack/react-router';
@@ -23,6 +24,8 @@ export const useSetPreferences = () => {
     mutationFn: (preferences: PreferencesRequest) =>
       setPreferences(preferences),
     onSuccess: async authResponse => {
+      // The refreshed token carries the updated profile
+      setToken(authResponse.token);
       // Update user data in cache with new preferences
       queryClient.setQueryData(['currentUser'], authResponse.user);
 
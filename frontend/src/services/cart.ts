@@ -1,14 +1,20 @@
+import type { ProductData } from '../types';
 import { apiRequest, ServiceLogger } from './api';
 
 export interface CartItem {
   user_id: string;
   product_id: string;
   quantity?: number;
+  // Returned by fetchCart so line items need no per-product request
+  product?: ProductData | null;
 }
 
 export const fetchCart = async (userId: string): Promise<CartItem[]> => {
   ServiceLogger.logServiceCall('fetchCart', { userId });
-  return apiRequest<CartItem[]>(`/cart/${userId}`, 'fetchCart');
+  return apiRequest<CartItem[]>(
+    `/cart/${userId}?include_products=true`,
+    'fetchCart'
+  );
 };
 
 export const addToCart = async (cartItem: CartItem): Promise<void> => {
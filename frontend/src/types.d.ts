@@ -16,6 +16,7 @@ export interface CartItem {
   user_id: string;
   product_id: string;
   quantity?: number;
+  product?: ProductData | null;
 }
 
 export interface User {